@@ -35,6 +35,11 @@ ALLOWED_HOSTS = ["*"]  # tighten later
 # --------------------------------------------------
 JWT_SETTINGS = {
     "ALGORITHM": os.getenv("JWT_ALGORITHM", "RS256"),
+    # Extra algorithms accepted during a signing-algorithm migration,
+    # e.g. JWT_ACCEPTED_ALGORITHMS=EdDSA (comma-separated; HS* never allowed)
+    "ACCEPTED_ALGORITHMS": [
+        alg for alg in os.getenv("JWT_ACCEPTED_ALGORITHMS", "").split(",") if alg
+    ],
     "ISSUER": os.getenv("JWT_ISSUER", "auth_service"),
 }
 
@@ -43,6 +48,162 @@ JWT_PUBLIC_KEY_PATH = os.getenv(
     str(PROJECT_ROOT / "auth_service" / "keys" / "dev_public.pem"),
 )
 
+# Verified tokens are remembered until their own exp (0 disables the cache)
+JWT_TOKEN_CACHE_SIZE = int(os.getenv("JWT_TOKEN_CACHE_SIZE", 10000))
+
+# kid-tagged keys from auth_service's JWKS, refreshed in the background.
+# JWT_JWKS_PATH is a file-based stand-in for offline use. Tokens without a
+# kid (or before the first refresh) fall back to JWT_PUBLIC_KEY_PATH.
+JWT_JWKS_URL = os.getenv("JWT_JWKS_URL", "")
+JWT_JWKS_PATH = os.getenv("JWT_JWKS_PATH", "")
+JWT_JWKS_REFRESH_INTERVAL = int(os.getenv("JWT_JWKS_REFRESH_INTERVAL", 300))
+
+# Revoked token IDs pulled incrementally from auth_service
+# (/api/auth/revocations/); JWT_REVOCATIONS_PATH is a file stand-in.
+# Unset: revocation is not checked.
+JWT_REVOCATIONS_URL = os.getenv("JWT_REVOCATIONS_URL", "")
+JWT_REVOCATIONS_PATH = os.getenv("JWT_REVOCATIONS_PATH", "")
+JWT_REVOCATIONS_REFRESH_INTERVAL = int(os.getenv("JWT_REVOCATIONS_REFRESH_INTERVAL", 5))
+
+
+# --------------------------------------------------
+# Upstream services (keep-alive connection pools)
+# --------------------------------------------------
+UPSTREAM_POOLS = {
+    "master": {
+        "BASE_URL": os.getenv("MASTER_SERVICE_BASE", "http://127.0.0.1:8002"),
+        # Replicas (comma-separated base URLs); defaults to BASE_URL alone.
+        "ENDPOINTS": [url for url in os.getenv("MASTER_SERVICE_ENDPOINTS", "").split(",") if url],
+        # "round_robin" | "least_outstanding" | "p2c" (power of two choices)
+        "BALANCER": os.getenv("MASTER_BALANCER", "p2c"),
+        # Passive health: eject a replica after N consecutive failures
+        # (connection error / 5xx) for EJECT_DURATION seconds, doubling.
+        "EJECT_AFTER": int(os.getenv("MASTER_EJECT_AFTER", 3)),
+        "EJECT_DURATION": int(os.getenv("MASTER_EJECT_DURATION", 10)),
+        "MAX_SIZE": int(os.getenv("MASTER_POOL_MAX_SIZE", 20)),
+        "IDLE_TIMEOUT": int(os.getenv("MASTER_POOL_IDLE_TIMEOUT", 60)),
+        "MAX_LIFETIME": int(os.getenv("MASTER_POOL_MAX_LIFETIME", 300)),
+        "ACQUIRE_TIMEOUT": int(os.getenv("MASTER_POOL_ACQUIRE_TIMEOUT", 5)),
+        "ASYNC_MAX_CONNECTIONS": int(os.getenv("MASTER_POOL_ASYNC_MAX_CONNECTIONS", 1000)),
+        # Fail fast: connect timeout (route TIMEOUT is the read timeout),
+        # calls in flight before rejecting with 503 (at most MAX_SIZE, or
+        # ASYNC_MAX_CONNECTIONS in async mode), circuit breaker.
+        "CONNECT_TIMEOUT": float(os.getenv("MASTER_CONNECT_TIMEOUT", 2)),
+        "MAX_CONCURRENT": int(os.getenv("MASTER_MAX_CONCURRENT", 100)),
+        "CIRCUIT_BREAKER": {
+            "WINDOW": 50,               # last N calls
+            "MIN_CALLS": 10,            # before the rates are evaluated
+            "FAILURE_RATE": 0.5,        # connection errors, timeouts, 5xx
+            "SLOW_CALL_DURATION": float(os.getenv("MASTER_SLOW_CALL_DURATION", 2)),
+            "SLOW_CALL_RATE": 0.8,
+            "OPEN_DURATION": int(os.getenv("MASTER_CIRCUIT_OPEN_DURATION", 10)),
+            "HALF_OPEN_CALLS": 3,       # probes before closing again
+        },
+    },
+    "auth": {
+        "BASE_URL": os.getenv("AUTH_SERVICE_BASE", "http://127.0.0.1:8001"),
+        "MAX_SIZE": int(os.getenv("AUTH_POOL_MAX_SIZE", 10)),
+        "IDLE_TIMEOUT": int(os.getenv("AUTH_POOL_IDLE_TIMEOUT", 60)),
+        "MAX_LIFETIME": int(os.getenv("AUTH_POOL_MAX_LIFETIME", 300)),
+        "ACQUIRE_TIMEOUT": int(os.getenv("AUTH_POOL_ACQUIRE_TIMEOUT", 5)),
+        "ASYNC_MAX_CONNECTIONS": int(os.getenv("AUTH_POOL_ASYNC_MAX_CONNECTIONS", 200)),
+        "CONNECT_TIMEOUT": float(os.getenv("AUTH_CONNECT_TIMEOUT", 2)),
+        "MAX_CONCURRENT": int(os.getenv("AUTH_MAX_CONCURRENT", 50)),
+    },
+}
+
+# --------------------------------------------------
+# Routes (longest prefix wins, see gateway/services/routes.py)
+# --------------------------------------------------
+# UPSTREAM None marks a gateway-local view (gateway/urls.py); AUTH decides
+# whether the JWT middleware requires an access token for the prefix.
+
+# Geographic masters change a few times a month but are read on every form
+# load: their GETs are served from the gateway response cache. Cities,
+# districts and states embed their parents' names, so any write under
+# /masters/ purges all of them.
+GEO_MASTER_CACHE = {
+    "TTL": int(os.getenv("GEO_MASTER_CACHE_TTL", 300)),
+    "STALE_WHILE_REVALIDATE": int(os.getenv("GEO_MASTER_CACHE_SWR", 3600)),
+    "PURGE": ["/api/master/api/v1/masters/"],
+}
+
+GATEWAY_ROUTES = [
+    # auth_service checks its own credentials (login, refresh, logout, JWKS)
+    {"PREFIX": "/api/auth/", "UPSTREAM": "auth", "STRIP_PREFIX": False, "TIMEOUT": 10, "AUTH": False},
+    {"PREFIX": "/api/master/", "UPSTREAM": "master", "STRIP_PREFIX": "/api/master", "TIMEOUT": 10, "AUTH": True},
+    # master-service API docs are public through the gateway
+    {"PREFIX": "/api/master/api/docs/", "UPSTREAM": "master", "STRIP_PREFIX": "/api/master", "TIMEOUT": 10, "AUTH": False},
+    *(
+        {
+            "PREFIX": f"/api/master/api/v1/masters/{resource}/",
+            "UPSTREAM": "master",
+            "STRIP_PREFIX": "/api/master",
+            "TIMEOUT": 10,
+            "AUTH": True,
+            "CACHE": GEO_MASTER_CACHE,
+            # Dashboards load these all at once: identical concurrent GETs
+            # (same path, query, groups) share one upstream call.
+            "COALESCE": True,
+        }
+        for resource in ("continents", "countries", "states", "districts", "cities")
+    ),
+    {"PREFIX": "/api/debug/echo/", "UPSTREAM": None, "AUTH": True},
+    {"PREFIX": "/api/gateway/", "UPSTREAM": None, "AUTH": True},
+    # Prometheus scrapes without a token; restrict it at the network edge
+    {"PREFIX": "/metrics/", "UPSTREAM": None, "AUTH": False},
+]
+
+# "sync": blocking proxy view (WSGI, e.g. gunicorn / runserver)
+# "async": non-blocking proxy view on aiohttp (ASGI, e.g. uvicorn config.asgi:application)
+GATEWAY_PROXY_MODE = os.getenv("GATEWAY_PROXY_MODE", "sync")
+
+# "passthrough": stream upstream status, headers and body bytes unchanged
+# "json": parse the upstream body and re-serialize it (legacy behaviour)
+GATEWAY_RESPONSE_MODE = os.getenv("GATEWAY_RESPONSE_MODE", "passthrough")
+GATEWAY_STREAM_CHUNK_SIZE = int(os.getenv("GATEWAY_STREAM_CHUNK_SIZE", 64 * 1024))
+
+# Request bodies are streamed to the upstream; anything larger is rejected (413).
+GATEWAY_MAX_REQUEST_BODY_SIZE = int(os.getenv("GATEWAY_MAX_REQUEST_BODY_SIZE", 50 * 1024 * 1024))
+
+# Response compression (gateway/services/compression.py). Clients get the
+# best of ENCODINGS they accept; "br" and "zstd" need the optional
+# "brotli" / "zstandard" packages and are skipped when not installed.
+# Upstream bodies are requested in UPSTREAM_ENCODING and relayed untouched
+# to clients that accept it.
+GATEWAY_COMPRESSION = {
+    "ENCODINGS": ["zstd", "br", "gzip"],
+    "MIN_SIZE": int(os.getenv("GATEWAY_COMPRESSION_MIN_SIZE", 1024)),
+    "LEVELS": {"gzip": 6, "br": 4, "zstd": 3},
+    "UPSTREAM_ENCODING": os.getenv("GATEWAY_UPSTREAM_ENCODING", "gzip"),
+}
+
+# GET response cache for routes with a CACHE policy (gateway/services/response_cache.py)
+GATEWAY_RESPONSE_CACHE = {
+    "MAX_BYTES": int(os.getenv("GATEWAY_RESPONSE_CACHE_MAX_BYTES", 64 * 1024 * 1024)),
+    "MAX_ENTRY_BYTES": int(os.getenv("GATEWAY_RESPONSE_CACHE_MAX_ENTRY_BYTES", 1024 * 1024)),
+    "REVALIDATE_WORKERS": 4,
+}
+
+# Distributed tracing (common_lib/erp_tracing). Every request starts a new
+# trace here (client traceparent headers are ignored), sampled at
+# SAMPLE_RATE; auth_service and master-service continue it from the
+# forwarded traceparent. Spans of all three services go to one JSON lines
+# file by default (python -m erp_tracing.report traces.jsonl), or are
+# POSTed to EXPORT_URL (stand-in: python -m erp_tracing.collector).
+# Off unless TRACING_ENABLED=1; the file grows without bound, so keep
+# TRACING_SAMPLE_RATE low (or export to a collector) outside development.
+TRACING = {
+    "ENABLED": os.getenv("TRACING_ENABLED", "0") == "1",
+    "SERVICE_NAME": "api_gateway",
+    "SAMPLE_RATE": float(os.getenv("TRACING_SAMPLE_RATE", 0.01)),
+    "ACCEPT_INCOMING": False,
+    "INSTRUMENT": (),
+    "EXCLUDE_PATHS": ("/metrics",),
+    "EXPORT_PATH": os.getenv("TRACING_EXPORT_PATH", str(PROJECT_ROOT / "traces.jsonl")),
+    "EXPORT_URL": os.getenv("TRACING_EXPORT_URL"),
+}
+
 
 # --------------------------------------------------
 # Applications
@@ -58,8 +219,14 @@ INSTALLED_APPS = [
 # Middleware (JWT first, always)
 # --------------------------------------------------
 MIDDLEWARE = [
+    # Outermost: request durations and response sizes cover the whole stack
+    "gateway.middleware.metrics.MetricsMiddleware",
+    # Root span of each request; the proxy forwards its traceparent upstream
+    "erp_tracing.middleware.TracingMiddleware",
     # CORS middleware should be as high as possible so preflight requests are handled
     "corsheaders.middleware.CorsMiddleware",
+    # Runs last on the way out: compresses whatever is not encoded yet
+    "gateway.middleware.compression.CompressionMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "gateway.middleware.jwt_auth.JWTAuthenticationMiddleware",
     "django.middleware.common.CommonMiddleware",
@@ -82,10 +249,11 @@ CORS_ALLOW_CREDENTIALS = False
 
 
 # --------------------------------------------------
-# URLs / WSGI
+# URLs / WSGI / ASGI
 # --------------------------------------------------
 ROOT_URLCONF = "config.urls"
 WSGI_APPLICATION = "config.wsgi.application"
+ASGI_APPLICATION = "config.asgi.application"
 
 
 # --------------------------------------------------
@@ -0,0 +1,137 @@
+"""
+Compression benchmark
+---------------------
+CPU cost vs. bytes saved for each available content coding, on a JSON list
+shaped like master-service ``Site`` rows (~50 fields each).
+
+"one-shot" compresses the whole body at once (buffered responses);
+"stream" feeds it in GATEWAY_STREAM_CHUNK_SIZE chunks with a flush per
+chunk, as the compression middleware does for relayed streams.
+
+    python manage.py benchmark_compression --rows 500 --iterations 20
+"""
+
+import json
+import random
+import time
+from decimal import Decimal
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from gateway.services.compression import DECODERS, ENCODERS
+
+LEVELS = {
+    "gzip": (1, 6, 9),
+    "br": (1, 4, 9),
+    "zstd": (1, 3, 9),
+}
+
+
+def _site_rows(count: int):
+    rng = random.Random(42)
+    states = ["Tamil Nadu", "Karnataka", "Kerala", "Maharashtra", "Telangana"]
+    rows = []
+    for i in range(1, count + 1):
+        row = {
+            "id": i,
+            "unique_id": f"SITE-{i:06d}",
+            "site_name": f"Site {rng.choice(['North', 'South', 'East', 'West'])} {i}",
+            "state_id": rng.choice(states),
+            "district_id": f"District {rng.randint(1, 40)}",
+            "ulb": f"ULB {rng.randint(1, 300)}",
+            "site_address": f"{rng.randint(1, 999)} Main Road, Ward {rng.randint(1, 60)}",
+            "status": rng.choice(["active", "inactive", "commissioning"]),
+            "latitude": str(Decimal(rng.uniform(8, 20)).quantize(Decimal("0.000001"))),
+            "longitude": str(Decimal(rng.uniform(72, 85)).quantize(Decimal("0.000001"))),
+            "project_value": f"{rng.uniform(1e5, 1e8):.2f}",
+            "project_type_details": "Legacy waste bio-mining and remediation",
+            "basic_payment_per_m3": f"{rng.uniform(300, 900):.2f}",
+            "dc_invoice_no": f"DC/{rng.randint(2020, 2026)}/{rng.randint(1, 9999):04d}",
+            "min_max_type": rng.choice(["min", "max"]),
+            "screen_name": None,
+            "weighbridge_count": rng.randint(0, 4),
+            "eb_rate": f"{rng.uniform(5, 12):.2f}",
+            "unit_per_cost": f"{rng.uniform(5, 12):.2f}",
+            "kwh": f"{rng.uniform(100, 5000):.2f}",
+            "demand_cost": f"{rng.uniform(1000, 50000):.2f}",
+            "eb_start_date": "2024-04-01",
+            "eb_end_date": "2025-03-31",
+            "no_of_zones": rng.randint(1, 12),
+            "no_of_phases": rng.randint(1, 4),
+            "density_volume": f"{rng.uniform(0.5, 1.5):.2f}",
+            "extended_quantity": f"{rng.uniform(0, 1e5):.2f}",
+            "service_charge": f"{rng.uniform(0, 1e4):.2f}",
+            "transportation_cost": f"{rng.uniform(0, 1e5):.2f}",
+            "gst": f"33AAAC{rng.randint(1000, 9999)}Z1Z{rng.randint(0, 9)}",
+            "bank_name": rng.choice(["State Bank of India", "Indian Bank", "Canara Bank"]),
+            "account_number": str(rng.randint(10**11, 10**12)),
+            "ifsc_code": f"SBIN000{rng.randint(1000, 9999)}",
+            "bank_address": "Branch office, Anna Salai",
+            "erection_start_date": "2024-06-15",
+            "commissioning_start_date": "2024-09-01",
+            "project_completion_date": None,
+            "weighment_folder_name": f"site_{i}_weighment",
+            "verification_document": f"/uploads/site/verification/site_{i}.pdf",
+            "document_view": None,
+            "petty_cash": f"{rng.uniform(0, 5e4):.2f}",
+            "proposed_change": None,
+            "remarks": rng.choice(["", "Awaiting EB connection", "Zone 3 under review"]),
+            "is_active": True,
+            "is_deleted": False,
+            "created_at": "2024-03-11T10:22:31.114000+05:30",
+            "updated_at": "2025-01-04T16:02:11.902000+05:30",
+            "created_by": "admin",
+            "updated_by": "ops",
+        }
+        rows.append(row)
+    return rows
+
+
+class Command(BaseCommand):
+    help = "Measure CPU cost vs. bytes saved per content coding on a Site-list JSON body."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", type=int, default=500)
+        parser.add_argument("--iterations", type=int, default=20)
+
+    def handle(self, *args, **options):
+        body = json.dumps({"count": options["rows"], "results": _site_rows(options["rows"])}).encode()
+        iterations = options["iterations"]
+        chunk_size = settings.GATEWAY_STREAM_CHUNK_SIZE
+        chunks = [body[i:i + chunk_size] for i in range(0, len(body), chunk_size)]
+
+        self.stdout.write(
+            f"body {len(body) / 1024:.1f} KiB ({options['rows']} rows), "
+            f"codings: {', '.join(ENCODERS)} (install brotli / zstandard for br / zstd)"
+        )
+        self.stdout.write(
+            f"{'coding':<6} {'level':>5} {'mode':<9} {'size KiB':>9} {'ratio':>6} "
+            f"{'saved':>6} {'enc ms':>8} {'enc MB/s':>9} {'dec ms':>7}"
+        )
+
+        for coding, encoder_class in ENCODERS.items():
+            for level in LEVELS.get(coding, (None,)):
+                for mode in ("one-shot", "stream"):
+                    started = time.perf_counter()
+                    for _ in range(iterations):
+                        encoder = encoder_class(level)
+                        if mode == "one-shot":
+                            encoded = encoder.compress(body) + encoder.finish()
+                        else:
+                            encoded = b"".join(encoder.compress(c) + encoder.flush() for c in chunks) + encoder.finish()
+                    encode_time = (time.perf_counter() - started) / iterations
+
+                    started = time.perf_counter()
+                    for _ in range(iterations):
+                        decoder = DECODERS[coding]()
+                        decoded = decoder.decompress(encoded) + decoder.finish()
+                    decode_time = (time.perf_counter() - started) / iterations
+                    assert decoded == body
+
+                    self.stdout.write(
+                        f"{coding:<6} {level:>5} {mode:<9} {len(encoded) / 1024:>9.1f} "
+                        f"{len(body) / len(encoded):>6.1f} {1 - len(encoded) / len(body):>6.1%} "
+                        f"{encode_time * 1000:>8.2f} {len(body) / encode_time / 1e6:>9.1f} "
+                        f"{decode_time * 1000:>7.2f}"
+                    )
@@ -0,0 +1,107 @@
+"""
+Load test: balancing across upstream replicas
+---------------------------------------------
+Starts several stand-in replicas (one slower than the rest, one answering
+503, one not listening at all) and sends the same request volume through
+``UpstreamProxy`` with each balancer, reporting how requests spread over
+the replicas, their latency EWMA and passive ejections.
+
+    python manage.py loadtest_balancer --requests 2000 --threads 32
+"""
+
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.test import RequestFactory
+
+from gateway.services import upstream as upstream_module
+from gateway.services.balancer import BALANCERS
+from gateway.services.routes import match_route
+from gateway.services.standin import StandinUpstream
+from gateway.views.proxy import UpstreamProxy
+
+# Uncached route: every request must reach the upstream
+PATH = "/api/master/api/v1/masters/sites/"
+UPSTREAM = match_route(PATH).upstream
+PAYLOAD = {"sub": "1", "username": "loadtest", "groups": []}
+
+
+class Command(BaseCommand):
+    help = "Compare upstream balancers against stand-in replicas (healthy, slow, failing, down)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--requests", type=int, default=1000)
+        parser.add_argument("--threads", type=int, default=16)
+        parser.add_argument("--replicas", type=int, default=3, help="Healthy replicas.")
+        parser.add_argument("--delay", type=float, default=0.01, help="Healthy replica delay (seconds).")
+        parser.add_argument("--slow-delay", type=float, default=0.1, help="Slow replica delay (seconds).")
+        parser.add_argument("--balancers", default=",".join(BALANCERS))
+
+    def handle(self, *args, **options):
+        standins = [StandinUpstream(delay=options["delay"]) for _ in range(options["replicas"])]
+        standins.append(StandinUpstream(delay=options["slow_delay"]))
+        standins.append(StandinUpstream(status=503))
+        endpoints = [standin.start() for standin in standins]
+
+        # A replica that is down: a port that was open a moment ago.
+        down = StandinUpstream()
+        endpoints.append(down.start())
+        down.stop()
+
+        labels = ["healthy"] * options["replicas"] + ["slow", "503", "down"]
+        conf = settings.UPSTREAM_POOLS[UPSTREAM]
+        conf["ENDPOINTS"] = endpoints
+        conf["MAX_SIZE"] = max(conf.get("MAX_SIZE", 20), options["threads"])
+        # Replica ejection is under test: keep the pool-wide breaker and
+        # bulkhead from rejecting calls before a replica is picked.
+        conf["MAX_CONCURRENT"] = 0
+        conf["CIRCUIT_BREAKER"] = {
+            **conf.get("CIRCUIT_BREAKER", {}),
+            "MIN_CALLS": options["requests"] * 10,
+        }
+
+        try:
+            for balancer in options["balancers"].split(","):
+                conf["BALANCER"] = balancer
+                self._run(balancer, labels, options["requests"], options["threads"])
+        finally:
+            for standin in standins:
+                standin.stop()
+
+    def _run(self, balancer, labels, total, threads):
+        # Fresh pool (and endpoint stats) per balancer.
+        pool = upstream_module._pools.pop(UPSTREAM, None)
+        if pool is not None:
+            pool.close()
+        pool = upstream_module.get_pool(UPSTREAM)
+
+        factory = RequestFactory()
+        view = UpstreamProxy.as_view()
+
+        def one(_):
+            request = factory.get(PATH)
+            request.jwt_payload = PAYLOAD
+            response = view(request)
+            if response.streaming:
+                b"".join(response.streaming_content)
+            response.close()
+            return response.status_code
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=threads) as executor:
+            statuses = list(executor.map(one, range(total)))
+        elapsed = time.perf_counter() - started
+
+        errors = sum(1 for status in statuses if status >= 500)
+        self.stdout.write(
+            f"\n{balancer}: {total / elapsed:.0f} req/s, {errors} errors ({errors / total:.1%})"
+        )
+        self.stdout.write(f"  {'replica':<8} {'requests':>9} {'failures':>9} {'ewma ms':>8} {'ejections':>10}")
+        for label, stats in zip(labels, pool.stats()["endpoints"]):
+            self.stdout.write(
+                f"  {label:<8} {stats['requests']:>9} {stats['failures']:>9} "
+                f"{stats['latency_ewma_ms']:>8} {stats['ejections']:>10}"
+            )
+        pool.close()
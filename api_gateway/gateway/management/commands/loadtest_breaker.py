@@ -0,0 +1,95 @@
+"""
+Load test: circuit breaker and bulkhead
+---------------------------------------
+Sends traffic through ``UpstreamProxy`` to a stand-in upstream that turns
+slow, then recovers, and reports per phase how many requests were served,
+failed fast (503 without waiting on the upstream) and how long they took.
+
+    python manage.py loadtest_breaker --requests 200 --slow-delay 3
+    python manage.py loadtest_breaker --no-breaker   # same run, unprotected
+"""
+
+import statistics
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.test import RequestFactory
+
+from gateway.services import upstream as upstream_module
+from gateway.services.routes import match_route
+from gateway.services.standin import StandinUpstream
+from gateway.views.proxy import UpstreamProxy
+
+# Uncached route: every request must reach the upstream
+PATH = "/api/master/api/v1/masters/sites/"
+UPSTREAM = match_route(PATH).upstream
+PAYLOAD = {"sub": "1", "username": "loadtest", "groups": []}
+
+
+class Command(BaseCommand):
+    help = "Show fast-fail behaviour of the upstream circuit breaker against a slow stand-in."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--requests", type=int, default=200, help="Requests per phase.")
+        parser.add_argument("--threads", type=int, default=16)
+        parser.add_argument("--slow-delay", type=float, default=3.0, help="Upstream delay while degraded.")
+        parser.add_argument("--open-duration", type=float, default=2.0)
+        parser.add_argument("--no-breaker", action="store_true", help="Disable the breaker for comparison.")
+
+    def handle(self, *args, **options):
+        standin = StandinUpstream(delay=options["slow_delay"])
+        conf = settings.UPSTREAM_POOLS[UPSTREAM]
+        conf["ENDPOINTS"] = [standin.start()]
+        conf["MAX_SIZE"] = max(conf.get("MAX_SIZE", 20), options["threads"])
+        breaker = dict(conf.get("CIRCUIT_BREAKER", {}))
+        breaker["OPEN_DURATION"] = options["open_duration"]
+        breaker["SLOW_CALL_DURATION"] = min(options["slow_delay"] / 2, breaker.get("SLOW_CALL_DURATION", 2))
+        if options["no_breaker"]:
+            breaker["MIN_CALLS"] = options["requests"] * 10
+        conf["CIRCUIT_BREAKER"] = breaker
+
+        pool = upstream_module._pools.pop(UPSTREAM, None)
+        if pool is not None:
+            pool.close()
+        pool = upstream_module.get_pool(UPSTREAM)
+
+        try:
+            self._phase("degraded", pool, options)
+            standin.delay = 0
+            time.sleep(options["open_duration"])
+            self._phase("recovered", pool, options)
+        finally:
+            pool.close()
+            standin.stop()
+
+    def _phase(self, name, pool, options):
+        factory = RequestFactory()
+        view = UpstreamProxy.as_view()
+
+        def one(_):
+            request = factory.get(PATH)
+            request.jwt_payload = PAYLOAD
+            started = time.perf_counter()
+            response = view(request)
+            if response.streaming:
+                b"".join(response.streaming_content)
+            response.close()
+            return response.status_code, time.perf_counter() - started
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=options["threads"]) as executor:
+            results = list(executor.map(one, range(options["requests"])))
+        elapsed = time.perf_counter() - started
+
+        statuses = Counter(status for status, _ in results)
+        latencies = sorted(latency for _, latency in results)
+        p99 = latencies[min(int(len(latencies) * 0.99), len(latencies) - 1)]
+        breaker = pool.breaker.stats()
+        self.stdout.write(
+            f"{name:<10} {elapsed:6.2f}s  statuses {dict(statuses)}  "
+            f"p50 {statistics.median(latencies) * 1000:.1f} ms  p99 {p99 * 1000:.1f} ms  "
+            f"breaker {breaker['state']} (opened {breaker['opened']}, rejected {breaker['rejected']})"
+        )
@@ -0,0 +1,105 @@
+"""
+Load test: request coalescing
+-----------------------------
+Fires bursts of identical concurrent GETs at a coalescing route (as a
+dashboard load does) through the sync and async proxy paths, and reports
+how many reached the stand-in upstream. The response cache is bypassed
+(``Cache-Control: no-cache``) so only single-flight is measured.
+
+    python manage.py loadtest_coalesce --clients 50 --bursts 5 --delay 0.2
+"""
+
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.test import AsyncRequestFactory, RequestFactory
+
+from gateway.services.coalesce import single_flight
+from gateway.services.routes import match_route
+from gateway.services.standin import StandinUpstream
+from gateway.services.upstream import get_async_client, get_pool
+from gateway.views.proxy import AsyncUpstreamProxy, UpstreamProxy
+
+PATH = "/api/master/api/v1/masters/countries/"
+ROUTE = match_route(PATH)
+PAYLOAD = {"sub": "1", "username": "loadtest", "groups": ["ops"]}
+
+
+class Command(BaseCommand):
+    help = "Measure how many identical concurrent GETs single-flight collapses."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--clients", type=int, default=50, help="Concurrent identical GETs per burst.")
+        parser.add_argument("--bursts", type=int, default=5)
+        parser.add_argument("--delay", type=float, default=0.2, help="Upstream response delay (seconds).")
+        parser.add_argument("--mode", choices=["both", "sync", "async"], default="both")
+
+    def handle(self, *args, **options):
+        if not ROUTE.coalesce:
+            self.stderr.write(f"Route {ROUTE.prefix} does not have COALESCE enabled")
+            return
+
+        standin = StandinUpstream(delay=options["delay"])
+        conf = settings.UPSTREAM_POOLS[ROUTE.upstream]
+        conf["ENDPOINTS"] = [standin.start()]
+        conf["MAX_SIZE"] = max(conf.get("MAX_SIZE", 20), options["clients"])
+        conf["MAX_CONCURRENT"] = 0
+
+        try:
+            if options["mode"] in ("both", "sync"):
+                self._report("sync", standin, options, self._run_sync)
+            if options["mode"] in ("both", "async"):
+                self._report("async", standin, options, lambda o: asyncio.run(self._run_async(o)))
+        finally:
+            get_pool(ROUTE.upstream).close()
+            standin.stop()
+
+    def _report(self, mode, standin, options, run):
+        standin.reset_stats()
+        before = single_flight.stats()
+        started = time.perf_counter()
+        statuses = run(options)
+        elapsed = time.perf_counter() - started
+        after = single_flight.stats()
+
+        total = options["clients"] * options["bursts"]
+        self.stdout.write(
+            f"{mode:>5}: {total} client GETs -> {standin.requests} upstream calls "
+            f"(collapsed {after['collapsed'] - before['collapsed']}), "
+            f"{elapsed:.2f}s, errors {sum(1 for s in statuses if s != 200)}"
+        )
+
+    def _run_sync(self, options):
+        factory = RequestFactory()
+        view = UpstreamProxy.as_view()
+
+        def one(_):
+            request = factory.get(PATH, headers={"Cache-Control": "no-cache"})
+            request.jwt_payload = PAYLOAD
+            return view(request).status_code
+
+        statuses = []
+        with ThreadPoolExecutor(max_workers=options["clients"]) as executor:
+            for _ in range(options["bursts"]):
+                statuses += executor.map(one, range(options["clients"]))
+        return statuses
+
+    async def _run_async(self, options):
+        factory = AsyncRequestFactory()
+        view = AsyncUpstreamProxy.as_view()
+
+        async def one():
+            request = factory.get(PATH, headers={"Cache-Control": "no-cache"})
+            request.jwt_payload = PAYLOAD
+            return (await view(request)).status_code
+
+        statuses = []
+        try:
+            for _ in range(options["bursts"]):
+                statuses += await asyncio.gather(*(one() for _ in range(options["clients"])))
+        finally:
+            await get_async_client(ROUTE.upstream).close()
+        return statuses
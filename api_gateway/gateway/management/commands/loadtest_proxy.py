@@ -0,0 +1,128 @@
+"""
+Load test: sync vs. async proxy path
+------------------------------------
+Drives ``UpstreamProxy`` (thread pool, as under WSGI) and
+``AsyncUpstreamProxy`` (single event loop, as under ASGI) against a
+local stand-in upstream with a fixed response delay, and reports the
+concurrency each path sustains.
+
+    python manage.py loadtest_proxy --requests 2000 --delay 0.5 --threads 32
+"""
+
+import asyncio
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.test import AsyncRequestFactory, RequestFactory
+
+from gateway.services.standin import StandinUpstream
+from gateway.services.upstream import get_async_client, get_pool
+from gateway.services.routes import match_route
+from gateway.views.proxy import AsyncUpstreamProxy, UpstreamProxy
+
+# Uncached route: every request must reach the upstream
+PATH = "/api/master/api/v1/masters/sites/"
+UPSTREAM = match_route(PATH).upstream
+PAYLOAD = {"sub": "1", "username": "loadtest", "groups": []}
+
+
+class Command(BaseCommand):
+    help = "Compare concurrency of the sync and async proxy paths against a stand-in upstream."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--requests", type=int, default=1000)
+        parser.add_argument("--delay", type=float, default=0.2, help="Upstream response delay (seconds).")
+        parser.add_argument("--threads", type=int, default=16, help="Worker threads for the sync path.")
+        parser.add_argument("--mode", choices=["both", "sync", "async"], default="both")
+
+    def handle(self, *args, **options):
+        upstream = StandinUpstream(delay=options["delay"])
+        base_url = upstream.start()
+
+        # Point the routed upstream at the stand-in before any pool/client is built.
+        conf = settings.UPSTREAM_POOLS[UPSTREAM]
+        conf["BASE_URL"] = base_url
+        conf["MAX_SIZE"] = max(conf.get("MAX_SIZE", 20), options["threads"])
+        conf["MAX_CONCURRENT"] = 0  # measure raw concurrency, no bulkhead
+
+        self.stdout.write(
+            f"{options['requests']} requests, upstream delay {options['delay']}s, "
+            f"stand-in at {base_url}"
+        )
+
+        try:
+            if options["mode"] in ("both", "sync"):
+                self._report("sync", upstream, self._run_sync(options["requests"], options["threads"]))
+            if options["mode"] in ("both", "async"):
+                self._report("async", upstream, asyncio.run(self._run_async(options["requests"])))
+        finally:
+            get_pool(UPSTREAM).close()
+            upstream.stop()
+
+    # ------------------------------------------------------------
+    # Runners
+    # ------------------------------------------------------------
+
+    def _run_sync(self, total, threads):
+        factory = RequestFactory()
+        view = UpstreamProxy.as_view()
+
+        def one():
+            request = factory.get(PATH)
+            request.jwt_payload = PAYLOAD
+            started = time.perf_counter()
+            response = view(request)
+            if response.streaming:
+                b"".join(response.streaming_content)
+            response.close()
+            return response.status_code, time.perf_counter() - started
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=threads) as executor:
+            results = list(executor.map(lambda _: one(), range(total)))
+        return results, time.perf_counter() - started
+
+    async def _run_async(self, total):
+        factory = AsyncRequestFactory()
+        view = AsyncUpstreamProxy.as_view()
+
+        async def one():
+            request = factory.get(PATH)
+            request.jwt_payload = PAYLOAD
+            started = time.perf_counter()
+            response = await view(request)
+            if response.streaming:
+                async for _ in response.streaming_content:
+                    pass
+            response.close()
+            return response.status_code, time.perf_counter() - started
+
+        started = time.perf_counter()
+        results = await asyncio.gather(*(one() for _ in range(total)))
+        elapsed = time.perf_counter() - started
+
+        await get_async_client(UPSTREAM).close()
+        return results, elapsed
+
+    # ------------------------------------------------------------
+    # Output
+    # ------------------------------------------------------------
+
+    def _report(self, label, upstream, outcome):
+        results, elapsed = outcome
+        latencies = sorted(latency for _, latency in results)
+        errors = sum(1 for status, _ in results if status >= 500)
+        p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))]
+
+        self.stdout.write(
+            f"{label:>5}: {len(results) / elapsed:8.1f} req/s  "
+            f"wall {elapsed:6.2f}s  "
+            f"p50 {statistics.median(latencies) * 1000:7.1f}ms  "
+            f"p99 {p99 * 1000:7.1f}ms  "
+            f"peak upstream concurrency {upstream.peak_in_flight:5d}  "
+            f"errors {errors}"
+        )
+        upstream.reset_stats()
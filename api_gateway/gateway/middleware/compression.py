@@ -0,0 +1,82 @@
+from django.conf import settings
+from django.utils.cache import patch_vary_headers
+from django.utils.deprecation import MiddlewareMixin
+
+from gateway.services.compression import (
+    COMPRESSIBLE_RE,
+    ENCODERS,
+    aencode_chunks,
+    encode_chunks,
+    negotiate,
+    parse_accept_encoding,
+)
+
+DEFAULT_LEVELS = {"gzip": 6, "br": 4, "zstd": 3}
+
+
+class CompressionMiddleware(MiddlewareMixin):
+    """
+    Compress responses with the best coding the client accepts
+    (``GATEWAY_COMPRESSION["ENCODINGS"]`` order breaks q-value ties).
+
+    Bodies that already carry a Content-Encoding (relayed from the upstream
+    as-is) are left alone. Streaming responses are compressed chunk by
+    chunk, so the proxy keeps relaying without buffering; responses known
+    to be under ``MIN_SIZE`` bytes are sent uncompressed.
+    """
+
+    def __init__(self, get_response):
+        super().__init__(get_response)
+        conf = settings.GATEWAY_COMPRESSION
+        self.preferences = [coding for coding in conf["ENCODINGS"] if coding in ENCODERS]
+        self.min_size = conf.get("MIN_SIZE", 1024)
+        self.levels = {**DEFAULT_LEVELS, **conf.get("LEVELS", {})}
+
+    def _compressible(self, response) -> bool:
+        if response.has_header("Content-Encoding"):
+            return False
+        if response.status_code < 200 or response.status_code in (204, 304):
+            return False
+        if "no-transform" in response.get("Cache-Control", ""):
+            return False
+        if not COMPRESSIBLE_RE.match(response.get("Content-Type", "")):
+            return False
+
+        if response.streaming:
+            length = response.get("Content-Length")
+            # Unknown length: assume it is worth it
+            return length is None or not length.isdigit() or int(length) >= self.min_size
+        return len(response.content) >= self.min_size
+
+    def process_response(self, request, response):
+        if not self.preferences or not self._compressible(response):
+            return response
+
+        patch_vary_headers(response, ("Accept-Encoding",))
+
+        accepted = parse_accept_encoding(request.headers.get("Accept-Encoding"))
+        coding = negotiate(accepted, self.preferences)
+        if coding is None:
+            return response
+
+        encoder = ENCODERS[coding](self.levels[coding])
+        if response.streaming:
+            if response.is_async:
+                response.streaming_content = aencode_chunks(response.streaming_content, encoder)
+            else:
+                response.streaming_content = encode_chunks(response.streaming_content, encoder)
+            # Compressed size is only known once the stream ends
+            del response.headers["Content-Length"]
+        else:
+            compressed = encoder.compress(response.content) + encoder.finish()
+            if len(compressed) >= len(response.content):
+                return response
+            response.content = compressed
+            response.headers["Content-Length"] = str(len(compressed))
+
+        # The body changed: a strong validator would now be wrong
+        etag = response.get("ETag")
+        if etag and etag.startswith('"'):
+            response.headers["ETag"] = "W/" + etag
+        response.headers["Content-Encoding"] = coding
+        return response
@@ -1,26 +1,56 @@
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
 from django.http import JsonResponse
 from erp_jwt.decoder import decode_token, JWTExpiredError, JWTInvalidError
+from erp_tracing.tracer import span
 
-
-EXACT_EXCLUDED_PATHS = {
-    "/api/auth/login/",
-    "/api/auth/refresh/",
-}
-
-# Allow unauthenticated access to master-service API docs through the gateway.
-PREFIX_EXCLUDED_PATHS = (
-    "/api/master/api/docs/",
-)
+from gateway.services.metrics import JWT_VERIFY_SECONDS
+from gateway.services.routes import get_route_table
 
 
 class JWTAuthenticationMiddleware:
+    # Works under both WSGI and ASGI: token verification is pure CPU work,
+    # so the async path only has to await the rest of the chain.
+    sync_capable = True
+    async_capable = True
+
     def __init__(self, get_response):
         self.get_response = get_response
+        # Compiled once at startup; a bad GATEWAY_ROUTES fails here, not per request.
+        self.routes = get_route_table()
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
 
     def __call__(self, request):
-        # Skip auth for excluded paths
-        if request.path in EXACT_EXCLUDED_PATHS or request.path.startswith(PREFIX_EXCLUDED_PATHS):
-            return self.get_response(request)
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+
+        rejection = self._authenticate(request)
+        if rejection is not None:
+            return rejection
+        return self.get_response(request)
+
+    async def __acall__(self, request):
+        rejection = self._authenticate(request)
+        if rejection is not None:
+            return rejection
+        return await self.get_response(request)
+
+    def _authenticate(self, request):
+        """
+        Validate the bearer token and attach ``request.jwt_payload``.
+
+        Returns an error response to short-circuit the request, or None
+        when the request may proceed.
+        """
+        # Routes are matched once here; the proxy reuses request.gateway_route
+        route = self.routes.match(request.path)
+        request.gateway_route = route
+
+        # Skip auth for public routes (unknown paths still require a token)
+        if route is not None and not route.auth:
+            return None
 
         auth_header = request.headers.get("Authorization")
 
@@ -32,14 +62,19 @@ class JWTAuthenticationMiddleware:
 
         token = auth_header.split(" ")[1]
 
+        started = time.perf_counter()
         try:
-            payload = decode_token(token, expected_type="access")
+            with span("jwt.verify"):
+                payload = decode_token(token, expected_type="access")
         except JWTExpiredError:
+            JWT_VERIFY_SECONDS.observe(time.perf_counter() - started, "expired")
             return JsonResponse({"detail": "Token expired"}, status=401)
         except JWTInvalidError:
+            JWT_VERIFY_SECONDS.observe(time.perf_counter() - started, "invalid")
             return JsonResponse({"detail": "Invalid token"}, status=401)
+        JWT_VERIFY_SECONDS.observe(time.perf_counter() - started, "ok")
 
         # Attach user context to request
         request.jwt_payload = payload
 
-        return self.get_response(request)
+        return None
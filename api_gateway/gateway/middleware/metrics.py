@@ -0,0 +1,96 @@
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+
+from gateway.services.metrics import REQUEST_BYTES, REQUEST_SECONDS, RESPONSE_BYTES
+from gateway.services.routes import match_route
+
+# Anything else is recorded as "OTHER" (bounded label values)
+METHODS = frozenset(("GET", "HEAD", "POST", "PUT", "PATCH", "DELETE", "OPTIONS"))
+
+
+def _route_labels(request):
+    # The JWT middleware has matched the route unless an outer middleware
+    # answered first (e.g. a CORS preflight)
+    route = getattr(request, "gateway_route", None) or match_route(request.path)
+    if route is None:
+        return "unmatched", "none"
+    return route.prefix, route.upstream or "local"
+
+
+def _counted(chunks, done):
+    size = 0
+    try:
+        for chunk in chunks:
+            size += len(chunk)
+            yield chunk
+    finally:
+        done(size)
+
+
+async def _acounted(chunks, done):
+    size = 0
+    try:
+        async for chunk in chunks:
+            size += len(chunk)
+            yield chunk
+    finally:
+        done(size)
+
+
+class MetricsMiddleware:
+    """
+    Records request duration and body sizes per route, upstream, method
+    and status (see gateway/services/metrics.py).
+
+    Outermost middleware, so durations cover the whole gateway and response
+    sizes are the bytes actually sent. Streaming bodies are counted as
+    they are sent and recorded when the stream ends.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+
+        started = time.perf_counter()
+        response = self.get_response(request)
+        return self._record(request, response, started)
+
+    async def __acall__(self, request):
+        started = time.perf_counter()
+        response = await self.get_response(request)
+        return self._record(request, response, started)
+
+    def _record(self, request, response, started):
+        elapsed = time.perf_counter() - started
+        route, upstream = _route_labels(request)
+        method = request.method if request.method in METHODS else "OTHER"
+        status = str(response.status_code)
+
+        REQUEST_SECONDS.observe(elapsed, route, upstream, method, status)
+        try:
+            request_bytes = int(request.META.get("CONTENT_LENGTH") or 0)
+        except ValueError:
+            request_bytes = 0
+        REQUEST_BYTES.observe(request_bytes, route, upstream, method)
+
+        if not response.streaming:
+            RESPONSE_BYTES.observe(len(response.content), route, upstream, method, status)
+            return response
+
+        def done(size):
+            RESPONSE_BYTES.observe(size, route, upstream, method, status)
+
+        if response.is_async:
+            response.streaming_content = _acounted(response.streaming_content, done)
+        else:
+            response.streaming_content = _counted(response.streaming_content, done)
+        return response
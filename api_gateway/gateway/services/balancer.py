@@ -0,0 +1,174 @@
+"""
+Client-side load balancing across upstream replicas.
+
+An upstream pool may list several ``ENDPOINTS`` (base URLs of identical
+replicas). Each proxied request picks one through the pool's balancer:
+
+- ``round_robin``:        endpoints in turn
+- ``least_outstanding``:  fewest requests currently in flight (ties by
+                          lower latency)
+- ``p2c``:                power of two choices: two random endpoints,
+                          the one with fewer in flight (ties by latency);
+                          near least-outstanding quality without
+                          scanning every endpoint
+
+Passive health checking: an endpoint that fails ``EJECT_AFTER`` times in
+a row (connection error or 5xx) is taken out of rotation for
+``EJECT_DURATION`` seconds, doubling on each consecutive ejection up to
+``MAX_EJECT_DURATION``. One success resets it. When every endpoint is
+ejected the balancer ignores ejection rather than failing all traffic.
+
+Per-endpoint stats: requests, failures, in flight, ejections and an
+exponentially weighted moving average of response latency.
+"""
+
+import random
+import threading
+import time
+
+
+class Endpoint:
+    # EWMA weight of the newest latency sample
+    ALPHA = 0.2
+
+    def __init__(self, base_url: str, eject_after: int, eject_duration: float, max_eject_duration: float):
+        self.base_url = base_url.rstrip("/")
+        self.eject_after = eject_after
+        self.eject_duration = eject_duration
+        self.max_eject_duration = max_eject_duration
+
+        self._lock = threading.Lock()
+        self.outstanding = 0
+        self.latency_ewma = 0.0
+        self.requests = 0
+        self.failures = 0
+        self.consecutive_failures = 0
+        self.ejections = 0
+        self.consecutive_ejections = 0
+        self.ejected_until = 0.0
+
+    def url(self, path: str) -> str:
+        return f"{self.base_url}/{path.lstrip('/')}"
+
+    def available(self, now: float) -> bool:
+        return self.ejected_until <= now
+
+    def begin(self) -> None:
+        with self._lock:
+            self.outstanding += 1
+            self.requests += 1
+
+    def end(self, latency: float | None, failed: bool) -> None:
+        """
+        Record a finished request.
+
+        :param latency: seconds until the response headers arrived (None
+                        when no response was received)
+        :param failed: connection error or 5xx
+        """
+        with self._lock:
+            self.outstanding -= 1
+            if latency is not None:
+                if self.latency_ewma:
+                    self.latency_ewma += self.ALPHA * (latency - self.latency_ewma)
+                else:
+                    self.latency_ewma = latency
+
+            if not failed:
+                self.consecutive_failures = 0
+                self.consecutive_ejections = 0
+                return
+
+            self.failures += 1
+            self.consecutive_failures += 1
+            if self.consecutive_failures >= self.eject_after:
+                duration = min(
+                    self.eject_duration * 2 ** self.consecutive_ejections,
+                    self.max_eject_duration,
+                )
+                self.ejected_until = time.monotonic() + duration
+                self.ejections += 1
+                self.consecutive_ejections += 1
+                self.consecutive_failures = 0
+
+    def stats(self, now: float) -> dict:
+        with self._lock:
+            return {
+                "base_url": self.base_url,
+                "outstanding": self.outstanding,
+                "requests": self.requests,
+                "failures": self.failures,
+                "latency_ewma_ms": round(self.latency_ewma * 1000, 2),
+                "ejected": not self.available(now),
+                "ejections": self.ejections,
+            }
+
+
+def _load(endpoint: Endpoint):
+    return endpoint.outstanding, endpoint.latency_ewma
+
+
+class RoundRobinBalancer:
+    def __init__(self):
+        self._next = 0
+        self._lock = threading.Lock()
+
+    def choose(self, candidates: list) -> Endpoint:
+        with self._lock:
+            index = self._next
+            self._next += 1
+        return candidates[index % len(candidates)]
+
+
+class LeastOutstandingBalancer:
+    def choose(self, candidates: list) -> Endpoint:
+        return min(candidates, key=_load)
+
+
+class PowerOfTwoChoicesBalancer:
+    def choose(self, candidates: list) -> Endpoint:
+        if len(candidates) == 1:
+            return candidates[0]
+        first, second = random.sample(candidates, 2)
+        return first if _load(first) <= _load(second) else second
+
+
+BALANCERS = {
+    "round_robin": RoundRobinBalancer,
+    "least_outstanding": LeastOutstandingBalancer,
+    "p2c": PowerOfTwoChoicesBalancer,
+}
+
+
+class EndpointSet:
+    """The replicas of one upstream and the policy choosing between them."""
+
+    def __init__(
+        self,
+        base_urls,
+        balancer: str = "p2c",
+        eject_after: int = 3,
+        eject_duration: float = 10.0,
+        max_eject_duration: float = 120.0,
+    ):
+        self.endpoints = [
+            Endpoint(url, eject_after, eject_duration, max_eject_duration)
+            for url in base_urls
+        ]
+        self.balancer_name = balancer
+        self.balancer = BALANCERS[balancer]()
+
+    def pick(self) -> Endpoint:
+        """Choose an endpoint for one request and count it as in flight."""
+        if len(self.endpoints) == 1:
+            endpoint = self.endpoints[0]
+        else:
+            now = time.monotonic()
+            candidates = [e for e in self.endpoints if e.available(now)] or self.endpoints
+            endpoint = self.balancer.choose(candidates)
+        endpoint.begin()
+        return endpoint
+
+    def stats(self) -> list:
+        now = time.monotonic()
+        return [endpoint.stats(now) for endpoint in self.endpoints]
@@ -0,0 +1,217 @@
+"""
+Circuit breaker and bulkhead for upstream calls.
+
+A slow or failing upstream must not take the gateway down with it: without
+protection every worker thread waits the full upstream timeout and the
+gateway stops answering anything, including routes whose upstream is fine.
+
+``CircuitBreaker`` (one per upstream) tracks the outcome of the last
+``WINDOW`` calls:
+
+- closed:     calls go through; once at least ``MIN_CALLS`` are recorded and
+              the failure rate (connection errors, timeouts, 5xx) or the
+              slow-call rate (``SLOW_CALL_DURATION`` or more until the
+              response headers) reaches its threshold, the circuit opens
+- open:       calls are rejected immediately (503) for ``OPEN_DURATION``
+              seconds
+- half-open:  up to ``HALF_OPEN_CALLS`` probe calls go through; all of them
+              succeeding closes the circuit, any failure reopens it
+
+``Bulkhead`` caps the requests in flight to one upstream; requests over the
+cap are rejected immediately instead of queueing for a pooled connection.
+"""
+
+import logging
+import threading
+import time
+from collections import deque
+
+logger = logging.getLogger(__name__)
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitBreaker:
+    def __init__(
+        self,
+        name: str,
+        window: int = 50,
+        min_calls: int = 10,
+        failure_rate: float = 0.5,
+        slow_call_duration: float = 2.0,
+        slow_call_rate: float = 0.8,
+        open_duration: float = 10.0,
+        half_open_calls: int = 3,
+    ):
+        self.name = name
+        self.window = window
+        self.min_calls = min_calls
+        self.failure_rate = failure_rate
+        self.slow_call_duration = slow_call_duration
+        self.slow_call_rate = slow_call_rate
+        self.open_duration = open_duration
+        self.half_open_calls = half_open_calls
+
+        self._lock = threading.Lock()
+        self.state = CLOSED
+        self._outcomes = deque()  # (failed, slow) of the last `window` calls
+        self._failures = 0
+        self._slow = 0
+        self._opened_at = 0.0
+        self._probes = 0
+        self._probe_successes = 0
+
+        # Counters
+        self._opened = 0
+        self._rejected = 0
+
+    # ------------------------------------------------------------
+    # State transitions (lock held)
+    # ------------------------------------------------------------
+
+    def _reset_window(self):
+        self._outcomes.clear()
+        self._failures = 0
+        self._slow = 0
+
+    def _open(self, now: float):
+        logger.warning("Circuit opened for upstream %s (was %s)", self.name, self.state)
+        self.state = OPEN
+        self._opened_at = now
+        self._opened += 1
+        self._reset_window()
+
+    def _close(self):
+        logger.warning("Circuit closed for upstream %s", self.name)
+        self.state = CLOSED
+        self._reset_window()
+
+    def _should_open(self) -> bool:
+        calls = len(self._outcomes)
+        if calls < self.min_calls:
+            return False
+        return (
+            self._failures / calls >= self.failure_rate
+            or self._slow / calls >= self.slow_call_rate
+        )
+
+    # ------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------
+
+    def allow(self) -> bool:
+        """
+        Whether a call may go to the upstream now.
+
+        Every allowed call must be followed by ``record()`` or ``cancel()``.
+        """
+        with self._lock:
+            if self.state == CLOSED:
+                return True
+
+            now = time.monotonic()
+            if self.state == OPEN:
+                if now - self._opened_at < self.open_duration:
+                    self._rejected += 1
+                    return False
+                self.state = HALF_OPEN
+                self._probes = 0
+                self._probe_successes = 0
+
+            if self._probes >= self.half_open_calls:
+                self._rejected += 1
+                return False
+            self._probes += 1
+            return True
+
+    def record(self, latency: float | None, failed: bool) -> None:
+        """
+        Record the outcome of an allowed call.
+
+        :param latency: seconds until the response headers arrived (None
+                        when no response was received)
+        :param failed: connection error, timeout or 5xx
+        """
+        slow = latency is not None and latency >= self.slow_call_duration
+        with self._lock:
+            if self.state == HALF_OPEN:
+                if failed or slow:
+                    self._open(time.monotonic())
+                else:
+                    self._probe_successes += 1
+                    if self._probe_successes >= self.half_open_calls:
+                        self._close()
+                return
+
+            if self.state == OPEN:
+                # Call admitted before the circuit opened.
+                return
+
+            self._outcomes.append((failed, slow))
+            self._failures += failed
+            self._slow += slow
+            if len(self._outcomes) > self.window:
+                old_failed, old_slow = self._outcomes.popleft()
+                self._failures -= old_failed
+                self._slow -= old_slow
+
+            if self._should_open():
+                self._open(time.monotonic())
+
+    def cancel(self) -> None:
+        """An allowed call never reached the upstream (frees a probe slot)."""
+        with self._lock:
+            if self.state == HALF_OPEN and self._probes > 0:
+                self._probes -= 1
+
+    def retry_after(self) -> int:
+        """Whole seconds until the circuit lets a probe through."""
+        with self._lock:
+            if self.state != OPEN:
+                return 1
+            remaining = self.open_duration - (time.monotonic() - self._opened_at)
+        return max(int(remaining + 0.999), 1)
+
+    def stats(self) -> dict:
+        with self._lock:
+            calls = len(self._outcomes)
+            return {
+                "state": self.state,
+                "calls": calls,
+                "failure_rate": round(self._failures / calls, 3) if calls else 0.0,
+                "slow_call_rate": round(self._slow / calls, 3) if calls else 0.0,
+                "opened": self._opened,
+                "rejected": self._rejected,
+            }
+
+
+class Bulkhead:
+    """Non-blocking cap on concurrent calls (0 = unlimited)."""
+
+    def __init__(self, limit: int = 0):
+        self.limit = limit
+        self._lock = threading.Lock()
+        self.in_flight = 0
+        self._rejected = 0
+
+    def try_acquire(self) -> bool:
+        with self._lock:
+            if self.limit and self.in_flight >= self.limit:
+                self._rejected += 1
+                return False
+            self.in_flight += 1
+            return True
+
+    def release(self) -> None:
+        with self._lock:
+            self.in_flight -= 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "limit": self.limit,
+                "in_flight": self.in_flight,
+                "rejected": self._rejected,
+            }
@@ -0,0 +1,120 @@
+"""
+Request coalescing (single-flight)
+----------------------------------
+Identical GETs arriving while one is already in flight wait for that call
+instead of going upstream themselves: the first caller (the leader) runs
+the upstream call, every concurrent caller with the same key (followers)
+receives its result, or its exception.
+
+Keys are built by the proxy from the path, query, the caller's JWT groups
+and the forwarded Accept-Encoding, so only callers that would get the same
+response share one. Enabled per route with ``"COALESCE": True``.
+"""
+
+import asyncio
+import threading
+
+
+class _Call:
+    __slots__ = ("done", "result", "error", "followers")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+        self.followers = 0
+
+
+class SingleFlight:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+        self._async_calls = {}
+
+        # Counters
+        self._leaders = 0
+        self._collapsed = 0
+        self._errors = 0
+
+    def do(self, key, fn):
+        """Return ``fn()``, sharing one call among concurrent callers of ``key``."""
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+                self._leaders += 1
+            else:
+                call.followers += 1
+                self._collapsed += 1
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+            return call.result
+        except Exception as exc:
+            call.error = exc
+            with self._lock:
+                self._errors += 1
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+    async def ado(self, key, fn):
+        """Async ``do``: ``fn`` is a coroutine function, waiters do not block the loop."""
+        loop = asyncio.get_running_loop()
+        loop_key = (id(loop), key)
+        with self._lock:
+            future = self._async_calls.get(loop_key)
+            leader = future is None
+            if leader:
+                future = self._async_calls[loop_key] = loop.create_future()
+                self._leaders += 1
+            else:
+                self._collapsed += 1
+
+        if not leader:
+            # shield: a cancelled follower must not cancel the shared call
+            try:
+                return await asyncio.shield(future)
+            except asyncio.CancelledError:
+                if asyncio.current_task().cancelling():
+                    raise
+                # The leader was cancelled (its client went away): start over.
+                return await self.ado(key, fn)
+
+        try:
+            result = await fn()
+        except BaseException as exc:
+            if not isinstance(exc, asyncio.CancelledError):
+                with self._lock:
+                    self._errors += 1
+            future.set_exception(exc)
+            # Followers re-raise it; the leader does not need the retrieval.
+            future.exception()
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                del self._async_calls[loop_key]
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "in_flight": len(self._calls) + len(self._async_calls),
+                "upstream_calls": self._leaders,
+                "collapsed": self._collapsed,
+                "errors": self._errors,
+            }
+
+
+single_flight = SingleFlight()
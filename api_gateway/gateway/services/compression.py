@@ -0,0 +1,228 @@
+"""
+Content codings
+---------------
+Incremental encoders/decoders for the content codings the gateway speaks,
+and ``Accept-Encoding`` negotiation.
+
+gzip is always available; brotli (``br``, package ``brotli``) and zstd
+(package ``zstandard``) are used when installed.
+
+Encoders are incremental: ``compress()`` returns what is ready (possibly
+nothing), ``flush()`` emits everything fed so far as a complete block (so
+a streaming client can decode it immediately) and ``finish()`` ends the
+stream.
+"""
+
+import re
+import zlib
+
+try:
+    import brotli
+except ImportError:  # optional: br coding
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:  # optional: zstd coding
+    zstandard = None
+
+
+# Types worth compressing (JSON APIs, text, XML, JS, SVG)
+COMPRESSIBLE_RE = re.compile(
+    r"^(?:text/|application/(?:[\w.+-]+\+)?(?:json|xml|javascript)\b|image/svg\+xml)",
+    re.I,
+)
+
+
+# ============================================================
+# Encoders
+# ============================================================
+
+class GzipEncoder:
+    def __init__(self, level: int = 6):
+        # wbits 31: gzip container
+        self._compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.compress(data)
+
+    def flush(self) -> bytes:
+        return self._compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self) -> bytes:
+        return self._compressor.flush(zlib.Z_FINISH)
+
+
+class BrotliEncoder:
+    def __init__(self, level: int = 4):
+        self._compressor = brotli.Compressor(quality=level)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.process(data)
+
+    def flush(self) -> bytes:
+        return self._compressor.flush()
+
+    def finish(self) -> bytes:
+        return self._compressor.finish()
+
+
+class ZstdEncoder:
+    def __init__(self, level: int = 3):
+        self._compressor = zstandard.ZstdCompressor(level=level).compressobj()
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.compress(data)
+
+    def flush(self) -> bytes:
+        return self._compressor.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK)
+
+    def finish(self) -> bytes:
+        return self._compressor.flush(zstandard.COMPRESSOBJ_FLUSH_FINISH)
+
+
+# ============================================================
+# Decoders
+# ============================================================
+
+class ZlibDecoder:
+    def __init__(self, wbits: int):
+        self._decompressor = zlib.decompressobj(wbits)
+
+    def decompress(self, data: bytes) -> bytes:
+        return self._decompressor.decompress(data)
+
+    def finish(self) -> bytes:
+        return self._decompressor.flush()
+
+
+class BrotliDecoder:
+    def __init__(self):
+        self._decompressor = brotli.Decompressor()
+
+    def decompress(self, data: bytes) -> bytes:
+        return self._decompressor.process(data)
+
+    def finish(self) -> bytes:
+        return b""
+
+
+class ZstdDecoder:
+    def __init__(self):
+        self._decompressor = zstandard.ZstdDecompressor().decompressobj()
+
+    def decompress(self, data: bytes) -> bytes:
+        return self._decompressor.decompress(data)
+
+    def finish(self) -> bytes:
+        return b""
+
+
+ENCODERS = {"gzip": GzipEncoder}
+DECODERS = {
+    "gzip": lambda: ZlibDecoder(31),
+    "x-gzip": lambda: ZlibDecoder(31),
+    # "deflate" is zlib-wrapped; wbits 47 also accepts gzip/raw headers
+    "deflate": lambda: ZlibDecoder(47),
+}
+if brotli is not None:
+    ENCODERS["br"] = BrotliEncoder
+    DECODERS["br"] = BrotliDecoder
+if zstandard is not None:
+    ENCODERS["zstd"] = ZstdEncoder
+    DECODERS["zstd"] = ZstdDecoder
+
+
+# ============================================================
+# Negotiation
+# ============================================================
+
+def parse_accept_encoding(header: str | None) -> dict:
+    """``{coding: q}`` from an Accept-Encoding header (codings lower-cased)."""
+    accepted = {}
+    for item in (header or "").split(","):
+        coding, _, params = item.strip().partition(";")
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        q = 1.0
+        for param in params.split(";"):
+            name, _, value = param.strip().partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        accepted[coding] = q
+    return accepted
+
+
+def accepts(accepted: dict, coding: str) -> bool:
+    """Whether a client with ``accepted`` codings can read ``coding``."""
+    coding = coding.lower()
+    if coding == "identity":
+        return accepted.get("identity", accepted.get("*", 1.0)) > 0
+    if coding == "x-gzip":
+        coding = "gzip"
+    return accepted.get(coding, accepted.get("*", 0.0)) > 0
+
+
+def negotiate(accepted: dict, preferences) -> str | None:
+    """
+    Best available coding for the client: highest q, ties broken by the
+    order of ``preferences``. None means send identity.
+    """
+    best, best_q = None, 0.0
+    for coding in preferences:
+        if coding not in ENCODERS:
+            continue
+        q = accepted.get(coding, accepted.get("*", 0.0))
+        if q > best_q:
+            best, best_q = coding, q
+    return best
+
+
+# ============================================================
+# Streams
+# ============================================================
+
+def encode_chunks(chunks, encoder):
+    """Encode an iterable of chunks, flushing a block per input chunk."""
+    for chunk in chunks:
+        data = encoder.compress(chunk) + encoder.flush()
+        if data:
+            yield data
+    yield encoder.finish()
+
+
+async def aencode_chunks(chunks, encoder):
+    async for chunk in chunks:
+        data = encoder.compress(chunk) + encoder.flush()
+        if data:
+            yield data
+    yield encoder.finish()
+
+
+def decode_chunks(chunks, decoder):
+    for chunk in chunks:
+        data = decoder.decompress(chunk)
+        if data:
+            yield data
+    tail = decoder.finish()
+    if tail:
+        yield tail
+
+
+async def adecode_chunks(chunks, decoder):
+    async for chunk in chunks:
+        data = decoder.decompress(chunk)
+        if data:
+            yield data
+    tail = decoder.finish()
+    if tail:
+        yield tail
+
+
+def decode_body(body: bytes, coding: str) -> bytes:
+    decoder = DECODERS[coding.lower()]()
+    return decoder.decompress(body) + decoder.finish()
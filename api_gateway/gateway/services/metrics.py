@@ -0,0 +1,317 @@
+"""
+Gateway metrics
+---------------
+Histograms rendered in the Prometheus text format on ``/metrics``.
+
+Recording takes no lock: every thread writes to its own shard (a plain
+dict of series -> cells, mutated only by that thread under the GIL), and a
+scrape sums the shards. Shards of threads that have exited are folded into
+a retired shard so totals never go backwards.
+
+Gauges describing long-lived state (connection pools, breakers, response
+cache, coalescing, JWT caches, revocation list, trace export) are read
+from the existing ``stats()`` functions at scrape time by collectors.
+"""
+
+import math
+import threading
+from bisect import bisect_left
+
+# Latency buckets (seconds): 0.5 ms .. 30 s
+LATENCY_BUCKETS = (
+    0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0,
+)
+# Body size buckets (bytes): 256 B .. 64 MiB
+SIZE_BUCKETS = tuple(256 * 4 ** i for i in range(10))
+
+
+# ============================================================
+# Per-thread shards
+# ============================================================
+
+class _Shard:
+    __slots__ = ("thread", "cells")
+
+    def __init__(self, thread):
+        self.thread = thread
+        self.cells = {}
+
+
+_local = threading.local()
+_shards = []
+_shards_lock = threading.Lock()
+_retired = _Shard(None)
+
+
+def _cells() -> dict:
+    shard = getattr(_local, "shard", None)
+    if shard is None:
+        shard = _local.shard = _Shard(threading.current_thread())
+        with _shards_lock:
+            _shards.append(shard)
+    return shard.cells
+
+
+def _merge(into: dict, cells: dict):
+    for key, cell in cells.items():
+        total = into.get(key)
+        if total is None:
+            into[key] = list(cell)
+        else:
+            for i, value in enumerate(cell):
+                total[i] += value
+
+
+def _snapshot() -> dict:
+    """Sum of every shard (series key -> cell)."""
+    totals = {}
+    with _shards_lock:
+        for shard in list(_shards):
+            # list() copies under the GIL: the owner may keep writing
+            cells = dict(list(shard.cells.items()))
+            if not shard.thread.is_alive():
+                _shards.remove(shard)
+                _merge(_retired.cells, cells)
+            else:
+                _merge(totals, {key: list(cell) for key, cell in cells.items()})
+        _merge(totals, _retired.cells)
+    return totals
+
+
+# ============================================================
+# Metric types
+# ============================================================
+
+_metrics = []
+
+
+class Histogram:
+    type = "histogram"
+
+    def __init__(self, name: str, help: str, labelnames=(), buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(buckets)
+        _metrics.append(self)
+
+    def observe(self, value: float, *labelvalues) -> None:
+        cells = _cells()
+        key = (self, labelvalues)
+        cell = cells.get(key)
+        if cell is None:
+            # one count per bucket, +Inf, then the sum
+            cell = cells[key] = [0] * (len(self.buckets) + 2)
+        cell[bisect_left(self.buckets, value)] += 1
+        cell[-1] += value
+
+    def render(self, series):
+        for labelvalues, cell in series:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (math.inf,), cell):
+                cumulative += count
+                le = "+Inf" if bound == math.inf else _number(bound)
+                labels = _labels(self.labelnames + ("le",), labelvalues + (le,))
+                yield f"{self.name}_bucket{labels} {cumulative}"
+            labels = _labels(self.labelnames, labelvalues)
+            yield f"{self.name}_sum{labels} {_number(cell[-1])}"
+            yield f"{self.name}_count{labels} {cumulative}"
+
+
+# ============================================================
+# Gateway metrics
+# ============================================================
+
+REQUEST_SECONDS = Histogram(
+    "gateway_request_duration_seconds",
+    "Time from request arrival until the response headers are ready.",
+    ("route", "upstream", "method", "status"),
+)
+UPSTREAM_SECONDS = Histogram(
+    "gateway_upstream_duration_seconds",
+    "Time from sending the upstream request until its response headers arrive.",
+    ("route", "upstream", "status"),
+)
+JWT_VERIFY_SECONDS = Histogram(
+    "gateway_jwt_verify_duration_seconds",
+    "Access token verification time (decode_token).",
+    ("result",),
+)
+REQUEST_BYTES = Histogram(
+    "gateway_request_body_bytes",
+    "Request body size (declared Content-Length).",
+    ("route", "upstream", "method"),
+    buckets=SIZE_BUCKETS,
+)
+RESPONSE_BYTES = Histogram(
+    "gateway_response_body_bytes",
+    "Response body bytes sent to the client (after compression).",
+    ("route", "upstream", "method", "status"),
+    buckets=SIZE_BUCKETS,
+)
+
+
+# ============================================================
+# Collectors (gauges read at scrape time)
+# ============================================================
+
+_collectors = []
+
+
+def collector(fn):
+    """
+    Register ``fn() -> iterable of (name, type, help, [(labels, value)])``
+    to be rendered on every scrape.
+    """
+    _collectors.append(fn)
+    return fn
+
+
+_BREAKER_STATES = {"closed": 0, "half_open": 1, "open": 2}
+
+
+@collector
+def _upstream_pools():
+    from gateway.services.upstream import pool_stats
+
+    pools = pool_stats()
+    rows = {
+        "in_use": [], "idle": [], "waits": [], "wait_timeouts": [],
+        "breaker": [], "breaker_rejected": [], "bulkhead_in_flight": [], "bulkhead_rejected": [],
+        "endpoint_requests": [], "endpoint_failures": [], "endpoint_latency": [], "endpoint_ejected": [],
+    }
+    for name, stats in pools.items():
+        labels = {"upstream": name}
+        rows["in_use"].append((labels, stats["in_use"]))
+        rows["idle"].append((labels, stats["idle"]))
+        rows["waits"].append((labels, stats["waits"]))
+        rows["wait_timeouts"].append((labels, stats["wait_timeouts"]))
+        rows["breaker"].append((labels, _BREAKER_STATES[stats["breaker"]["state"]]))
+        rows["breaker_rejected"].append((labels, stats["breaker"]["rejected"]))
+        rows["bulkhead_in_flight"].append((labels, stats["bulkhead"]["in_flight"]))
+        rows["bulkhead_rejected"].append((labels, stats["bulkhead"]["rejected"]))
+        for endpoint in stats["endpoints"]:
+            endpoint_labels = {"upstream": name, "endpoint": endpoint["base_url"]}
+            rows["endpoint_requests"].append((endpoint_labels, endpoint["requests"]))
+            rows["endpoint_failures"].append((endpoint_labels, endpoint["failures"]))
+            rows["endpoint_latency"].append((endpoint_labels, endpoint["latency_ewma_ms"] / 1000))
+            rows["endpoint_ejected"].append((endpoint_labels, int(endpoint["ejected"])))
+
+    return (
+        ("gateway_pool_sessions_in_use", "gauge", "Pooled upstream sessions checked out.", rows["in_use"]),
+        ("gateway_pool_sessions_idle", "gauge", "Idle pooled upstream sessions.", rows["idle"]),
+        ("gateway_pool_waits_total", "counter", "Session acquisitions that had to wait.", rows["waits"]),
+        ("gateway_pool_wait_timeouts_total", "counter", "Session acquisitions that timed out.", rows["wait_timeouts"]),
+        ("gateway_circuit_state", "gauge", "Circuit breaker state (0 closed, 1 half-open, 2 open).", rows["breaker"]),
+        ("gateway_circuit_rejected_total", "counter", "Calls rejected by an open circuit.", rows["breaker_rejected"]),
+        ("gateway_bulkhead_in_flight", "gauge", "Upstream calls in flight.", rows["bulkhead_in_flight"]),
+        ("gateway_bulkhead_rejected_total", "counter", "Calls rejected at the concurrency cap.", rows["bulkhead_rejected"]),
+        ("gateway_endpoint_requests_total", "counter", "Requests sent to an upstream replica.", rows["endpoint_requests"]),
+        ("gateway_endpoint_failures_total", "counter", "Failed requests to an upstream replica.", rows["endpoint_failures"]),
+        ("gateway_endpoint_latency_ewma_seconds", "gauge", "Replica response latency (EWMA).", rows["endpoint_latency"]),
+        ("gateway_endpoint_ejected", "gauge", "Replica currently ejected (1) or not (0).", rows["endpoint_ejected"]),
+    )
+
+
+@collector
+def _response_cache():
+    from gateway.services.response_cache import response_cache_stats
+
+    stats = response_cache_stats()
+    if stats is None:
+        return ()
+    return (
+        ("gateway_response_cache_entries", "gauge", "Cached responses.", [({}, stats["entries"])]),
+        ("gateway_response_cache_bytes", "gauge", "Bytes held by the response cache.", [({}, stats["bytes"])]),
+        ("gateway_response_cache_lookups_total", "counter", "Response cache lookups by result.", [
+            ({"result": "hit"}, stats["hits"]),
+            ({"result": "stale"}, stats["stale_hits"]),
+            ({"result": "miss"}, stats["misses"]),
+        ]),
+        ("gateway_response_cache_evictions_total", "counter", "Entries evicted for space.", [({}, stats["evictions"])]),
+        ("gateway_response_cache_purged_total", "counter", "Entries purged by writes.", [({}, stats["purged"])]),
+    )
+
+
+@collector
+def _coalescing():
+    from gateway.services.coalesce import single_flight
+
+    stats = single_flight.stats()
+    return (
+        ("gateway_coalesced_upstream_calls_total", "counter", "Upstream calls made by single-flight leaders.", [({}, stats["upstream_calls"])]),
+        ("gateway_coalesced_requests_total", "counter", "Requests served by another caller's upstream call.", [({}, stats["collapsed"])]),
+    )
+
+
+@collector
+def _jwt():
+    from erp_jwt.decoder import revocation_stats, token_cache_stats
+
+    tokens = token_cache_stats()
+    revocations = revocation_stats()
+    return (
+        ("gateway_jwt_token_cache_entries", "gauge", "Verified tokens cached.", [({}, tokens["size"])]),
+        ("gateway_jwt_token_cache_lookups_total", "counter", "Verified-token cache lookups by result.", [
+            ({"result": "hit"}, tokens.get("hits", 0)),
+            ({"result": "miss"}, tokens.get("misses", 0)),
+        ]),
+        ("gateway_jwt_revoked_tokens", "gauge", "Entries in the local revocation list.", [({}, revocations["revoked"])]),
+        ("gateway_jwt_revocation_refresh_failures_total", "counter", "Failed revocation list refreshes.", [({}, revocations.get("failures", 0))]),
+    )
+
+
+@collector
+def _tracing():
+    from erp_tracing.tracer import tracing_stats
+
+    stats = tracing_stats()
+    if not stats["enabled"]:
+        return ()
+    return (
+        ("gateway_tracing_spans_exported_total", "counter", "Spans written by the trace exporter.", [({}, stats["exported"])]),
+        ("gateway_tracing_spans_dropped_total", "counter", "Spans dropped with the export queue full.", [({}, stats["dropped"])]),
+        ("gateway_tracing_export_failures_total", "counter", "Failed span export batches.", [({}, stats["failures"])]),
+    )
+
+
+# ============================================================
+# Exposition
+# ============================================================
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names, values) -> str:
+    if not names:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in zip(names, values)) + "}"
+
+
+def _number(value) -> str:
+    if isinstance(value, float):
+        return repr(value) if value != int(value) or abs(value) >= 1e15 else str(int(value))
+    return str(value)
+
+
+def render() -> str:
+    """Every metric and collector in the Prometheus text format (0.0.4)."""
+    series = {}
+    for (metric, labelvalues), cell in _snapshot().items():
+        series.setdefault(metric, []).append((labelvalues, cell))
+
+    lines = []
+    for metric in _metrics:
+        lines.append(f"# HELP {metric.name} {metric.help}")
+        lines.append(f"# TYPE {metric.name} {metric.type}")
+        lines.extend(metric.render(sorted(series.get(metric, ()), key=lambda item: item[0])))
+
+    for collect in _collectors:
+        for name, kind, help, samples in collect():
+            lines.append(f"# HELP {name} {help}")
+            lines.append(f"# TYPE {name} {kind}")
+            for labels, value in samples:
+                lines.append(f"{name}{_labels(tuple(labels), tuple(labels.values()))} {_number(value)}")
+
+    return "\n".join(lines) + "\n"
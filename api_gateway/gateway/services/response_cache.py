@@ -0,0 +1,298 @@
+"""
+Gateway response cache
+----------------------
+In-process HTTP cache for GET responses of routes declaring a ``CACHE``
+policy (see ``routes.py``), meant for slow-changing reference data such as
+the geographic masters.
+
+- Store: LRU bounded by bytes (``MAX_BYTES``), responses over
+  ``MAX_ENTRY_BYTES`` are never stored.
+- Keys: request path, sorted query string and the caller's scope (JWT
+  groups), plus the values of the upstream request headers named by the
+  upstream's ``Vary`` header. ``Vary: Authorization`` is covered by the
+  scope; ``Vary: *`` is never cached.
+- Freshness: ``TTL`` seconds (capped by the upstream's ``max-age``), then
+  served stale for up to ``STALE_WHILE_REVALIDATE`` seconds while one
+  background refresh runs.
+- Invalidation: a successful write (POST/PUT/PATCH/DELETE) through a cached
+  route purges every entry under the route's ``PURGE`` prefixes.
+
+The cache is per gateway process; the TTL bounds how long another process
+can keep serving data a write has changed.
+
+    GATEWAY_RESPONSE_CACHE = {
+        "MAX_BYTES": 64 * 1024 * 1024,
+        "MAX_ENTRY_BYTES": 1024 * 1024,
+        "REVALIDATE_WORKERS": 4,
+    }
+"""
+
+import logging
+import re
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import NamedTuple
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+# Rough per-entry bookkeeping cost (key, tuple, dict) counted against MAX_BYTES.
+ENTRY_OVERHEAD = 256
+
+_MAX_AGE_RE = re.compile(r"(?:^|,)\s*(?:s-maxage|max-age)\s*=\s*(\d+)", re.I)
+_NO_STORE = ("no-store", "no-cache", "private")
+
+
+class CachedResponse(NamedTuple):
+    status: int
+    headers: dict
+    body: bytes
+    stored_at: float
+    fresh_until: float
+    stale_until: float
+
+    @property
+    def size(self) -> int:
+        return len(self.body) + sum(len(k) + len(v) for k, v in self.headers.items()) + ENTRY_OVERHEAD
+
+    def age(self, now: float) -> int:
+        return int(now - self.stored_at)
+
+
+def _scope(payload) -> str:
+    if payload is None:
+        return "-"
+    return ",".join(sorted(payload.get("groups", [])))
+
+
+def base_key(path: str, query, payload) -> tuple:
+    """Cache key of a request before ``Vary`` is applied."""
+    return (path, "&".join(sorted(f"{k}={v}" for k, v in query)), _scope(payload))
+
+
+def _vary_names(vary: str | None):
+    """
+    Lower-cased request header names a response varies on, or None when the
+    response cannot be cached (``Vary: *``).
+    """
+    names = []
+    for name in (vary or "").split(","):
+        name = name.strip().lower()
+        if not name or name == "authorization":
+            continue
+        if name == "*":
+            return None
+        names.append(name)
+    return tuple(sorted(set(names)))
+
+
+def _freshness(cache_control: str | None, ttl: float) -> float | None:
+    """Seconds the response stays fresh, or None when it must not be stored."""
+    cache_control = (cache_control or "").lower()
+    if any(token in cache_control for token in _NO_STORE):
+        return None
+    match = _MAX_AGE_RE.search(cache_control)
+    if match:
+        return min(ttl, int(match.group(1)))
+    return ttl
+
+
+class ResponseCache:
+    def __init__(self, max_bytes: int, max_entry_bytes: int, revalidate_workers: int = 4):
+        self.max_bytes = max_bytes
+        self.max_entry_bytes = max_entry_bytes
+
+        self._lock = threading.Lock()
+        # key -> CachedResponse, or ("vary", base) -> header names;
+        # least recently used first.
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._revalidating = set()
+        self._executor = ThreadPoolExecutor(
+            max_workers=revalidate_workers, thread_name_prefix="gateway-revalidate"
+        )
+
+        # Counters
+        self._hits = 0
+        self._stale_hits = 0
+        self._misses = 0
+        self._stores = 0
+        self._evictions = 0
+        self._purged = 0
+
+    # ------------------------------------------------------------
+    # Store (lock held)
+    # ------------------------------------------------------------
+
+    @staticmethod
+    def _entry_size(key, value) -> int:
+        if isinstance(value, CachedResponse):
+            return value.size
+        return ENTRY_OVERHEAD + sum(len(name) for name in value)
+
+    def _remove_locked(self, key):
+        value = self._entries.pop(key)
+        self._bytes -= self._entry_size(key, value)
+
+    def _put_locked(self, key, value):
+        if key in self._entries:
+            self._remove_locked(key)
+        self._entries[key] = value
+        self._bytes += self._entry_size(key, value)
+        while self._bytes > self.max_bytes and self._entries:
+            oldest = next(iter(self._entries))
+            self._remove_locked(oldest)
+            self._evictions += 1
+
+    # ------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------
+
+    def variant_key(self, base: tuple, headers: dict):
+        """Full key for a request (None when its Vary spec is unknown)."""
+        with self._lock:
+            names = self._entries.get(("vary", base))
+        if names is None:
+            return None
+        lowered = {name.lower(): value for name, value in headers.items()}
+        return (base, tuple(lowered.get(name) for name in names))
+
+    def get(self, base: tuple, headers: dict):
+        """
+        Cached response for a request and whether it is stale, as
+        ``(entry, stale)``; ``(None, False)`` on a miss or once the stale
+        window has passed.
+        """
+        key = self.variant_key(base, headers)
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key) if key is not None else None
+            if entry is None or entry.stale_until <= now:
+                if entry is not None:
+                    self._remove_locked(key)
+                self._misses += 1
+                return None, False
+            self._entries.move_to_end(key)
+            if ("vary", base) in self._entries:
+                self._entries.move_to_end(("vary", base))
+            if entry.fresh_until > now:
+                self._hits += 1
+                return entry, False
+            self._stale_hits += 1
+            return entry, True
+
+    def store(self, base: tuple, headers: dict, status: int, response_headers: dict, body: bytes, policy) -> bool:
+        """
+        Store an upstream response if it is cacheable.
+
+        :param headers: headers sent upstream (values used for ``Vary``)
+        :param response_headers: upstream headers relayed to clients
+                                 (including Cache-Control and Vary)
+        :param policy: the route's ``CachePolicy``
+        """
+        if status != 200 or len(body) > self.max_entry_bytes:
+            return False
+        fresh_for = _freshness(response_headers.get("Cache-Control"), policy.ttl)
+        names = _vary_names(response_headers.get("Vary"))
+        if fresh_for is None or names is None:
+            return False
+
+        now = time.monotonic()
+        entry = CachedResponse(
+            status=status,
+            headers=dict(response_headers),
+            body=body,
+            stored_at=now,
+            fresh_until=now + fresh_for,
+            stale_until=now + fresh_for + policy.stale_while_revalidate,
+        )
+        lowered = {name.lower(): value for name, value in headers.items()}
+        key = (base, tuple(lowered.get(name) for name in names))
+        with self._lock:
+            self._put_locked(("vary", base), names)
+            self._put_locked(key, entry)
+            self._stores += 1
+        return True
+
+    def purge(self, prefixes) -> int:
+        """Drop every entry whose path starts with one of ``prefixes``."""
+        prefixes = tuple(prefixes)
+        with self._lock:
+            doomed = [
+                key for key in self._entries
+                if (key[1] if key[0] == "vary" else key[0])[0].startswith(prefixes)
+            ]
+            for key in doomed:
+                self._remove_locked(key)
+            purged = sum(1 for key in doomed if key[0] != "vary")
+            self._purged += purged
+        return purged
+
+    def revalidate(self, base: tuple, headers: dict, refresh) -> None:
+        """
+        Run ``refresh()`` in the background unless a refresh of the same
+        request variant is already running.
+        """
+        key = self.variant_key(base, headers)
+        with self._lock:
+            if key in self._revalidating:
+                return
+            self._revalidating.add(key)
+
+        def run():
+            try:
+                refresh()
+            except Exception:
+                logger.exception("Background revalidation failed for %s", base[0])
+            finally:
+                with self._lock:
+                    self._revalidating.discard(key)
+
+        self._executor.submit(run)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "entries": sum(1 for key in self._entries if key[0] != "vary"),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self._hits,
+                "stale_hits": self._stale_hits,
+                "misses": self._misses,
+                "stores": self._stores,
+                "evictions": self._evictions,
+                "purged": self._purged,
+                "revalidating": len(self._revalidating),
+            }
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_response_cache() -> ResponseCache:
+    """Process-wide cache configured from ``settings.GATEWAY_RESPONSE_CACHE``."""
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                conf = getattr(settings, "GATEWAY_RESPONSE_CACHE", {})
+                _cache = ResponseCache(
+                    max_bytes=int(conf.get("MAX_BYTES", 64 * 1024 * 1024)),
+                    max_entry_bytes=int(conf.get("MAX_ENTRY_BYTES", 1024 * 1024)),
+                    revalidate_workers=int(conf.get("REVALIDATE_WORKERS", 4)),
+                )
+    return _cache
+
+
+def response_cache_stats() -> dict | None:
+    """Stats of the cache, None when no cached route has been hit yet."""
+    return _cache.stats() if _cache is not None else None
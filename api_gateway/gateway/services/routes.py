@@ -0,0 +1,173 @@
+"""
+Gateway route table.
+
+``GATEWAY_ROUTES`` declares which path prefixes the gateway serves, where
+each one goes and whether it needs a JWT:
+
+    {
+        "PREFIX": "/api/master/",         # matched on whole path segments
+        "UPSTREAM": "master",             # UPSTREAM_POOLS name; None = local view
+        "STRIP_PREFIX": "/api/master",    # removed before proxying (True: PREFIX)
+        "TIMEOUT": 10,                    # upstream read timeout (seconds)
+        "AUTH": True,                     # require a valid access token
+        "CACHE": {                        # optional GET response cache
+            "TTL": 300,                   #   seconds fresh
+            "STALE_WHILE_REVALIDATE": 3600,
+            "PURGE": ["/api/master/"],    #   prefixes purged on writes
+        },                                #   (default: PREFIX)
+        "COALESCE": True,                 # share identical in-flight GETs
+    }
+
+The table is compiled once into a segment trie, so matching a request is
+one dict lookup per path segment and the longest matching prefix wins,
+independent of how many routes are declared. Paths with ``.`` or ``..``
+segments (also percent-encoded) match no route: the upstream client would
+resolve them into a path under a different prefix than the one matched.
+"""
+
+import threading
+from typing import NamedTuple
+from urllib.parse import unquote
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+
+
+class CachePolicy(NamedTuple):
+    ttl: float
+    stale_while_revalidate: float
+    purge: tuple
+
+
+class Route(NamedTuple):
+    prefix: str
+    upstream: str | None
+    strip_prefix: str
+    timeout: float
+    auth: bool
+    cache: CachePolicy | None = None
+    coalesce: bool = False
+
+    @property
+    def is_local(self) -> bool:
+        return self.upstream is None
+
+    def upstream_path(self, path: str) -> str:
+        """Path to request from the upstream for ``path`` (leading slash)."""
+        if self.strip_prefix and path.startswith(self.strip_prefix):
+            path = path[len(self.strip_prefix):]
+        return "/" + path.lstrip("/")
+
+
+class _Node:
+    __slots__ = ("children", "route")
+
+    def __init__(self):
+        self.children = {}
+        self.route = None
+
+
+_DOT_SEGMENTS = (".", "..")
+
+
+def _segments(path: str):
+    return [segment for segment in path.split("/") if segment]
+
+
+def _is_dot_segment(segment: str) -> bool:
+    # Decoded until stable: "%252e" is "%2e" to the upstream, which may decode it again
+    while "%" in segment:
+        decoded = unquote(segment)
+        if decoded == segment:
+            break
+        segment = decoded
+    return segment in _DOT_SEGMENTS
+
+
+class RouteTable:
+    def __init__(self, routes):
+        self._root = _Node()
+        self.routes = list(routes)
+
+        for route in self.routes:
+            node = self._root
+            for segment in _segments(route.prefix):
+                node = node.children.setdefault(segment, _Node())
+            if node.route is not None:
+                raise ImproperlyConfigured(f"Duplicate gateway route prefix {route.prefix!r}")
+            node.route = route
+
+    def match(self, path: str) -> Route | None:
+        """
+        Route with the longest prefix covering ``path``, or None (also for
+        any path with a dot segment).
+        """
+        segments = _segments(path)
+        if any(_is_dot_segment(segment) for segment in segments):
+            return None
+
+        node = self._root
+        best = node.route
+        for segment in segments:
+            node = node.children.get(segment)
+            if node is None:
+                break
+            if node.route is not None:
+                best = node.route
+        return best
+
+
+def compile_routes(config) -> RouteTable:
+    pools = getattr(settings, "UPSTREAM_POOLS", {})
+    routes = []
+    for entry in config:
+        upstream = entry.get("UPSTREAM")
+        if upstream is not None and upstream not in pools:
+            raise ImproperlyConfigured(
+                f"Gateway route {entry['PREFIX']!r} targets unknown upstream {upstream!r}"
+            )
+        prefix = "/" + entry["PREFIX"].strip("/") + "/"
+        strip_prefix = entry.get("STRIP_PREFIX", False)
+        if strip_prefix is True:
+            strip_prefix = prefix
+        if upstream is None and (entry.get("CACHE") or entry.get("COALESCE")):
+            raise ImproperlyConfigured(
+                f"Gateway route {entry['PREFIX']!r} is local and cannot be cached or coalesced"
+            )
+        cache = entry.get("CACHE")
+        if cache is not None:
+            cache = CachePolicy(
+                ttl=float(cache.get("TTL", 300)),
+                stale_while_revalidate=float(cache.get("STALE_WHILE_REVALIDATE", 0)),
+                purge=tuple(cache.get("PURGE") or (prefix,)),
+            )
+        routes.append(
+            Route(
+                prefix=prefix,
+                upstream=upstream,
+                strip_prefix=(strip_prefix or "").rstrip("/"),
+                timeout=entry.get("TIMEOUT", 10),
+                auth=entry.get("AUTH", True),
+                cache=cache,
+                coalesce=bool(entry.get("COALESCE", False)),
+            )
+        )
+    return RouteTable(routes)
+
+
+_route_table = None
+_route_table_lock = threading.Lock()
+
+
+def get_route_table() -> RouteTable:
+    """Process-wide table compiled from ``settings.GATEWAY_ROUTES``."""
+    global _route_table
+    if _route_table is None:
+        with _route_table_lock:
+            if _route_table is None:
+                _route_table = compile_routes(settings.GATEWAY_ROUTES)
+    return _route_table
+
+
+def match_route(path: str) -> Route | None:
+    return get_route_table().match(path)
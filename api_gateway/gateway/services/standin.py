@@ -0,0 +1,135 @@
+"""
+Stand-in upstream
+-----------------
+A tiny keep-alive HTTP/1.1 server running on its own event loop thread.
+
+Used by the gateway's load-test and benchmark commands in place of a real
+master-service: it answers every request with a fixed JSON body after an
+optional delay and records how many requests it held concurrently. With
+``gzip=True`` it gzips the body for clients accepting it, as a Django
+service behind ``GZipMiddleware`` does.
+"""
+
+import asyncio
+import gzip as gzip_module
+import json
+import threading
+
+
+class StandinUpstream:
+    def __init__(
+        self,
+        delay: float = 0.0,
+        status: int = 200,
+        body=None,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        gzip: bool = False,
+    ):
+        self.delay = delay
+        self.status = status
+        self.body = json.dumps(body if body is not None else {"detail": "ok"}).encode()
+        self.gzipped_body = gzip_module.compress(self.body, mtime=0) if gzip else None
+        self.host = host
+        self.port = port
+
+        self.requests = 0
+        self.in_flight = 0
+        self.peak_in_flight = 0
+
+        self._loop = None
+        self._server = None
+        self._thread = None
+        self._ready = threading.Event()
+
+    @property
+    def base_url(self) -> str:
+        return f"http://{self.host}:{self.port}"
+
+    def start(self) -> str:
+        self._thread = threading.Thread(target=self._run, name="standin-upstream", daemon=True)
+        self._thread.start()
+        self._ready.wait()
+        return self.base_url
+
+    def stop(self) -> None:
+        if self._loop is not None:
+            asyncio.run_coroutine_threadsafe(self._shutdown(), self._loop).result(timeout=5)
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._thread.join(timeout=5)
+
+    def reset_stats(self) -> None:
+        self.requests = 0
+        self.peak_in_flight = self.in_flight
+
+    # ------------------------------------------------------------
+    # Event loop side
+    # ------------------------------------------------------------
+
+    def _run(self):
+        self._loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self._loop)
+        self._server = self._loop.run_until_complete(
+            asyncio.start_server(self._handle, self.host, self.port, backlog=4096)
+        )
+        self.port = self._server.sockets[0].getsockname()[1]
+        self._ready.set()
+        try:
+            self._loop.run_forever()
+        finally:
+            self._server.close()
+            self._loop.close()
+
+    async def _shutdown(self):
+        self._server.close()
+        current = asyncio.current_task()
+        tasks = [task for task in asyncio.all_tasks() if task is not current]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def _handle(self, reader, writer):
+        try:
+            while True:
+                head = await reader.readuntil(b"\r\n\r\n")
+                headers = {}
+                for line in head.decode("latin-1").split("\r\n")[1:]:
+                    if ":" in line:
+                        name, value = line.split(":", 1)
+                        headers[name.strip().lower()] = value.strip()
+
+                length = int(headers.get("content-length", 0) or 0)
+                if length:
+                    await reader.readexactly(length)
+
+                self.requests += 1
+                self.in_flight += 1
+                self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+                try:
+                    if self.delay:
+                        await asyncio.sleep(self.delay)
+                finally:
+                    self.in_flight -= 1
+
+                body, encoding = self.body, ""
+                if self.gzipped_body is not None and "gzip" in headers.get("accept-encoding", ""):
+                    body, encoding = self.gzipped_body, "Content-Encoding: gzip\r\nVary: Accept-Encoding\r\n"
+
+                writer.write(
+                    (
+                        f"HTTP/1.1 {self.status} OK\r\n"
+                        "Content-Type: application/json\r\n"
+                        f"{encoding}"
+                        f"Content-Length: {len(body)}\r\n"
+                        "\r\n"
+                    ).encode()
+                    + body
+                )
+                await writer.drain()
+
+                if headers.get("connection", "").lower() == "close":
+                    break
+        except (asyncio.IncompleteReadError, asyncio.CancelledError, ConnectionError):
+            pass
+        finally:
+            writer.close()
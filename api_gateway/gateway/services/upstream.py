@@ -0,0 +1,486 @@
+"""
+Upstream HTTP clients
+---------------------
+Gateway-wide connection pools for the services behind the proxy.
+
+Each upstream gets a bounded pool of keep-alive ``requests.Session``
+objects. A session is only ever used by one worker thread at a time
+(``requests.Session`` is not thread-safe), and is returned to the pool
+afterwards so the next request reuses its open TCP connection instead of
+paying a connect/teardown per proxied call.
+
+Pools are configured through ``settings.UPSTREAM_POOLS``:
+
+    UPSTREAM_POOLS = {
+        "master": {
+            "BASE_URL": "http://127.0.0.1:8002",
+            "ENDPOINTS": [...],      # replicas; defaults to [BASE_URL]
+            "BALANCER": "p2c",       # see balancer.py
+            "EJECT_AFTER": 3,        # consecutive failures before ejection
+            "EJECT_DURATION": 10,    # seconds (doubles while failures continue)
+            "MAX_SIZE": 20,          # sessions (in-flight requests) per upstream
+            "IDLE_TIMEOUT": 60,      # seconds an idle session is kept
+            "MAX_LIFETIME": 300,     # seconds before a session is recycled
+            "ACQUIRE_TIMEOUT": 5,    # seconds to wait for a free session
+            "CONNECT_TIMEOUT": 2,    # seconds to open a TCP connection
+                                     # (route TIMEOUT is the read timeout)
+            "MAX_CONCURRENT": 100,   # bulkhead: calls in flight (0 = no cap),
+                                     # capped at the session/connection limit
+            "CIRCUIT_BREAKER": {...},  # see breaker.py
+            "ASYNC_MAX_CONNECTIONS": 1000,  # ASGI mode, see below
+        },
+    }
+
+The ASGI proxy path (``GATEWAY_PROXY_MODE = "async"``) uses a
+non-blocking ``aiohttp.ClientSession`` per upstream and event loop
+instead, sized by ``ASYNC_MAX_CONNECTIONS`` and sharing the idle/acquire
+timeouts.
+
+Every call is admitted through the pool first (``admit()``): the bulkhead
+and the circuit breaker reject it immediately when the upstream is
+saturated or unhealthy, instead of tying up a worker for the full timeout.
+The bulkhead never admits more calls than there are sessions (connections
+in async mode), so an admitted call does not then wait on the pool.
+"""
+
+import asyncio
+import logging
+import threading
+import time
+import weakref
+from collections import deque
+from contextlib import contextmanager
+
+import requests
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from requests.adapters import HTTPAdapter
+
+from gateway.services.balancer import BALANCERS, Endpoint, EndpointSet
+from gateway.services.breaker import Bulkhead, CircuitBreaker
+
+try:
+    import aiohttp
+except ImportError:  # only required for the async proxy path
+    aiohttp = None
+
+logger = logging.getLogger(__name__)
+
+
+class UpstreamPoolError(Exception):
+    """Base error for upstream pool failures."""
+
+
+class PoolExhaustedError(UpstreamPoolError):
+    """No session became available within the acquire timeout."""
+
+
+class BulkheadFullError(UpstreamPoolError):
+    """The upstream already has MAX_CONCURRENT calls in flight."""
+
+
+class CircuitOpenError(UpstreamPoolError):
+    """The upstream's circuit breaker is rejecting calls."""
+
+    def __init__(self, message: str, retry_after: int):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class _PooledSession:
+    __slots__ = ("session", "created_at", "last_used")
+
+    def __init__(self, session: requests.Session):
+        now = time.monotonic()
+        self.session = session
+        self.created_at = now
+        self.last_used = now
+
+
+class UpstreamPool:
+    """
+    Thread-safe pool of keep-alive sessions for a single upstream.
+
+    The upstream may run as several replicas (``endpoints``); a session
+    keeps one connection per replica and each request picks its replica
+    through ``pick_endpoint()``.
+
+    Idle sessions are reused most-recently-used first, so a quiet period
+    lets the least recently used ones age out through ``idle_timeout``.
+    Sessions older than ``max_lifetime`` are recycled on check-in/out so
+    connections are periodically re-established (DNS changes, upstream
+    restarts, load balancer rebalancing).
+    """
+
+    def __init__(
+        self,
+        name: str,
+        endpoints: EndpointSet,
+        max_size: int = 20,
+        idle_timeout: float = 60.0,
+        max_lifetime: float = 300.0,
+        acquire_timeout: float = 5.0,
+        connect_timeout: float = 2.0,
+        breaker: CircuitBreaker | None = None,
+        bulkhead: Bulkhead | None = None,
+    ):
+        self.name = name
+        self.endpoints = endpoints
+        self.connect_timeout = connect_timeout
+        self.breaker = breaker or CircuitBreaker(name)
+        self.bulkhead = bulkhead or Bulkhead()
+        self.max_size = max_size
+        self.idle_timeout = idle_timeout
+        self.max_lifetime = max_lifetime
+        self.acquire_timeout = acquire_timeout
+
+        self._cond = threading.Condition(threading.Lock())
+        self._idle = deque()
+        self._in_use = 0
+
+        # Counters (read under the lock by stats())
+        self._created = 0
+        self._reused = 0
+        self._discarded = 0
+        self._waits = 0
+        self._timeouts = 0
+
+    # ------------------------------------------------------------
+    # Session lifecycle
+    # ------------------------------------------------------------
+
+    def _new_session(self) -> _PooledSession:
+        session = requests.Session()
+        # One connection per session and replica: the pool itself provides
+        # the concurrency, the adapter only has to keep those sockets alive.
+        adapter = HTTPAdapter(
+            pool_connections=len(self.endpoints.endpoints),
+            pool_maxsize=1,
+            max_retries=0,
+        )
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        self._created += 1
+        return _PooledSession(session)
+
+    def _is_expired(self, entry: _PooledSession, now: float) -> bool:
+        if self.max_lifetime and now - entry.created_at >= self.max_lifetime:
+            return True
+        if self.idle_timeout and now - entry.last_used >= self.idle_timeout:
+            return True
+        return False
+
+    def _take_idle_locked(self, now: float, expired: list):
+        # Oldest idle sessions sit on the left; drop the stale ones.
+        while self._idle and self._is_expired(self._idle[0], now):
+            expired.append(self._idle.popleft())
+        while self._idle:
+            entry = self._idle.pop()
+            if self._is_expired(entry, now):
+                expired.append(entry)
+                continue
+            return entry
+        return None
+
+    def _close(self, entries):
+        for entry in entries:
+            try:
+                entry.session.close()
+            except Exception:
+                logger.debug("Error closing pooled session for %s", self.name, exc_info=True)
+
+    def acquire(self) -> _PooledSession:
+        """
+        Check a session out of the pool.
+
+        Blocks up to ``acquire_timeout`` when ``max_size`` sessions are
+        already in use.
+
+        :raises: PoolExhaustedError
+        """
+        expired = []
+        deadline = None
+        waited = False
+
+        try:
+            with self._cond:
+                while True:
+                    now = time.monotonic()
+                    entry = self._take_idle_locked(now, expired)
+                    if entry is not None:
+                        self._reused += 1
+                        break
+
+                    if self._in_use + len(self._idle) < self.max_size:
+                        entry = self._new_session()
+                        break
+
+                    if not waited:
+                        waited = True
+                        self._waits += 1
+                        deadline = now + self.acquire_timeout
+
+                    remaining = deadline - now
+                    if remaining <= 0:
+                        self._timeouts += 1
+                        raise PoolExhaustedError(
+                            f"No connection available for upstream '{self.name}'"
+                        )
+                    self._cond.wait(remaining)
+
+                self._in_use += 1
+                self._discarded += len(expired)
+        finally:
+            self._close(expired)
+
+        return entry
+
+    def release(self, entry: _PooledSession, discard: bool = False) -> None:
+        """
+        Return a session to the pool.
+
+        ``discard`` drops the session instead (e.g. after a connection
+        error, when its socket can no longer be trusted).
+        """
+        now = time.monotonic()
+        with self._cond:
+            self._in_use -= 1
+            if discard or self._is_expired(entry, now):
+                self._discarded += 1
+                drop = entry
+            else:
+                entry.last_used = now
+                self._idle.append(entry)
+                drop = None
+            self._cond.notify()
+
+        if drop is not None:
+            self._close([drop])
+
+    @contextmanager
+    def session(self):
+        """
+        Borrow a session for the duration of a ``with`` block.
+
+        Connection-level failures discard the session so a broken socket
+        is never handed to the next caller.
+        """
+        entry = self.acquire()
+        discard = False
+        try:
+            yield entry.session
+        except requests.ConnectionError:
+            discard = True
+            raise
+        finally:
+            self.release(entry, discard=discard)
+
+    # ------------------------------------------------------------
+    # Call admission
+    # ------------------------------------------------------------
+
+    def admit(self) -> None:
+        """
+        Reserve a call to this upstream; fails fast instead of queueing.
+
+        An admitted call ends with ``record()`` once the response headers
+        arrive (or the call fails), or ``cancel()`` when it never reaches
+        the upstream. Its bulkhead slot is freed there too, unless recorded
+        with ``release=False`` while the body is still being read: then by
+        ``release_slot()`` once the body is closed.
+
+        :raises: BulkheadFullError, CircuitOpenError
+        """
+        if not self.bulkhead.try_acquire():
+            raise BulkheadFullError(f"Upstream '{self.name}' is at its concurrency limit")
+        if not self.breaker.allow():
+            self.bulkhead.release()
+            raise CircuitOpenError(
+                f"Circuit open for upstream '{self.name}'",
+                retry_after=self.breaker.retry_after(),
+            )
+
+    def record(self, endpoint: Endpoint, latency: float | None, failed: bool, release: bool = True) -> None:
+        """Outcome of an admitted call (see ``Endpoint.end``)."""
+        endpoint.end(latency, failed)
+        self.breaker.record(latency, failed)
+        if release:
+            self.bulkhead.release()
+
+    def release_slot(self) -> None:
+        """Free the bulkhead slot of a call recorded with ``release=False``."""
+        self.bulkhead.release()
+
+    def cancel(self, endpoint: Endpoint | None = None) -> None:
+        """An admitted call was abandoned before reaching the upstream."""
+        if endpoint is not None:
+            endpoint.end(None, failed=False)
+        self.breaker.cancel()
+        self.bulkhead.release()
+
+    def pick_endpoint(self) -> Endpoint:
+        """
+        Replica for the next request (counted as in flight until
+        ``Endpoint.end()`` is called).
+        """
+        return self.endpoints.pick()
+
+    def close(self) -> None:
+        """Close every idle session (in-use sessions close on release)."""
+        with self._cond:
+            idle = list(self._idle)
+            self._idle.clear()
+            self._discarded += len(idle)
+        self._close(idle)
+
+    # ------------------------------------------------------------
+    # Metrics
+    # ------------------------------------------------------------
+
+    def stats(self) -> dict:
+        with self._cond:
+            stats = {
+                "max_size": self.max_size,
+                "in_use": self._in_use,
+                "idle": len(self._idle),
+                "created": self._created,
+                "reused": self._reused,
+                "discarded": self._discarded,
+                "waits": self._waits,
+                "wait_timeouts": self._timeouts,
+            }
+        stats["balancer"] = self.endpoints.balancer_name
+        stats["endpoints"] = self.endpoints.stats()
+        stats["breaker"] = self.breaker.stats()
+        stats["bulkhead"] = self.bulkhead.stats()
+        return stats
+
+
+# ============================================================
+# Registry
+# ============================================================
+
+_pools: dict = {}
+_pools_lock = threading.Lock()
+
+
+def _build_pool(name: str) -> UpstreamPool:
+    try:
+        conf = settings.UPSTREAM_POOLS[name]
+    except KeyError:
+        raise UpstreamPoolError(f"Unknown upstream '{name}'")
+
+    balancer = conf.get("BALANCER", "p2c")
+    if balancer not in BALANCERS:
+        raise ImproperlyConfigured(f"Unknown balancer '{balancer}' for upstream '{name}'")
+
+    endpoints = EndpointSet(
+        conf.get("ENDPOINTS") or [conf["BASE_URL"]],
+        balancer=balancer,
+        eject_after=int(conf.get("EJECT_AFTER", 3)),
+        eject_duration=float(conf.get("EJECT_DURATION", 10)),
+        max_eject_duration=float(conf.get("MAX_EJECT_DURATION", 120)),
+    )
+
+    breaker_conf = conf.get("CIRCUIT_BREAKER", {})
+    breaker = CircuitBreaker(
+        name,
+        window=int(breaker_conf.get("WINDOW", 50)),
+        min_calls=int(breaker_conf.get("MIN_CALLS", 10)),
+        failure_rate=float(breaker_conf.get("FAILURE_RATE", 0.5)),
+        slow_call_duration=float(breaker_conf.get("SLOW_CALL_DURATION", 2)),
+        slow_call_rate=float(breaker_conf.get("SLOW_CALL_RATE", 0.8)),
+        open_duration=float(breaker_conf.get("OPEN_DURATION", 10)),
+        half_open_calls=int(breaker_conf.get("HALF_OPEN_CALLS", 3)),
+    )
+
+    # Admitting more calls than there are sessions (connections) would make
+    # the excess wait up to ACQUIRE_TIMEOUT instead of failing fast.
+    max_size = int(conf.get("MAX_SIZE", 20))
+    if settings.GATEWAY_PROXY_MODE == "async":
+        connections = int(conf.get("ASYNC_MAX_CONNECTIONS", 1000))
+    else:
+        connections = max_size
+    max_concurrent = int(conf.get("MAX_CONCURRENT", 0))
+    if max_concurrent > connections:
+        max_concurrent = connections
+
+    return UpstreamPool(
+        name=name,
+        endpoints=endpoints,
+        max_size=max_size,
+        idle_timeout=float(conf.get("IDLE_TIMEOUT", 60)),
+        max_lifetime=float(conf.get("MAX_LIFETIME", 300)),
+        acquire_timeout=float(conf.get("ACQUIRE_TIMEOUT", 5)),
+        connect_timeout=float(conf.get("CONNECT_TIMEOUT", 2)),
+        breaker=breaker,
+        bulkhead=Bulkhead(max_concurrent),
+    )
+
+
+def get_pool(name: str) -> UpstreamPool:
+    """Return the process-wide pool for upstream ``name``."""
+    pool = _pools.get(name)
+    if pool is None:
+        with _pools_lock:
+            pool = _pools.get(name)
+            if pool is None:
+                pool = _pools[name] = _build_pool(name)
+    return pool
+
+
+def pool_stats() -> dict:
+    """Snapshot of every pool created so far, keyed by upstream name."""
+    return {name: pool.stats() for name, pool in list(_pools.items())}
+
+
+# ============================================================
+# Async clients (ASGI proxy path)
+# ============================================================
+
+# aiohttp sessions are bound to the event loop they were created on, so
+# keep one set of sessions per running loop.
+_async_clients = weakref.WeakKeyDictionary()
+
+
+def _build_async_client(name: str):
+    if aiohttp is None:
+        raise ImproperlyConfigured(
+            "GATEWAY_PROXY_MODE='async' requires the 'aiohttp' package"
+        )
+
+    try:
+        conf = settings.UPSTREAM_POOLS[name]
+    except KeyError:
+        raise UpstreamPoolError(f"Unknown upstream '{name}'")
+
+    connector = aiohttp.TCPConnector(
+        limit=int(conf.get("ASYNC_MAX_CONNECTIONS", 1000)),
+        limit_per_host=0,
+        keepalive_timeout=float(conf.get("IDLE_TIMEOUT", 60)),
+    )
+    # No base_url: requests go to the replica picked per request.
+    return aiohttp.ClientSession(
+        connector=connector,
+        # "connect" covers waiting for a free pooled connection as well.
+        timeout=aiohttp.ClientTimeout(
+            total=10,
+            connect=float(conf.get("ACQUIRE_TIMEOUT", 5)),
+            sock_connect=float(conf.get("CONNECT_TIMEOUT", 2)),
+        ),
+        # Bodies are relayed as-is; the proxy negotiates Accept-Encoding itself.
+        auto_decompress=False,
+    )
+
+
+def get_async_client(name: str):
+    """Return the ``aiohttp.ClientSession`` for upstream ``name`` on the running loop."""
+    loop = asyncio.get_running_loop()
+    clients = _async_clients.get(loop)
+    if clients is None:
+        clients = _async_clients[loop] = {}
+
+    client = clients.get(name)
+    if client is None or client.closed:
+        client = clients[name] = _build_async_client(name)
+    return client
@@ -0,0 +1,47 @@
+from django.conf import settings
+from django.test import SimpleTestCase
+
+from gateway.services.routes import compile_routes
+
+
+class RouteTableTests(SimpleTestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.routes = compile_routes(settings.GATEWAY_ROUTES)
+
+    def prefix(self, path):
+        route = self.routes.match(path)
+        return route.prefix if route is not None else None
+
+    def test_longest_prefix_wins(self):
+        self.assertEqual(self.prefix("/api/master/api/docs/swagger/"), "/api/master/api/docs/")
+        self.assertEqual(
+            self.prefix("/api/master/api/v1/masters/countries/7/"),
+            "/api/master/api/v1/masters/countries/",
+        )
+        self.assertEqual(self.prefix("/api/master/api/v1/masters/sites/"), "/api/master/")
+
+    def test_prefixes_match_whole_segments(self):
+        self.assertIsNone(self.prefix("/api/masterx/api/docs/"))
+        self.assertEqual(self.prefix("/api/master/api/docsx/"), "/api/master/")
+
+    def test_dot_segments_match_no_route(self):
+        for path in (
+            "/api/master/api/docs/../v1/masters/sites/",
+            "/api/master/api/docs/./swagger/",
+            "/api/master/api/docs/%2e%2E/v1/masters/sites/",
+            "/api/master/api/docs/%252e%252e/v1/masters/sites/",
+        ):
+            with self.subTest(path=path):
+                self.assertIsNone(self.routes.match(path))
+
+    def test_dots_inside_a_segment_are_plain_text(self):
+        self.assertEqual(self.prefix("/api/master/api/docs/v1..json"), "/api/master/api/docs/")
+
+    def test_dot_segment_cannot_reach_authenticated_route_without_token(self):
+        response = self.client.get("/api/master/api/docs/../v1/masters/sites/")
+        self.assertEqual(response.status_code, 401)
+
+    def test_public_route_needs_no_token(self):
+        self.assertFalse(self.routes.match("/api/master/api/docs/").auth)
@@ -1,8 +1,20 @@
-from django.urls import path
-from gateway.views.proxy import MasterServiceProxy
+from django.conf import settings
+from django.urls import path, re_path
+from gateway.views.proxy import AsyncUpstreamProxy, UpstreamProxy
 from gateway.views.debug import DebugEchoView
+from gateway.views.metrics import MetricsView
+from gateway.views.stats import UpstreamStatsView
+
+# "sync" for WSGI deployments, "async" when served by an ASGI server.
+if settings.GATEWAY_PROXY_MODE == "async":
+    proxy_view = AsyncUpstreamProxy.as_view()
+else:
+    proxy_view = UpstreamProxy.as_view()
 
 urlpatterns = [
-    path("api/master/<path:path>", MasterServiceProxy.as_view()),
     path("api/debug/echo/", DebugEchoView.as_view()),
+    path("api/gateway/upstreams/", UpstreamStatsView.as_view()),
+    re_path(r"^metrics/?$", MetricsView.as_view()),
+    # Everything else is routed by GATEWAY_ROUTES (404 when no route matches)
+    re_path(r"^", proxy_view),
 ]
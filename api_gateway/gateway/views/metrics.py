@@ -0,0 +1,11 @@
+from django.http import HttpResponse
+from django.views import View
+
+from gateway.services.metrics import render
+
+
+class MetricsView(View):
+    """Prometheus scrape endpoint (text exposition format 0.0.4)."""
+
+    def get(self, request):
+        return HttpResponse(render(), content_type="text/plain; version=0.0.4; charset=utf-8")
@@ -1,58 +1,742 @@
+import asyncio
+import json
 import requests
 import logging
-from django.http import JsonResponse
+import time
+import urllib3
+from django.conf import settings
+from django.http import HttpResponse, JsonResponse, StreamingHttpResponse
 from django.views import View
+from erp_tracing.tracer import start_span
+
+from gateway.services.coalesce import single_flight
+from gateway.services.compression import (
+    DECODERS,
+    accepts,
+    adecode_chunks,
+    decode_body,
+    decode_chunks,
+    parse_accept_encoding,
+)
+from gateway.services.metrics import UPSTREAM_SECONDS
+from gateway.services.response_cache import base_key, get_response_cache
+from gateway.services.routes import match_route
+from gateway.services.upstream import (
+    BulkheadFullError,
+    CircuitOpenError,
+    PoolExhaustedError,
+    aiohttp,
+    get_async_client,
+    get_pool,
+)
 
 logger = logging.getLogger(__name__)
-MASTER_SERVICE_BASE = "http://127.0.0.1:8002"
 
+# Upstream response headers forwarded in passthrough mode. Hop-by-hop
+# headers and upstream CORS headers are deliberately left out: the
+# gateway's own CORS policy applies to every response it returns.
+PASSTHROUGH_HEADERS = (
+    "Content-Type",
+    "Content-Encoding",
+    "Content-Length",
+    "Content-Disposition",
+    "Content-Language",
+    "Cache-Control",
+    "ETag",
+    "Last-Modified",
+    "Location",
+    "Vary",
+    "Allow",
+)
 
-class MasterServiceProxy(View):
-    def dispatch(self, request, *args, **kwargs):
-        path = request.path.replace("/api/master/", "")
-        url = f"{MASTER_SERVICE_BASE}/{path}"
 
-        headers = {}
+def _passthrough() -> bool:
+    return settings.GATEWAY_RESPONSE_MODE == "passthrough"
+
+
+def _route(request):
+    """Upstream route for the request (matched by the JWT middleware), or None."""
+    route = getattr(request, "gateway_route", None) or match_route(request.path)
+    if route is None or route.is_local:
+        return None
+    return route
+
+
+def _forwarded_for(request) -> str:
+    client = request.META.get("REMOTE_ADDR", "")
+    prior = request.headers.get("X-Forwarded-For")
+    return f"{prior}, {client}" if prior else client
+
+
+def _upstream_headers(request) -> dict:
+    headers = {"X-Forwarded-For": _forwarded_for(request)}
+
+    # Forward the client's User-Agent (auth_service audits it)
+    user_agent = request.headers.get("User-Agent")
+    if user_agent:
+        headers["User-Agent"] = user_agent
 
-        # Forward content type
-        content_type = request.headers.get("Content-Type")
-        if content_type:
-            headers["Content-Type"] = content_type
+    # Forward content type
+    content_type = request.headers.get("Content-Type")
+    if content_type:
+        headers["Content-Type"] = content_type
 
-        # Forward Authorization
-        auth_header = request.headers.get("Authorization")
-        if auth_header:
-            headers["Authorization"] = auth_header
+    # Forward Authorization
+    auth_header = request.headers.get("Authorization")
+    if auth_header:
+        headers["Authorization"] = auth_header
 
-        # User context headers
+    # Ask upstream for a compressed body: it is relayed untouched to clients
+    # accepting that coding and decoded for the others (the compression
+    # middleware may then re-encode it in a coding they do accept).
+    if _passthrough():
+        headers["Accept-Encoding"] = settings.GATEWAY_COMPRESSION["UPSTREAM_ENCODING"]
+    else:
+        headers["Accept-Encoding"] = "identity"
+
+    # User context headers (authenticated routes only; client-sent
+    # X-User-* headers are never forwarded)
+    payload = getattr(request, "jwt_payload", None)
+    if payload is not None:
         headers.update({
-            "X-User-Id": str(request.jwt_payload.get("sub")),
-            "X-Username": request.jwt_payload.get("username", ""),
-            "X-Groups": ",".join(request.jwt_payload.get("groups", [])),
+            "X-User-Id": str(payload.get("sub")),
+            "X-Username": payload.get("username", ""),
+            "X-Groups": ",".join(payload.get("groups", [])),
         })
 
+    return headers
+
+
+def _to_response(status_code: int, content: bytes):
+    try:
+        body = json.loads(content)
+        return JsonResponse(body, status=status_code, safe=False)
+    except ValueError:
+        return JsonResponse(
+            {"detail": content.decode("utf-8", errors="replace")},
+            status=status_code,
+        )
+
+
+def _relayed_headers(upstream_headers) -> dict:
+    return {
+        name: upstream_headers[name]
+        for name in PASSTHROUGH_HEADERS
+        if upstream_headers.get(name) is not None
+    }
+
+
+def _coding_to_remove(relayed_headers: dict, accept_encoding: str | None) -> str | None:
+    """Upstream content coding to decode before relaying (None: relay as-is)."""
+    coding = relayed_headers.get("Content-Encoding", "").strip().lower()
+    if not coding or coding not in DECODERS:
+        return None
+    if _passthrough() and accepts(parse_accept_encoding(accept_encoding), coding):
+        return None
+    return coding
+
+
+def _without_coding(relayed_headers: dict) -> dict:
+    return {
+        name: value
+        for name, value in relayed_headers.items()
+        if name not in ("Content-Encoding", "Content-Length")
+    }
+
+
+def _to_streaming_response(accept_encoding: str | None, status_code: int, upstream_headers, body):
+    relayed = _relayed_headers(upstream_headers)
+    coding = _coding_to_remove(relayed, accept_encoding)
+    if coding is not None:
+        relayed = _without_coding(relayed)
+
+    response = StreamingHttpResponse(body, status=status_code)
+    if coding is not None:
+        # Wrap after construction so the upstream body's close() stays registered
+        decode = adecode_chunks if response.is_async else decode_chunks
+        response.streaming_content = decode(response.streaming_content, DECODERS[coding]())
+    for name, value in relayed.items():
+        response[name] = value
+    return response
+
+
+def _to_buffered_response(accept_encoding: str | None, status_code: int, relayed_headers: dict, body: bytes):
+    coding = _coding_to_remove(relayed_headers, accept_encoding)
+    if coding is not None:
+        body = decode_body(body, coding)
+        relayed_headers = _without_coding(relayed_headers)
+
+    if not _passthrough():
+        return _to_response(status_code, body)
+    response = HttpResponse(body, status=status_code)
+    for name, value in relayed_headers.items():
+        response[name] = value
+    return response
+
+
+def _not_found():
+    return JsonResponse({"detail": "Not found"}, status=404)
+
+
+def _unavailable(retry_after: int | None = None):
+    response = JsonResponse({"detail": "Service unavailable"}, status=503)
+    if retry_after is not None:
+        response["Retry-After"] = str(retry_after)
+    return response
+
+
+def _admit(pool):
+    """Admit a call to ``pool``; returns the fast-fail 503 when rejected."""
+    try:
+        pool.admit()
+    except CircuitOpenError as exc:
+        logger.debug("Circuit open for upstream %s", pool.name)
+        return _unavailable(retry_after=exc.retry_after)
+    except BulkheadFullError:
+        logger.warning("Upstream %s at its concurrency limit", pool.name)
+        return _unavailable()
+    return None
+
+
+class _UpstreamCall:
+    """
+    One request to an upstream endpoint: its start time and client span.
+    The span's ``traceparent`` is added to ``headers`` so the upstream's
+    spans join the trace.
+    """
+
+    def __init__(self, route, endpoint, headers: dict):
+        self.started = time.monotonic()
+        self.span = start_span(
+            f"upstream {route.upstream}",
+            kind="client",
+            attributes={"gateway.route": route.prefix, "upstream.endpoint": endpoint.base_url},
+        )
+        traceparent = self.span.traceparent()
+        if traceparent is not None:
+            headers["traceparent"] = traceparent
+
+
+def _record(pool, route, endpoint, call: _UpstreamCall, status: int | None = None, release: bool = True) -> None:
+    """
+    Record a finished upstream call with the pool's balancer/breaker, the
+    latency histogram and its span. ``status`` is None when no response
+    arrived. With ``release=False`` the call keeps its bulkhead slot until
+    the caller is done with the body (``pool.release_slot()``).
+    """
+    elapsed = time.monotonic() - call.started
+    if status is None:
+        pool.record(endpoint, None, failed=True)
+    else:
+        pool.record(endpoint, elapsed, failed=status >= 500, release=release)
+    UPSTREAM_SECONDS.observe(elapsed, route.prefix, route.upstream, str(status or "error"))
+    call.span.set("http.status_code", status)
+    call.span.end(error="unreachable" if status is None else None)
+
+
+def _too_large():
+    return JsonResponse({"detail": "Request body too large"}, status=413)
+
+
+def _length_required():
+    return JsonResponse({"detail": "Content-Length required"}, status=411)
+
+
+class RequestBodyTooLarge(Exception):
+    """The client sent more than GATEWAY_MAX_REQUEST_BODY_SIZE bytes."""
+
+
+class LengthRequired(Exception):
+    """The client sent a chunked body without a Content-Length."""
+
+
+def _content_length(request) -> int:
+    try:
+        return max(int(request.META.get("CONTENT_LENGTH") or 0), 0)
+    except ValueError:
+        return 0
+
+
+class _RequestBody:
+    """
+    Client request body read straight from the WSGI/ASGI input in chunks.
+
+    ``request.body`` is never touched, so uploads are relayed without being
+    held in gateway memory. ``__len__`` reports the declared Content-Length
+    so the upstream receives a sized (not chunked) request, and the byte
+    limit is re-checked while streaming.
+    """
+
+    def __init__(self, request, length: int):
+        self._request = request
+        self._length = length
+        self._max_size = settings.GATEWAY_MAX_REQUEST_BODY_SIZE
+        self._chunk_size = settings.GATEWAY_STREAM_CHUNK_SIZE
+        self._sent = 0
+
+    def __len__(self):
+        return self._length
+
+    def _next_chunk(self) -> bytes:
+        chunk = self._request.read(self._chunk_size)
+        self._sent += len(chunk)
+        if self._sent > self._max_size:
+            raise RequestBodyTooLarge(f"Request body exceeds {self._max_size} bytes")
+        return chunk
+
+    def __iter__(self):
+        while chunk := self._next_chunk():
+            yield chunk
+
+    async def __aiter__(self):
+        while chunk := self._next_chunk():
+            yield chunk
+
+
+def _request_body(request):
+    """
+    Return the streaming body for ``request`` (None when it has none).
+
+    :raises: RequestBodyTooLarge when the declared length is over the limit,
+        LengthRequired for a chunked body (the WSGI request stream reads
+        nothing without a Content-Length, so it would be forwarded empty)
+    """
+    length = _content_length(request)
+    if not length and "chunked" in request.META.get("HTTP_TRANSFER_ENCODING", "").lower():
+        raise LengthRequired("Chunked request bodies are not supported")
+    if length > settings.GATEWAY_MAX_REQUEST_BODY_SIZE:
+        raise RequestBodyTooLarge(f"Request body exceeds {settings.GATEWAY_MAX_REQUEST_BODY_SIZE} bytes")
+    if not length:
+        return None
+    return _RequestBody(request, length)
+
+
+class _UpstreamBody:
+    """
+    Upstream body chunks for a StreamingHttpResponse.
+
+    ``release`` runs once, when the body is exhausted or when Django
+    closes the response (client disconnects included), so the upstream
+    connection goes back to its pool, and the call's bulkhead slot is
+    freed, as soon as it is free.
+    """
+
+    def __init__(self, chunks, release):
+        self._chunks = chunks
+        self._release = release
+
+    def __iter__(self):
+        try:
+            yield from self._chunks
+        finally:
+            self.close()
+
+    def close(self):
+        release, self._release = self._release, None
+        if release is not None:
+            release()
+
+
+class _AsyncUpstreamBody(_UpstreamBody):
+    def __iter__(self):
+        raise TypeError("Async upstream body must be consumed with 'async for'")
+
+    async def __aiter__(self):
+        try:
+            async for chunk in self._chunks:
+                yield chunk
+        finally:
+            self.close()
+
+
+# ============================================================
+# Buffered GETs (routes with a CACHE policy or COALESCE)
+# ============================================================
+
+SAFE_METHODS = ("GET", "HEAD", "OPTIONS")
+
+
+class _UpstreamFailed(Exception):
+    """A buffered upstream call produced no response (answered with 503)."""
+
+    def __init__(self, retry_after=None):
+        super().__init__(retry_after)
+        self.retry_after = retry_after
+
+    def response(self):
+        # Built per caller: coalesced followers share the exception.
+        return _unavailable(retry_after=self.retry_after)
+
+
+def _buffered(request, route) -> bool:
+    return request.method == "GET" and (route.cache is not None or route.coalesce)
+
+
+def _fetch(route, path: str, headers: dict, params: list):
+    """
+    Buffered GET to the route's upstream.
+
+    :returns: (status, relayed headers, body as received)
+    :raises: _UpstreamFailed
+    """
+    headers = dict(headers)  # shared with coalesced callers and the cache
+    pool = get_pool(route.upstream)
+    rejected = _admit(pool)
+    if rejected is not None:
+        raise _UpstreamFailed(rejected.get("Retry-After"))
+
+    try:
+        entry = pool.acquire()
+    except PoolExhaustedError:
+        pool.cancel()
+        logger.warning("Upstream pool exhausted for %s", route.upstream)
+        raise _UpstreamFailed()
+
+    endpoint = pool.pick_endpoint()
+    call = _UpstreamCall(route, endpoint, headers)
+    try:
+        response = entry.session.request(
+            method="GET",
+            url=endpoint.url(path),
+            headers=headers,
+            params=params,
+            timeout=(pool.connect_timeout, route.timeout),
+            stream=True,
+        )
+    except requests.RequestException as exc:
+        _record(pool, route, endpoint, call)
+        pool.release(entry, discard=isinstance(exc, requests.ConnectionError))
+        logger.exception("Upstream %s unreachable (%s)", route.upstream, endpoint.base_url)
+        raise _UpstreamFailed()
+
+    _record(pool, route, endpoint, call, response.status_code, release=False)
+    try:
+        # Still encoded: cached and replayed exactly as the upstream sent it.
+        body = response.raw.read(decode_content=False)
+    except (requests.RequestException, urllib3.exceptions.HTTPError):
+        response.close()
+        pool.release(entry, discard=True)
+        logger.exception("Upstream %s failed mid-response", route.upstream)
+        raise _UpstreamFailed()
+    finally:
+        pool.release_slot()
+
+    response.close()
+    pool.release(entry)
+    return response.status_code, _relayed_headers(response.headers), body
+
+
+async def _afetch(route, path: str, headers: dict, params: list):
+    """Async ``_fetch`` on the upstream's aiohttp client."""
+    headers = dict(headers)
+    pool = get_pool(route.upstream)
+    # Before admitting: a failure here must not hold a bulkhead slot
+    client = get_async_client(route.upstream)
+    rejected = _admit(pool)
+    if rejected is not None:
+        raise _UpstreamFailed(rejected.get("Retry-After"))
+
+    endpoint = pool.pick_endpoint()
+    call = _UpstreamCall(route, endpoint, headers)
+    try:
+        response = await client.request(
+            method="GET",
+            url=endpoint.url(path),
+            headers=headers,
+            params=params,
+            timeout=aiohttp.ClientTimeout(
+                connect=pool.acquire_timeout,
+                sock_connect=pool.connect_timeout,
+                sock_read=route.timeout,
+            ),
+        )
+    except (aiohttp.ClientError, asyncio.TimeoutError):
+        _record(pool, route, endpoint, call)
+        logger.exception("Upstream %s unreachable (%s)", route.upstream, endpoint.base_url)
+        raise _UpstreamFailed()
+
+    _record(pool, route, endpoint, call, response.status, release=False)
+    try:
+        # auto_decompress is off: the body is kept exactly as sent.
+        body = await response.read()
+    except (aiohttp.ClientError, asyncio.TimeoutError):
+        logger.exception("Upstream %s failed mid-response", route.upstream)
+        raise _UpstreamFailed()
+    finally:
+        response.release()
+        pool.release_slot()
+    return response.status, _relayed_headers(response.headers), body
+
+
+class _BufferedGet:
+    """
+    A GET answered from one buffered upstream body: looked up in the
+    response cache, and shared with identical concurrent GETs.
+    """
+
+    def __init__(self, request, route):
+        self.route = route
+        self.headers = _upstream_headers(request)
+        self.path = route.upstream_path(request.path)
+        self.params = list(request.GET.items())
+        self.base = base_key(request.path, self.params, getattr(request, "jwt_payload", None))
+        self.bypass_cache = "no-cache" in request.headers.get("Cache-Control", "")
+        self.accept_encoding = request.headers.get("Accept-Encoding")
+
+    @property
+    def flight_key(self):
+        # Same upstream coding requested; each caller decodes as needed.
+        return (self.base, self.headers.get("Accept-Encoding"))
+
+    def cached(self):
+        """Cached response (stale ones trigger a background refresh), or None."""
+        if self.route.cache is None or self.bypass_cache:
+            return None
+        cache = get_response_cache()
+        entry, stale = cache.get(self.base, self.headers)
+        if entry is None:
+            return None
+        if stale:
+            cache.revalidate(self.base, self.headers, lambda: self.store(_fetch(self.route, self.path, self.headers, self.params)))
+
+        response = _to_buffered_response(self.accept_encoding, entry.status, entry.headers, entry.body)
+        response["Age"] = str(entry.age(time.monotonic()))
+        response["X-Cache"] = "STALE" if stale else "HIT"
+        return response
+
+    def store(self, result):
+        if self.route.cache is not None:
+            status, relayed, body = result
+            get_response_cache().store(self.base, self.headers, status, relayed, body, self.route.cache)
+        return result
+
+    def fetch(self):
+        return self.store(_fetch(self.route, self.path, self.headers, self.params))
+
+    async def afetch(self):
+        return self.store(await _afetch(self.route, self.path, self.headers, self.params))
+
+    def respond(self, result):
+        response = _to_buffered_response(self.accept_encoding, *result)
+        if self.route.cache is not None:
+            response["X-Cache"] = "MISS"
+        return response
+
+
+def _cache_purge(request, route, response) -> None:
+    """A successful write through a cached route purges its resources."""
+    if route.cache is not None and request.method not in SAFE_METHODS and response.status_code < 400:
+        purged = get_response_cache().purge(route.cache.purge)
+        logger.debug("%s %s purged %d cached responses", request.method, request.path, purged)
+
+
+class UpstreamProxy(View):
+    """Proxies a request to the upstream pool its gateway route names."""
+
+    def dispatch(self, request, *args, **kwargs):
+        route = _route(request)
+        if route is None:
+            return _not_found()
+
+        if _buffered(request, route):
+            return self._buffered_get(_BufferedGet(request, route))
+
+        response = self._forward(request, route)
+        _cache_purge(request, route, response)
+        return response
+
+    def _buffered_get(self, get):
+        response = get.cached()
+        if response is not None:
+            return response
+        try:
+            if get.route.coalesce:
+                result = single_flight.do(get.flight_key, get.fetch)
+            else:
+                result = get.fetch()
+        except _UpstreamFailed as exc:
+            return exc.response()
+        return get.respond(result)
+
+    def _forward(self, request, route):
+        pool = get_pool(route.upstream)
+        path = route.upstream_path(request.path)
+        headers = _upstream_headers(request)
+        stream = _passthrough()
+
+        try:
+            body = _request_body(request)
+        except RequestBodyTooLarge:
+            return _too_large()
+        except LengthRequired:
+            return _length_required()
+
+        rejected = _admit(pool)
+        if rejected is not None:
+            return rejected
+
+        try:
+            entry = pool.acquire()
+        except PoolExhaustedError:
+            pool.cancel()
+            logger.warning("Upstream pool exhausted for %s", route.upstream)
+            return _unavailable()
+
+        endpoint = pool.pick_endpoint()
+        url = endpoint.url(path)
         logger.debug("Proxy %s %s -> %s", request.method, request.path, url)
 
+        call = _UpstreamCall(route, endpoint, headers)
         try:
-            response = requests.request(
+            response = entry.session.request(
                 method=request.method,
                 url=url,
                 headers=headers,
                 params=request.GET,
-                data=request.body,
-                timeout=10,
+                data=body,
+                timeout=(pool.connect_timeout, route.timeout),
+                stream=stream,
             )
-        except requests.RequestException:
-            logger.exception("Master service unreachable")
-            return JsonResponse({"detail": "Service unavailable"}, status=503)
+        except RequestBodyTooLarge:
+            pool.cancel(endpoint)
+            call.span.end(error="request body too large")
+            pool.release(entry, discard=True)
+            return _too_large()
+        except requests.RequestException as exc:
+            _record(pool, route, endpoint, call)
+            pool.release(entry, discard=isinstance(exc, requests.ConnectionError))
+            logger.exception("Upstream %s unreachable (%s)", route.upstream, endpoint.base_url)
+            return _unavailable()
+
+        if not stream:
+            _record(pool, route, endpoint, call, response.status_code)
+            pool.release(entry)
+            return _to_response(response.status_code, response.content)
+
+        # The session stays in use while the body streams: so does the slot
+        _record(pool, route, endpoint, call, response.status_code, release=False)
+
+        def release():
+            response.close()
+            pool.release(entry)
+            pool.release_slot()
+
+        chunks = response.raw.stream(settings.GATEWAY_STREAM_CHUNK_SIZE, decode_content=False)
+        return _to_streaming_response(
+            request.headers.get("Accept-Encoding"),
+            response.status_code,
+            response.headers,
+            _UpstreamBody(chunks, release),
+        )
+
+
+class AsyncUpstreamProxy(View):
+    """
+    Non-blocking variant of ``UpstreamProxy`` for ASGI deployments.
+
+    The upstream call is awaited on a shared ``aiohttp.ClientSession``, so an
+    in-flight request holds a socket rather than a worker thread.
+    Selected with ``GATEWAY_PROXY_MODE = "async"``.
+    """
+
+    # Only dispatch() is overridden, which View cannot detect on its own.
+    view_is_async = True
 
+    async def dispatch(self, request, *args, **kwargs):
+        route = _route(request)
+        if route is None:
+            return _not_found()
+
+        if _buffered(request, route):
+            return await self._buffered_get(_BufferedGet(request, route))
+
+        response = await self._forward(request, route)
+        _cache_purge(request, route, response)
+        return response
+
+    async def _buffered_get(self, get):
+        response = get.cached()
+        if response is not None:
+            return response
+        try:
+            if get.route.coalesce:
+                result = await single_flight.ado(get.flight_key, get.afetch)
+            else:
+                result = await get.afetch()
+        except _UpstreamFailed as exc:
+            return exc.response()
+        return get.respond(result)
+
+    async def _forward(self, request, route):
         try:
-            body = response.json()
-            return JsonResponse(body, status=response.status_code, safe=False)
-        except ValueError:
-            return JsonResponse(
-                {"detail": response.text},
-                status=response.status_code,
+            body = _request_body(request)
+        except RequestBodyTooLarge:
+            return _too_large()
+        except LengthRequired:
+            return _length_required()
+
+        pool = get_pool(route.upstream)
+        # Before admitting: a failure here must not hold a bulkhead slot
+        client = get_async_client(route.upstream)
+        rejected = _admit(pool)
+        if rejected is not None:
+            return rejected
+
+        endpoint = pool.pick_endpoint()
+        url = endpoint.url(route.upstream_path(request.path))
+        headers = _upstream_headers(request)
+
+        logger.debug("Proxy (async) %s %s -> %s", request.method, request.path, url)
+
+        if body is not None:
+            # Sized upload: keeps aiohttp from falling back to chunked encoding.
+            headers["Content-Length"] = str(len(body))
+
+        call = _UpstreamCall(route, endpoint, headers)
+        try:
+            response = await client.request(
+                method=request.method,
+                url=url,
+                headers=headers,
+                params=list(request.GET.items()),
+                data=body,
+                timeout=aiohttp.ClientTimeout(
+                    connect=pool.acquire_timeout,
+                    sock_connect=pool.connect_timeout,
+                    sock_read=route.timeout,
+                ),
             )
+        except RequestBodyTooLarge:
+            pool.cancel(endpoint)
+            call.span.end(error="request body too large")
+            return _too_large()
+        except (aiohttp.ClientError, asyncio.TimeoutError):
+            _record(pool, route, endpoint, call)
+            logger.exception("Upstream %s unreachable (%s)", route.upstream, endpoint.base_url)
+            return _unavailable()
+
+        # The connection stays in use while the body is read: so does the slot
+        _record(pool, route, endpoint, call, response.status, release=False)
+
+        if not _passthrough():
+            try:
+                content = await response.read()
+            except (aiohttp.ClientError, asyncio.TimeoutError):
+                logger.exception("Upstream %s unreachable", route.upstream)
+                return _unavailable()
+            finally:
+                response.release()
+                pool.release_slot()
+            return _to_response(response.status, content)
+
+        def release():
+            response.release()
+            pool.release_slot()
 
-    
\ No newline at end of file
+        chunks = response.content.iter_chunked(settings.GATEWAY_STREAM_CHUNK_SIZE)
+        return _to_streaming_response(
+            request.headers.get("Accept-Encoding"),
+            response.status,
+            response.headers,
+            _AsyncUpstreamBody(chunks, release),
+        )
@@ -0,0 +1,17 @@
+from django.http import JsonResponse
+from django.views import View
+
+from gateway.services.coalesce import single_flight
+from gateway.services.response_cache import response_cache_stats
+from gateway.services.upstream import pool_stats
+
+
+class UpstreamStatsView(View):
+    """Expose upstream pool, response cache and coalescing metrics for sizing."""
+
+    def get(self, request):
+        return JsonResponse({
+            "pools": pool_stats(),
+            "response_cache": response_cache_stats(),
+            "coalescing": single_flight.stats(),
+        })
@@ -0,0 +1,16 @@
+from django.apps import AppConfig
+from django.conf import settings
+
+
+class AuthenticationConfig(AppConfig):
+    name = "apps.authentication"
+    default_auto_field = "django.db.models.BigAutoField"
+
+    def ready(self):
+        from apps.authentication import signals  # noqa: F401
+
+        if getattr(settings, "PASSWORD_HASHER_MODE", "fixed") == "calibrated":
+            from django.contrib.auth.hashers import get_hasher
+
+            # Measure the hash cost at startup rather than on the first login.
+            get_hasher().iterations
@@ -0,0 +1,42 @@
+from django.contrib.auth import get_user_model
+from django.contrib.auth.backends import ModelBackend
+from django.contrib.auth.hashers import check_password
+from erp_tracing.tracer import span
+
+from apps.authentication.services.rehash import schedule_rehash
+
+UserModel = get_user_model()
+
+
+class DeferredRehashModelBackend(ModelBackend):
+    """ModelBackend that upgrades outdated password hashes off the request.
+
+    Same lookup and timing behaviour as ``ModelBackend.authenticate``, but
+    when the stored hash needs updating the rehash is scheduled on the
+    background executor (services/rehash.py) instead of running inline.
+    """
+
+    def authenticate(self, request, username=None, password=None, **kwargs):
+        if username is None:
+            username = kwargs.get(UserModel.USERNAME_FIELD)
+        if username is None or password is None:
+            return None
+
+        try:
+            user = UserModel._default_manager.get_by_natural_key(username)
+        except UserModel.DoesNotExist:
+            # Run the default password hasher once to reduce the timing
+            # difference between an existing and a nonexistent user.
+            UserModel().set_password(password)
+            return None
+
+        encoded = user.password
+
+        def setter(raw_password):
+            schedule_rehash(user.pk, encoded, raw_password)
+
+        with span("password.check"):
+            valid = check_password(password, encoded, setter)
+        if valid and self.user_can_authenticate(user):
+            return user
+        return None
@@ -0,0 +1,132 @@
+"""
+Audit log retention
+-------------------
+Moves ``auth_audit_log`` rows older than ``AUTH_AUDIT_RETENTION_DAYS``
+into monthly, gzip-compressed JSON Lines archives and deletes them from
+the table in id-ordered batches, so the live table only ever holds the
+retention window:
+
+    <AUTH_AUDIT_ARCHIVE_DIR>/auth_audit_log-2026-01.jsonl.gz
+
+Each batch is appended (as its own gzip member) and fsynced before its
+rows are deleted; a crash in between re-archives those rows on the next
+run, so an archive can contain duplicates but never misses a row
+(deduplicate by ``id`` when reading). Archives older than
+``AUTH_AUDIT_ARCHIVE_RETENTION_DAYS`` are removed (0 keeps them).
+
+Run it daily (cron / scheduler):
+
+    python manage.py archive_audit_log
+    python manage.py archive_audit_log --days 30 --dry-run
+"""
+
+import gzip
+import json
+import os
+import time
+from datetime import timedelta
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+from django.utils import timezone
+
+from apps.authentication.models.audit import AuthAuditLog
+
+ARCHIVE_PREFIX = "auth_audit_log-"
+ARCHIVE_SUFFIX = ".jsonl.gz"
+
+FIELDS = [field.attname for field in AuthAuditLog._meta.concrete_fields]
+
+
+def _archive_path(archive_dir: Path, created_at) -> Path:
+    return archive_dir / f"{ARCHIVE_PREFIX}{created_at:%Y-%m}{ARCHIVE_SUFFIX}"
+
+
+def _append(path: Path, rows: list) -> None:
+    data = "".join(json.dumps(row, cls=DjangoJSONEncoder) + "\n" for row in rows)
+    with open(path, "ab") as raw:
+        with gzip.GzipFile(fileobj=raw, mode="wb") as archive:
+            archive.write(data.encode())
+        raw.flush()
+        os.fsync(raw.fileno())
+
+
+class Command(BaseCommand):
+    help = "Archive auth_audit_log rows past the retention window and delete them."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--days",
+            type=int,
+            default=getattr(settings, "AUTH_AUDIT_RETENTION_DAYS", 90),
+            help="Keep this many days of rows in the table.",
+        )
+        parser.add_argument("--batch-size", type=int, default=5000)
+        parser.add_argument("--dry-run", action="store_true")
+
+    def handle(self, *args, **options):
+        days = options["days"]
+        batch_size = options["batch_size"]
+        if days < 1 or batch_size < 1:
+            raise CommandError("--days and --batch-size must be positive")
+
+        archive_dir = Path(settings.AUTH_AUDIT_ARCHIVE_DIR)
+        cutoff = timezone.now() - timedelta(days=days)
+        aged = AuthAuditLog.objects.filter(created_at__lt=cutoff)
+
+        if options["dry_run"]:
+            self.stdout.write(f"{aged.count()} rows older than {cutoff:%Y-%m-%d %H:%M} would be archived")
+            return
+
+        archive_dir.mkdir(parents=True, exist_ok=True)
+
+        started = time.perf_counter()
+        archived = 0
+        last_id = 0
+        while True:
+            rows = list(
+                aged.filter(id__gt=last_id).order_by("id").values(*FIELDS)[:batch_size]
+            )
+            if not rows:
+                break
+
+            by_month = {}
+            for row in rows:
+                by_month.setdefault(_archive_path(archive_dir, row["created_at"]), []).append(row)
+            for path, month_rows in by_month.items():
+                _append(path, month_rows)
+
+            ids = [row["id"] for row in rows]
+            with transaction.atomic():
+                AuthAuditLog.objects.filter(id__in=ids).delete()
+
+            archived += len(rows)
+            last_id = ids[-1]
+
+        removed = self._expire_archives(archive_dir)
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Archived {archived} rows older than {cutoff:%Y-%m-%d} "
+                f"to {archive_dir} in {time.perf_counter() - started:.1f}s"
+                + (f"; removed {removed} expired archives" if removed else "")
+            )
+        )
+
+    def _expire_archives(self, archive_dir: Path) -> int:
+        retention = getattr(settings, "AUTH_AUDIT_ARCHIVE_RETENTION_DAYS", 0)
+        if not retention:
+            return 0
+
+        oldest = f"{timezone.now() - timedelta(days=retention):%Y-%m}"
+        removed = 0
+        for path in archive_dir.glob(f"{ARCHIVE_PREFIX}*{ARCHIVE_SUFFIX}"):
+            month = path.name[len(ARCHIVE_PREFIX):-len(ARCHIVE_SUFFIX)]
+            # Whole months only: a month is removed once all of it has aged out.
+            if month < oldest:
+                path.unlink()
+                removed += 1
+        return removed
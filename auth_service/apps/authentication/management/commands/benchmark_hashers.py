@@ -0,0 +1,71 @@
+"""
+Password hasher benchmark
+-------------------------
+Reports password verification latency (what a login pays) for every
+hasher in ``PASSWORD_HASHERS`` plus the calibrated PBKDF2 hasher, and the
+PBKDF2 iteration count that meets a per-hash target on this host. Hashers
+whose library is not installed (argon2-cffi, bcrypt) are skipped.
+
+    python manage.py benchmark_hashers --iterations 50 --target-ms 100
+"""
+
+import statistics
+import time
+
+from django.conf import settings
+from django.contrib.auth.hashers import get_hashers
+from django.core.management.base import BaseCommand
+
+from config.hashers import calibrate_pbkdf2_iterations, CalibratedPBKDF2PasswordHasher
+
+
+class Command(BaseCommand):
+    help = "Measure password verification latency (p50/p99) per hasher."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--iterations", type=int, default=50)
+        parser.add_argument(
+            "--target-ms",
+            type=int,
+            default=settings.PASSWORD_HASH_CALIBRATION["TARGET_MS"],
+        )
+
+    def handle(self, *args, **options):
+        target_ms = options["target_ms"]
+        calibration = settings.PASSWORD_HASH_CALIBRATION
+        suggested = calibrate_pbkdf2_iterations(
+            target_ms,
+            calibration["MIN_ITERATIONS"],
+            calibration["MAX_ITERATIONS"],
+        )
+        self.stdout.write(f"PBKDF2-SHA256 iterations for {target_ms} ms per hash on this host: {suggested}\n")
+
+        hashers = [(type(hasher).__name__, hasher) for hasher in get_hashers()]
+        if not any(isinstance(hasher, CalibratedPBKDF2PasswordHasher) for _, hasher in hashers):
+            hashers.append(("CalibratedPBKDF2PasswordHasher", CalibratedPBKDF2PasswordHasher()))
+
+        self.stdout.write(f"{'hasher':<32} {'cost':>10} {'p50 ms':>9} {'p99 ms':>9} {'max ms':>9}")
+        for name, hasher in hashers:
+            try:
+                encoded = hasher.encode("benchmark-password", hasher.salt())
+            except ValueError as exc:
+                # Missing optional library (argon2 / bcrypt)
+                self.stdout.write(f"{name:<32} skipped: {exc}")
+                continue
+
+            samples = []
+            for _ in range(options["iterations"]):
+                started = time.perf_counter()
+                hasher.verify("benchmark-password", encoded)
+                samples.append((time.perf_counter() - started) * 1000)
+
+            samples.sort()
+            p99 = samples[min(len(samples) - 1, int(len(samples) * 0.99))]
+            cost = hasher.safe_summary(encoded)
+            cost = next(
+                (str(cost[key]) for key in ("iterations", "work factor", "time cost") if key in cost),
+                "-",
+            )
+            self.stdout.write(
+                f"{name:<32} {cost:>10} {statistics.median(samples):>9.1f} {p99:>9.1f} {samples[-1]:>9.1f}"
+            )
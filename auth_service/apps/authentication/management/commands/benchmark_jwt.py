@@ -0,0 +1,72 @@
+"""
+JWT signature micro-benchmark
+-----------------------------
+Compares sign/verify throughput of the supported signature algorithms
+with freshly generated in-memory keys, using the same claims shape as
+``erp_jwt.encoder.generate_access_token``.
+
+    python manage.py benchmark_jwt --iterations 2000
+"""
+
+import time
+
+import jwt
+from cryptography.hazmat.primitives.asymmetric import ec, ed25519, rsa
+from django.core.management.base import BaseCommand
+
+
+def _generate_key(algorithm: str, rsa_bits: int):
+    if algorithm.startswith(("RS", "PS")):
+        return rsa.generate_private_key(public_exponent=65537, key_size=rsa_bits)
+    if algorithm == "ES256":
+        return ec.generate_private_key(ec.SECP256R1())
+    if algorithm == "ES384":
+        return ec.generate_private_key(ec.SECP384R1())
+    if algorithm == "EdDSA":
+        return ed25519.Ed25519PrivateKey.generate()
+    raise ValueError(f"Unsupported algorithm {algorithm}")
+
+
+class Command(BaseCommand):
+    help = "Measure JWT sign/verify throughput for RS256, ES256 and EdDSA."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--iterations", type=int, default=2000)
+        parser.add_argument("--algorithms", default="RS256,ES256,EdDSA")
+        parser.add_argument("--rsa-bits", type=int, default=2048)
+
+    def handle(self, *args, **options):
+        iterations = options["iterations"]
+        now = int(time.time())
+        payload = {
+            "sub": "42",
+            "username": "benchmark",
+            "groups": ["admin", "masters"],
+            "iat": now,
+            "exp": now + 3600,
+            "iss": "auth_service",
+            "type": "access",
+        }
+
+        self.stdout.write(f"{'algorithm':<10} {'sign/s':>10} {'us/sign':>10} {'verify/s':>10} {'us/verify':>10} {'bytes':>6}")
+
+        for algorithm in options["algorithms"].split(","):
+            private_key = _generate_key(algorithm, options["rsa_bits"])
+            public_key = private_key.public_key()
+
+            started = time.perf_counter()
+            for _ in range(iterations):
+                token = jwt.encode(payload, private_key, algorithm=algorithm)
+            sign_elapsed = time.perf_counter() - started
+
+            started = time.perf_counter()
+            for _ in range(iterations):
+                jwt.decode(token, public_key, algorithms=[algorithm], issuer="auth_service")
+            verify_elapsed = time.perf_counter() - started
+
+            self.stdout.write(
+                f"{algorithm:<10} "
+                f"{iterations / sign_elapsed:>10.0f} {sign_elapsed / iterations * 1e6:>10.1f} "
+                f"{iterations / verify_elapsed:>10.0f} {verify_elapsed / iterations * 1e6:>10.1f} "
+                f"{len(token):>6}"
+            )
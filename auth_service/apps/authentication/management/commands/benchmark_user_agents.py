@@ -0,0 +1,85 @@
+"""
+User-Agent classification benchmark
+-----------------------------------
+Measures ``classify_user_agent`` per-call cost over a corpus of real
+User-Agent strings, uncached (every call runs the rule list) and cached
+(the LRU in ``audit_utils``), and prints how each string is classified.
+
+    python manage.py benchmark_user_agents --iterations 20000 --show
+"""
+
+import time
+
+from django.core.management.base import BaseCommand
+
+from apps.authentication.services import audit_utils
+
+
+CORPUS = (
+    # Desktop
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/124.0.0.0 Safari/537.36",
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/124.0.0.0 Safari/537.36 Edg/124.0.2478.67",
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/123.0.0.0 Safari/537.36 OPR/109.0.0.0",
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64; rv:125.0) Gecko/20100101 Firefox/125.0",
+    "Mozilla/5.0 (Windows NT 6.1; WOW64; Trident/7.0; rv:11.0) like Gecko",
+    "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/17.4.1 Safari/605.1.15",
+    "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/124.0.0.0 Safari/537.36",
+    "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/124.0.0.0 Safari/537.36",
+    "Mozilla/5.0 (X11; Ubuntu; Linux x86_64; rv:125.0) Gecko/20100101 Firefox/125.0",
+    "Mozilla/5.0 (X11; CrOS x86_64 14541.0.0) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/124.0.0.0 Safari/537.36",
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/122.0.0.0 YaBrowser/24.4.0.0 Safari/537.36",
+    # Mobile / tablet
+    "Mozilla/5.0 (Linux; Android 10; K) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/124.0.0.0 Mobile Safari/537.36",
+    "Mozilla/5.0 (Linux; Android 14; SM-S918B) AppleWebKit/537.36 (KHTML, like Gecko) SamsungBrowser/24.0 Chrome/117.0.0.0 Mobile Safari/537.36",
+    "Mozilla/5.0 (iPhone; CPU iPhone OS 17_4_1 like Mac OS X) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/17.4.1 Mobile/15E148 Safari/604.1",
+    "Mozilla/5.0 (iPhone; CPU iPhone OS 17_4 like Mac OS X) AppleWebKit/605.1.15 (KHTML, like Gecko) CriOS/124.0.6367.88 Mobile/15E148 Safari/604.1",
+    "Mozilla/5.0 (iPhone; CPU iPhone OS 17_4 like Mac OS X) AppleWebKit/605.1.15 (KHTML, like Gecko) FxiOS/125.0 Mobile/15E148 Safari/605.1.15",
+    "Mozilla/5.0 (iPad; CPU OS 17_4 like Mac OS X) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/17.4 Mobile/15E148 Safari/604.1",
+    "Mozilla/5.0 (Linux; Android 13; SM-X710) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/124.0.0.0 Safari/537.36",
+    "Mozilla/5.0 (Linux; Android 14; Pixel 8) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/124.0.0.0 Mobile Safari/537.36 EdgA/124.0.2478.64",
+    # Bots and HTTP clients
+    "Mozilla/5.0 (compatible; Googlebot/2.1; +http://www.google.com/bot.html)",
+    "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) HeadlessChrome/124.0.0.0 Safari/537.36",
+    "curl/8.5.0",
+    "PostmanRuntime/7.37.3",
+    "python-requests/2.31.0",
+    "okhttp/4.12.0",
+)
+
+
+class Command(BaseCommand):
+    help = "Measure User-Agent classification cost with and without the LRU cache."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--iterations", type=int, default=20000)
+        parser.add_argument("--show", action="store_true", help="Print the classification of each UA.")
+
+    def handle(self, *args, **options):
+        iterations = options["iterations"]
+        corpus = [CORPUS[i % len(CORPUS)] for i in range(iterations)]
+
+        if options["show"]:
+            for user_agent in CORPUS:
+                info = audit_utils.classify_user_agent(user_agent)
+                self.stdout.write(
+                    f"{info.browser:<18} {info.version:<5} {info.os:<14} {info.device:<8} {user_agent[:70]}"
+                )
+            self.stdout.write("")
+
+        started = time.perf_counter()
+        for user_agent in corpus:
+            audit_utils._classify(user_agent)
+        uncached = time.perf_counter() - started
+
+        audit_utils._classify_cached.cache_clear()
+        started = time.perf_counter()
+        for user_agent in corpus:
+            audit_utils.classify_user_agent(user_agent)
+        cached = time.perf_counter() - started
+
+        self.stdout.write(f"{'mode':<10} {'us/call':>10} {'calls/s':>12}")
+        for mode, elapsed in (("uncached", uncached), ("cached", cached)):
+            self.stdout.write(
+                f"{mode:<10} {elapsed / iterations * 1e6:>10.2f} {iterations / elapsed:>12.0f}"
+            )
+        self.stdout.write(f"cache: {audit_utils.user_agent_cache_info()}")
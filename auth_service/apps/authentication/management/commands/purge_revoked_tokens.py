@@ -0,0 +1,24 @@
+"""
+Deletes RevokedToken rows whose token has expired (verifiers drop them
+too; an expired token fails verification on its own) and refresh-token
+families whose current token has expired. Run periodically:
+
+    python manage.py purge_revoked_tokens
+"""
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from apps.authentication.models.refresh_family import RefreshTokenFamily
+from apps.authentication.models.revocation import RevokedToken
+
+
+class Command(BaseCommand):
+    help = "Delete revocation entries and refresh-token families that have expired."
+
+    def handle(self, *args, **options):
+        now = timezone.now()
+        deleted, _ = RevokedToken.objects.filter(expires_at__lte=now).delete()
+        self.stdout.write(self.style.SUCCESS(f"Deleted {deleted} expired revocations"))
+        deleted, _ = RefreshTokenFamily.objects.filter(expires_at__lte=now).delete()
+        self.stdout.write(self.style.SUCCESS(f"Deleted {deleted} expired refresh-token families"))
@@ -1 +1,3 @@
 from .audit import AuthAuditLog
+from .revocation import RevokedToken
+from .refresh_family import RefreshTokenFamily
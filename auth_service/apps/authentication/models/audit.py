@@ -1,4 +1,5 @@
 from django.db import models
+from django.utils import timezone
 from django.contrib.auth.models import User
 
 
@@ -6,7 +7,9 @@ class AuthAuditLog(models.Model):
     EVENT_CHOICES = (
         ("LOGIN_SUCCESS", "Login Success"),
         ("LOGIN_FAILED", "Login Failed"),
+        ("LOGIN_THROTTLED", "Login Throttled"),
         ("LOGOUT", "Logout"),
+        ("REFRESH_REUSE", "Refresh Token Reuse"),
     )
 
     user = models.ForeignKey(
@@ -22,12 +25,16 @@ class AuthAuditLog(models.Model):
     os = models.CharField(max_length=128, null=True, blank=True)
     failure_reason = models.CharField(max_length=255, null=True, blank=True)
     metadata = models.JSONField(default=dict, blank=True)
-    created_at = models.DateTimeField(auto_now_add=True)
+    # Set when the event happens, not when the batched writer inserts it.
+    created_at = models.DateTimeField(default=timezone.now, editable=False)
 
     class Meta:
         db_table = "auth_audit_log"
         indexes = [
-            models.Index(fields=["event_type"]),
+            # Covers event_type-only lookups and "events of type X in
+            # a time range" (e.g. failed logins in the last hour).
+            models.Index(fields=["event_type", "created_at"]),
+            # Range scans by age (retention, see archive_audit_log).
             models.Index(fields=["created_at"]),
         ]
 
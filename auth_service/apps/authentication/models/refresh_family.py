@@ -0,0 +1,28 @@
+from django.db import models
+from django.contrib.auth.models import User
+from django.utils import timezone
+
+
+class RefreshTokenFamily(models.Model):
+    """The refresh tokens issued from one login, rotated on every refresh.
+
+    Only ``current_jti`` may be exchanged; the conditional UPDATE that
+    replaces it is what makes a refresh single-use across workers.
+    """
+
+    family = models.CharField(max_length=64, unique=True)
+    user = models.ForeignKey(User, on_delete=models.CASCADE)
+    current_jti = models.CharField(max_length=64)
+    revoked = models.BooleanField(default=False)
+    # Expiry of current_jti: the family is dead after it either way
+    expires_at = models.DateTimeField()
+    created_at = models.DateTimeField(default=timezone.now, editable=False)
+
+    class Meta:
+        db_table = "auth_refresh_token_family"
+        indexes = [
+            models.Index(fields=["expires_at"]),
+        ]
+
+    def __str__(self):
+        return f"{self.family} ({'revoked' if self.revoked else self.current_jti})"
@@ -0,0 +1,36 @@
+from django.db import models
+from django.contrib.auth.models import User
+from django.utils import timezone
+
+
+class RevokedToken(models.Model):
+    """A token revoked before its expiry, identified by its ``jti``.
+
+    The auto-increment id doubles as the cursor verifiers use to pull
+    only new revocations (``/api/auth/revocations/?since=<id>``).
+    """
+
+    TOKEN_TYPE_CHOICES = (
+        ("access", "Access"),
+        ("refresh", "Refresh"),
+    )
+
+    jti = models.CharField(max_length=64, unique=True)
+    token_type = models.CharField(max_length=16, choices=TOKEN_TYPE_CHOICES)
+    user = models.ForeignKey(
+        User,
+        null=True,
+        blank=True,
+        on_delete=models.SET_NULL,
+    )
+    expires_at = models.DateTimeField()
+    revoked_at = models.DateTimeField(default=timezone.now, editable=False)
+
+    class Meta:
+        db_table = "auth_revoked_token"
+        indexes = [
+            models.Index(fields=["expires_at"]),
+        ]
+
+    def __str__(self):
+        return f"{self.token_type} {self.jti}"
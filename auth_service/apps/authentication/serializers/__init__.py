@@ -1 +1,2 @@
-from .login import LoginSerializer
\ No newline at end of file
+from .login import LoginSerializer
+from .token import LogoutSerializer, RefreshSerializer
@@ -0,0 +1,15 @@
+from rest_framework import serializers
+
+
+class RefreshSerializer(serializers.Serializer):
+    refresh_token = serializers.CharField(
+        required=True,
+        trim_whitespace=True,
+    )
+
+
+class LogoutSerializer(serializers.Serializer):
+    refresh_token = serializers.CharField(
+        required=False,
+        trim_whitespace=True,
+    )
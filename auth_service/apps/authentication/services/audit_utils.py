@@ -1,34 +1,159 @@
+import ipaddress
+import re
+from functools import lru_cache
+from typing import NamedTuple
+
+from django.conf import settings
+
+
+@lru_cache(maxsize=8)
+def _trusted_networks(proxies: tuple) -> tuple:
+    return tuple(ipaddress.ip_network(proxy, strict=False) for proxy in proxies)
+
+
+def _is_trusted(address: str) -> bool:
+    try:
+        ip = ipaddress.ip_address(address)
+    except ValueError:
+        return False
+    networks = _trusted_networks(tuple(getattr(settings, "TRUSTED_PROXIES", ())))
+    return any(ip in network for network in networks)
+
+
 def get_client_ip(request):
-    x_forwarded_for = request.META.get("HTTP_X_FORWARDED_FOR")
-    if x_forwarded_for:
-        return x_forwarded_for.split(",")[0]
-    return request.META.get("REMOTE_ADDR")
+    """
+    Client address for the login throttle and audit rows.
+
+    ``X-Forwarded-For`` is only honoured when the connection comes from one
+    of ``TRUSTED_PROXIES``; anyone else could put any address in it. The
+    entries are then walked from the right (each proxy appends the address
+    it received the request from) past other trusted proxies, and the first
+    one that is not a proxy is the client. Anything further left was sent
+    by the client and is ignored.
+    """
+    remote_addr = request.META.get("REMOTE_ADDR")
+    if not remote_addr or not _is_trusted(remote_addr):
+        return remote_addr
+
+    x_forwarded_for = request.META.get("HTTP_X_FORWARDED_FOR", "")
+    for hop in reversed(x_forwarded_for.split(",")):
+        hop = hop.strip()
+        try:
+            ipaddress.ip_address(hop)
+        except ValueError:
+            break  # not written by a proxy we trust
+        if not _is_trusted(hop):
+            return hop
+    return remote_addr
 
 
 def get_user_agent(request):
     return request.META.get("HTTP_USER_AGENT", "")
 
 
+# --------------------------------------------------
+# User-Agent classification
+# --------------------------------------------------
+# Rules are tried in order, first match wins. Order matters because
+# browsers advertise each other: Edge/Opera/Samsung UAs contain "Chrome",
+# Chrome UAs contain "Safari", iPad UAs contain "Mac OS X", Android UAs
+# contain "Linux".
+
+class UserAgentInfo(NamedTuple):
+    browser: str
+    version: str  # major version ("120"), "" when unknown
+    os: str
+    device: str  # desktop | mobile | tablet | bot | other
+
+
+UNKNOWN = "Unknown"
+
+# Long UAs are truncated before matching (bounds regex cost and cache size).
+MAX_USER_AGENT_LENGTH = 512
+
+_BOT_RE = re.compile(r"bot\b|crawl|spider|slurp|facebookexternalhit|headless", re.I)
+
+_BROWSER_RULES = (
+    ("Edge", re.compile(r"\bEdg(?:e|A|iOS)?/(\d+)")),
+    ("Opera", re.compile(r"\b(?:OPR|OPiOS|Opera)/(\d+)")),
+    ("Samsung Internet", re.compile(r"\bSamsungBrowser/(\d+)")),
+    ("Yandex", re.compile(r"\bYaBrowser/(\d+)")),
+    ("Vivaldi", re.compile(r"\bVivaldi/(\d+)")),
+    ("Firefox", re.compile(r"\b(?:Firefox|FxiOS)/(\d+)")),
+    ("Headless Chrome", re.compile(r"\bHeadlessChrome/(\d+)")),
+    ("Chrome", re.compile(r"\b(?:Chrome|CriOS)/(\d+)")),
+    ("Internet Explorer", re.compile(r"\bMSIE (\d+)|\bTrident/.*\brv:(\d+)")),
+    ("Safari", re.compile(r"\bVersion/(\d+).*\bSafari/")),
+    # Non-browser HTTP clients (scripts, API tools)
+    ("curl", re.compile(r"^curl/(\d+)")),
+    ("Wget", re.compile(r"^Wget/(\d+)")),
+    ("Postman", re.compile(r"^PostmanRuntime/(\d+)")),
+    ("python-requests", re.compile(r"^python-requests/(\d+)")),
+    ("okhttp", re.compile(r"^okhttp/(\d+)")),
+)
+
+_CLIENTS = {"curl", "Wget", "Postman", "python-requests", "okhttp"}
+
+_OS_RULES = (
+    ("Windows Phone", re.compile(r"Windows Phone")),
+    ("Windows", re.compile(r"Windows")),
+    ("iOS", re.compile(r"iPhone|iPad|iPod")),
+    ("Android", re.compile(r"Android")),
+    ("ChromeOS", re.compile(r"\bCrOS\b")),
+    ("MacOS", re.compile(r"Macintosh|Mac OS X")),
+    ("Linux", re.compile(r"Linux|X11")),
+)
+
+_TABLET_RE = re.compile(r"iPad|Tablet|Nexus (?:7|9|10)\b|SM-T\d")
+_MOBILE_RE = re.compile(r"Mobi|iPhone|iPod|Windows Phone")
+
+
+def _classify(user_agent: str) -> UserAgentInfo:
+    browser, version = UNKNOWN, ""
+    for name, pattern in _BROWSER_RULES:
+        match = pattern.search(user_agent)
+        if match:
+            browser = name
+            version = next((group for group in match.groups() if group), "")
+            break
+
+    os = next(
+        (name for name, pattern in _OS_RULES if pattern.search(user_agent)),
+        UNKNOWN,
+    )
+
+    if _BOT_RE.search(user_agent):
+        device = "bot"
+    elif browser in _CLIENTS:
+        device = "other"
+    elif _TABLET_RE.search(user_agent) or (os == "Android" and "Mobile" not in user_agent):
+        device = "tablet"
+    elif _MOBILE_RE.search(user_agent) or os == "Android":
+        device = "mobile"
+    elif os != UNKNOWN:
+        device = "desktop"
+    else:
+        device = "other"
+
+    return UserAgentInfo(browser, version, os, device)
+
+
+# Logins come from a small set of distinct UAs, so nearly every call is a hit.
+_classify_cached = lru_cache(maxsize=2048)(_classify)
+
+
+def classify_user_agent(user_agent: str) -> UserAgentInfo:
+    """Browser, major version, OS and device class of a User-Agent string."""
+    if not user_agent:
+        return UserAgentInfo(UNKNOWN, "", UNKNOWN, "other")
+    return _classify_cached(user_agent[:MAX_USER_AGENT_LENGTH])
+
+
+def user_agent_cache_info():
+    """Hit/miss counters of the classification cache (functools CacheInfo)."""
+    return _classify_cached.cache_info()
+
+
 def parse_browser_os(user_agent: str):
-    ua = user_agent.lower()
-
-    browser = "Unknown"
-    os = "Unknown"
-
-    if "chrome" in ua:
-        browser = "Chrome"
-    elif "firefox" in ua:
-        browser = "Firefox"
-    elif "safari" in ua:
-        browser = "Safari"
-
-    if "windows" in ua:
-        os = "Windows"
-    elif "linux" in ua:
-        os = "Linux"
-    elif "android" in ua:
-        os = "Android"
-    elif "mac" in ua:
-        os = "MacOS"
-
-    return browser, os
+    info = classify_user_agent(user_agent)
+    return info.browser, info.os
@@ -0,0 +1,288 @@
+"""
+Asynchronous, batched AuthAuditLog writer.
+
+Request threads build the ``AuthAuditLog`` instance (so ``created_at`` is
+the event time) and hand it to an in-process queue; a background thread
+writes queued rows with one ``bulk_create`` per batch. A batch is flushed
+when it reaches ``BATCH_SIZE`` rows or ``FLUSH_INTERVAL`` seconds after
+its first row, whichever comes first. When rows are rejected
+(``IntegrityError``/``DataError``) the batch is retried in halves, so only
+the offending rows are dropped. Any other database error means the
+database is unavailable: the batch is kept and retried with exponential
+backoff (up to ``MAX_RETRY_DELAY`` seconds), while new events wait in the
+queue under the overflow policy.
+
+The queue is bounded (``QUEUE_SIZE``). When it is full the ``OVERFLOW``
+policy applies:
+
+- ``block``: wait up to ``BLOCK_TIMEOUT`` seconds for space, then drop
+- ``drop``:  drop the event immediately
+- ``sync``:  write the event inline (no loss, request pays the insert)
+
+Remaining events are flushed at interpreter shutdown (atexit); a batch
+the database still refuses then is dropped.
+"""
+
+import atexit
+import logging
+import os
+import queue
+import threading
+import time
+
+from django.conf import settings
+from django.db import close_old_connections, connection, DatabaseError, DataError, IntegrityError
+
+from apps.authentication.models.audit import AuthAuditLog
+
+logger = logging.getLogger(__name__)
+
+OVERFLOW_POLICIES = ("block", "drop", "sync")
+
+# Errors caused by the rows themselves; anything else is an outage
+REJECTED_ROW_ERRORS = (IntegrityError, DataError)
+
+RETRY_DELAY = 0.5
+MAX_RETRY_DELAY = 30.0
+
+
+class AuditWriter:
+    def __init__(
+        self,
+        queue_size: int = 10000,
+        batch_size: int = 200,
+        flush_interval: float = 1.0,
+        overflow: str = "block",
+        block_timeout: float = 0.1,
+    ):
+        if overflow not in OVERFLOW_POLICIES:
+            raise ValueError(f"Unknown audit overflow policy: {overflow}")
+
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.overflow = overflow
+        self.block_timeout = block_timeout
+
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._stopping = threading.Event()
+        self._thread = None
+        self._lock = threading.Lock()
+
+        self.enqueued = 0
+        self.flushed = 0
+        self.dropped = 0
+        self.failed = 0
+        self.inline = 0
+        self.batches = 0
+        self.retries = 0
+
+    # --------------------------------------------------
+    # Producer side (request threads)
+    # --------------------------------------------------
+
+    def record(self, entry: AuthAuditLog) -> bool:
+        """
+        Queue one audit row.
+
+        :return: False if the event was dropped by the overflow policy
+        """
+        if self._stopping.is_set():
+            # Shutting down: nobody will drain the queue any more.
+            self._write_inline(entry)
+            return True
+
+        try:
+            if self.overflow == "block":
+                self._queue.put(entry, timeout=self.block_timeout)
+            else:
+                self._queue.put_nowait(entry)
+        except queue.Full:
+            if self.overflow == "sync":
+                self._write_inline(entry)
+                return True
+            with self._lock:
+                self.dropped += 1
+            logger.warning("Audit queue full, dropped %s event", entry.event_type)
+            return False
+
+        with self._lock:
+            self.enqueued += 1
+        return True
+
+    def _write_inline(self, entry: AuthAuditLog) -> None:
+        try:
+            entry.save(force_insert=True)
+        except DatabaseError:
+            logger.exception("Failed to write %s audit event", entry.event_type)
+            with self._lock:
+                self.failed += 1
+            return
+        with self._lock:
+            self.inline += 1
+
+    # --------------------------------------------------
+    # Consumer side (background thread)
+    # --------------------------------------------------
+
+    def start(self) -> None:
+        self._thread = threading.Thread(
+            target=self._run,
+            name="auth-audit-writer",
+            daemon=True,
+        )
+        self._thread.start()
+
+    def stop(self, timeout: float = 5.0) -> None:
+        """Stop accepting events and flush everything still queued."""
+        self._stopping.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def _run(self) -> None:
+        pending = []
+        delay = 0.0
+        try:
+            while True:
+                batch = pending or self._next_batch()
+                if batch:
+                    pending = self._write(batch)
+                    if not pending:
+                        delay = 0.0
+                    elif self._stopping.is_set():
+                        logger.error("Database unavailable at shutdown, dropped %d audit events", len(pending))
+                        with self._lock:
+                            self.failed += len(pending)
+                        pending = []
+                    else:
+                        delay = min(max(delay * 2, RETRY_DELAY), MAX_RETRY_DELAY)
+                        with self._lock:
+                            self.retries += 1
+                        # Woken early by stop(): one last attempt, then drop
+                        self._stopping.wait(delay)
+                elif self._stopping.is_set():
+                    break
+        finally:
+            connection.close()
+
+    def _next_batch(self) -> list:
+        try:
+            batch = [self._queue.get(timeout=self.flush_interval)]
+        except queue.Empty:
+            return []
+
+        deadline = time.monotonic() + self.flush_interval
+        while len(batch) < self.batch_size:
+            remaining = 0 if self._stopping.is_set() else deadline - time.monotonic()
+            try:
+                if remaining > 0:
+                    batch.append(self._queue.get(timeout=remaining))
+                else:
+                    batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _write(self, batch: list) -> list:
+        """
+        Insert ``batch``; returns the rows left unwritten because the
+        database is unavailable (empty once the batch is done).
+        """
+        close_old_connections()
+        written, failed, pending = self._insert(batch)
+
+        with self._lock:
+            self.flushed += written
+            self.failed += failed
+            if not pending:
+                self.batches += 1
+        return pending
+
+    def _insert(self, batch: list) -> tuple:
+        """
+        ``(written, dropped, pending)`` for ``batch``. Rejected rows (e.g. a
+        ``user_id`` that no longer exists) are isolated by retrying in halves
+        and dropped; on any other error the rows not yet written are
+        returned as ``pending``.
+        """
+        try:
+            AuthAuditLog.objects.bulk_create(batch)
+        except REJECTED_ROW_ERRORS:
+            if len(batch) == 1:
+                logger.warning("Dropped %s audit event that could not be written", batch[0].event_type, exc_info=True)
+                return 0, 1, []
+        except DatabaseError:
+            logger.warning("Database unavailable, keeping %d audit events for retry", len(batch), exc_info=True)
+            return 0, 0, batch
+        else:
+            return len(batch), 0, []
+
+        middle = len(batch) // 2
+        first, second = batch[:middle], batch[middle:]
+        first_written, first_dropped, pending = self._insert(first)
+        if pending:
+            return first_written, first_dropped, pending + second
+        second_written, second_dropped, pending = self._insert(second)
+        return first_written + second_written, first_dropped + second_dropped, pending
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "queued": self._queue.qsize(),
+                "enqueued": self.enqueued,
+                "flushed": self.flushed,
+                "inline": self.inline,
+                "dropped": self.dropped,
+                "failed": self.failed,
+                "batches": self.batches,
+                "retries": self.retries,
+            }
+
+
+_writer = None
+_writer_pid = None
+_writer_lock = threading.Lock()
+
+
+def get_audit_writer() -> AuditWriter | None:
+    """
+    Process-wide writer configured from ``AUTH_AUDIT_WRITER``, started on
+    first use (after a pre-fork server has forked). None when disabled.
+    """
+    global _writer, _writer_pid
+    config = getattr(settings, "AUTH_AUDIT_WRITER", {})
+    if not config.get("ENABLED", True):
+        return None
+
+    if _writer is None or _writer_pid != os.getpid():
+        with _writer_lock:
+            if _writer is None or _writer_pid != os.getpid():
+                writer = AuditWriter(
+                    queue_size=config.get("QUEUE_SIZE", 10000),
+                    batch_size=config.get("BATCH_SIZE", 200),
+                    flush_interval=config.get("FLUSH_INTERVAL", 1.0),
+                    overflow=config.get("OVERFLOW", "block"),
+                    block_timeout=config.get("BLOCK_TIMEOUT", 0.1),
+                )
+                writer.start()
+                atexit.register(writer.stop)
+                _writer, _writer_pid = writer, os.getpid()
+    return _writer
+
+
+def record_audit_event(**fields) -> None:
+    """
+    Record an auth audit event (same keyword arguments as
+    ``AuthAuditLog.objects.create``) without waiting for the insert.
+    """
+    entry = AuthAuditLog(**fields)
+    writer = get_audit_writer()
+    if writer is None:
+        entry.save(force_insert=True)
+        return
+    writer.record(entry)
+
+
+def audit_writer_stats() -> dict:
+    """Queue depth and flushed/dropped counters of the audit writer."""
+    writer = get_audit_writer()
+    return writer.stats() if writer is not None else {"enabled": False}
@@ -0,0 +1,45 @@
+"""
+Per-user token claims cache.
+
+Token issuance needs the user's groups; caching the claims snapshot
+(``erp_jwt.encoder.build_claims``) per user makes login and refresh
+issue tokens without a groups query. Entries are dropped by the signal
+handlers in ``apps.authentication.signals`` whenever a user's groups,
+a group's name or the user itself changes, and expire after
+``AUTH_CLAIMS_CACHE_TIMEOUT`` seconds as a bound on staleness when the
+cache is per process (local memory) and the change happened elsewhere.
+"""
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+
+from erp_jwt.encoder import build_claims
+
+_KEY = "auth:claims:{}"
+
+
+def _store():
+    return caches[getattr(settings, "AUTH_CLAIMS_CACHE", "default")]
+
+
+def get_claims(user) -> dict:
+    """Token claims for ``user``, from the cache when present."""
+    key = _KEY.format(user.pk)
+    claims = _store().get(key)
+    if claims is None:
+        claims = build_claims(user)
+        _store().set(key, claims, getattr(settings, "AUTH_CLAIMS_CACHE_TIMEOUT", 300))
+    return claims
+
+
+def invalidate_claims(user_ids) -> None:
+    """
+    Forget cached claims of the given users, now and again once the
+    current transaction commits (a login in between may have re-cached
+    the old claims).
+    """
+    keys = [_KEY.format(user_id) for user_id in user_ids]
+    if keys:
+        _store().delete_many(keys)
+        transaction.on_commit(lambda: _store().delete_many(keys))
@@ -0,0 +1,34 @@
+from pathlib import Path
+
+from cryptography.hazmat.primitives.serialization import load_pem_public_key
+from django.conf import settings
+
+from erp_jwt.algorithms import algorithm_for_key
+from erp_jwt.encoder import signing_key
+from erp_jwt.jwks import public_jwk
+
+
+def published_jwks() -> dict:
+    """
+    JWKS document served to verifiers.
+
+    Contains the public half of the current signing key plus every key in
+    ``JWT_PUBLISHED_PUBLIC_KEY_PATHS``. Rotation: publish the next key
+    there, wait one JWKS refresh interval, then switch the signing key
+    and keep the old public key published until its tokens expire.
+    Published keys may use a different algorithm than the current one
+    (dual-algorithm window); each is tagged with its own ``alg``.
+    """
+    algorithm = settings.JWT_SETTINGS["ALGORITHM"]
+    current = signing_key()
+    keys = [public_jwk(current.key.public_key(), algorithm, kid=current.kid)]
+
+    seen = {current.kid}
+    for path in getattr(settings, "JWT_PUBLISHED_PUBLIC_KEY_PATHS", []):
+        public_key = load_pem_public_key(Path(path).read_bytes())
+        jwk = public_jwk(public_key, algorithm_for_key(public_key))
+        if jwk["kid"] not in seen:
+            seen.add(jwk["kid"])
+            keys.append(jwk)
+
+    return {"keys": keys}
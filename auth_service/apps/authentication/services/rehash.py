@@ -0,0 +1,85 @@
+"""
+Background password rehashing.
+
+Django upgrades an outdated hash (legacy hasher, lower cost) inside
+``check_password``, i.e. a second full hash plus an UPDATE on the login
+response path. ``DeferredRehashModelBackend`` hands that work to this
+executor instead. The write is compare-and-set on the old hash, so a
+password changed in the meantime is never overwritten.
+"""
+
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.db import close_old_connections, connection, DatabaseError
+
+logger = logging.getLogger(__name__)
+
+_executor = None
+_pending = 0
+_lock = threading.Lock()
+_stats = {"scheduled": 0, "rehashed": 0, "stale": 0, "skipped": 0, "failed": 0}
+
+
+def _config():
+    return {"WORKERS": 1, "MAX_PENDING": 100, **getattr(settings, "PASSWORD_REHASH", {})}
+
+
+def _count(name: str) -> None:
+    with _lock:
+        _stats[name] += 1
+
+
+def schedule_rehash(user_pk, old_encoded: str, raw_password: str) -> bool:
+    """
+    Queue a rehash of ``raw_password`` with the preferred hasher.
+
+    :return: False when too many rehashes are pending (skipped; the hash
+             is still outdated and will be picked up on a later login)
+    """
+    global _executor, _pending
+    config = _config()
+    with _lock:
+        if _pending >= config["MAX_PENDING"]:
+            _stats["skipped"] += 1
+            return False
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=config["WORKERS"],
+                thread_name_prefix="password-rehash",
+            )
+        _pending += 1
+        _stats["scheduled"] += 1
+
+    _executor.submit(_rehash, user_pk, old_encoded, raw_password)
+    return True
+
+
+def _rehash(user_pk, old_encoded: str, raw_password: str) -> None:
+    global _pending
+    close_old_connections()
+    try:
+        new_encoded = make_password(raw_password)
+        updated = (
+            get_user_model()
+            .objects.filter(pk=user_pk, password=old_encoded)
+            .update(password=new_encoded)
+        )
+        _count("rehashed" if updated else "stale")
+    except DatabaseError:
+        logger.exception("Password rehash failed for user %s", user_pk)
+        _count("failed")
+    finally:
+        with _lock:
+            _pending -= 1
+        connection.close()
+
+
+def rehash_stats() -> dict:
+    """Counters of scheduled / completed / skipped rehashes."""
+    with _lock:
+        return {**_stats, "pending": _pending}
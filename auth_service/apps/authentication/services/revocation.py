@@ -0,0 +1,60 @@
+from datetime import datetime, timezone as dt_timezone
+
+from django.db import IntegrityError
+from django.utils import timezone
+
+from apps.authentication.models.revocation import RevokedToken
+
+# Ids are assigned at insert but become visible at commit, so a lower id
+# can appear after a verifier's cursor has moved past it. Every poll
+# re-sends the rows this many ids behind the cursor: a revocation is only
+# missed if it stays uncommitted while this many later ones commit.
+REREAD_WINDOW = 500
+
+
+def revoke_token(payload: dict) -> None:
+    """Record the token described by a decoded ``payload`` as revoked."""
+    jti = payload.get("jti")
+    if not jti:
+        return  # issued before tokens carried a jti; expires on its own
+
+    try:
+        RevokedToken.objects.create(
+            jti=jti,
+            token_type=payload.get("type", "access"),
+            user_id=payload.get("sub"),
+            expires_at=datetime.fromtimestamp(payload["exp"], tz=dt_timezone.utc),
+        )
+    except IntegrityError:
+        pass  # already revoked
+
+
+def revocations_since(cursor: int, limit: int) -> dict:
+    """
+    Unexpired revocations recorded after ``cursor`` (a RevokedToken id),
+    plus those within ``REREAD_WINDOW`` ids before it.
+
+    :return: {"revocations": [{"jti", "exp"}], "cursor": int, "more": bool}
+    """
+    unexpired = RevokedToken.objects.filter(expires_at__gt=timezone.now())
+
+    # Not counted against ``limit``, so paging always moves the cursor on
+    reread = list(
+        unexpired.filter(id__gt=max(cursor - REREAD_WINDOW, 0), id__lte=cursor)
+        .values_list("id", "jti", "expires_at")
+    )
+    rows = list(
+        unexpired.filter(id__gt=cursor)
+        .order_by("id")
+        .values_list("id", "jti", "expires_at")[: limit + 1]
+    )
+    more = len(rows) > limit
+    rows = rows[:limit]
+
+    return {
+        "revocations": [
+            {"jti": jti, "exp": int(expires_at.timestamp())} for _, jti, expires_at in reread + rows
+        ],
+        "cursor": rows[-1][0] if rows else cursor,
+        "more": more,
+    }
@@ -0,0 +1,179 @@
+"""
+Login attempt throttling.
+
+Every login attempt is counted against two keys, the client IP (stops
+password spraying across many usernames) and the username (stops
+guessing one account from many IPs), and rejected *before*
+``authenticate()`` runs, so a burst never reaches the password hasher.
+
+Counting uses a sliding-window counter: the current fixed window's count
+plus the previous window's count weighted by how much of it still
+overlaps the sliding window. That needs two integers per key instead of
+a timestamp log. Rejected attempts are not counted, so an attacker
+cannot keep a victim's username locked out beyond the window.
+
+Backends:
+
+- ``local``: in-process dict, per worker (limits are per process)
+- ``cache``: Django cache (``CACHE`` alias), shared between workers when
+  that cache is (Redis/Memcached)
+"""
+
+import hashlib
+import math
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+
+
+def _estimate(previous: int, current: int, elapsed: float, window: int) -> float:
+    return previous * (1 - elapsed / window) + current
+
+
+def _retry_after(previous: int, current: int, elapsed: float, window: int, limit: int) -> int:
+    """Seconds until the estimate drops below ``limit`` (no new attempts)."""
+    if current >= limit:
+        # Only the next window, with ``current`` as its previous, can admit.
+        wait = (window - elapsed) + window * (1 - limit / current)
+    else:
+        wait = window * (1 - (limit - current) / previous) - elapsed
+    return max(1, math.ceil(wait))
+
+
+class LocalThrottleBackend:
+    def __init__(self, max_keys: int = 100000):
+        self.max_keys = max_keys
+        self._counters = {}  # key -> [window index, previous, current]
+        self._lock = threading.Lock()
+
+    def acquire(self, key: str, limit: int, window: int, now: float):
+        index, elapsed = divmod(now, window)
+        with self._lock:
+            counter = self._counters.get(key)
+            if counter is None or counter[0] < index - 1:
+                counter = [index, 0, 0]
+            elif counter[0] == index - 1:
+                counter = [index, counter[2], 0]
+
+            if _estimate(counter[1], counter[2], elapsed, window) >= limit:
+                self._counters[key] = counter
+                return _retry_after(counter[1], counter[2], elapsed, window, limit)
+
+            counter[2] += 1
+            self._counters[key] = counter
+            if len(self._counters) > self.max_keys:
+                self._prune(index)
+        return None
+
+    def release(self, key: str, window: int, now: float) -> None:
+        index = now // window
+        with self._lock:
+            counter = self._counters.get(key)
+            if counter is not None and counter[0] == index and counter[2] > 0:
+                counter[2] -= 1
+
+    def _prune(self, index: float) -> None:
+        # Keys idle for two windows carry no weight any more.
+        self._counters = {
+            key: counter for key, counter in self._counters.items()
+            if counter[0] >= index - 1
+        }
+
+
+class CacheThrottleBackend:
+    def __init__(self, alias: str = "default"):
+        self.alias = alias
+
+    def _key(self, key: str, index: float) -> str:
+        return f"throttle:{key}:{int(index)}"
+
+    def acquire(self, key: str, limit: int, window: int, now: float):
+        cache = caches[self.alias]
+        index, elapsed = divmod(now, window)
+        current_key = self._key(key, index)
+
+        cache.add(current_key, 0, window * 2)
+        current = cache.incr(current_key)
+        previous = cache.get(self._key(key, index - 1), 0)
+
+        # Counted optimistically (incr is atomic); undo when over the limit.
+        if _estimate(previous, current - 1, elapsed, window) >= limit:
+            cache.decr(current_key)
+            return _retry_after(previous, current - 1, elapsed, window, limit)
+        return None
+
+    def release(self, key: str, window: int, now: float) -> None:
+        try:
+            caches[self.alias].decr(self._key(key, now // window))
+        except ValueError:
+            pass  # window already rolled over and expired
+
+
+class LoginThrottle:
+    def __init__(self, backend, username_limit, username_window, ip_limit, ip_window):
+        self.backend = backend
+        self.rules = (
+            ("ip", ip_limit, ip_window),
+            ("username", username_limit, username_window),
+        )
+
+    def attempt(self, username: str, ip: str | None):
+        """
+        Count a login attempt.
+
+        :return: None if allowed, else (scope, retry_after_seconds)
+        """
+        now = time.time()
+        values = {"ip": ip or "unknown", "username": (username or "").lower()}
+        acquired = []
+
+        for scope, limit, window in self.rules:
+            if not limit:
+                continue
+            key = f"login:{scope}:" + hashlib.sha256(values[scope].encode()).hexdigest()[:32]
+            retry_after = self.backend.acquire(key, limit, window, now)
+            if retry_after is not None:
+                for acquired_key, acquired_window in acquired:
+                    self.backend.release(acquired_key, acquired_window, now)
+                return scope, retry_after
+            acquired.append((key, window))
+
+        return None
+
+
+_throttle = None
+_throttle_lock = threading.Lock()
+
+
+def get_login_throttle() -> LoginThrottle | None:
+    """Login throttle configured from ``LOGIN_THROTTLE`` (None when disabled)."""
+    global _throttle
+    config = getattr(settings, "LOGIN_THROTTLE", {})
+    if not config.get("ENABLED", True):
+        return None
+
+    if _throttle is None:
+        with _throttle_lock:
+            if _throttle is None:
+                if config.get("BACKEND", "local") == "cache":
+                    backend = CacheThrottleBackend(config.get("CACHE", "default"))
+                else:
+                    backend = LocalThrottleBackend()
+                _throttle = LoginThrottle(
+                    backend,
+                    username_limit=config.get("USERNAME_LIMIT", 10),
+                    username_window=config.get("USERNAME_WINDOW", 300),
+                    ip_limit=config.get("IP_LIMIT", 100),
+                    ip_window=config.get("IP_WINDOW", 60),
+                )
+    return _throttle
+
+
+def check_login_attempt(username: str, ip: str | None):
+    """:return: None if the attempt may proceed, else (scope, retry_after)"""
+    throttle = get_login_throttle()
+    if throttle is None:
+        return None
+    return throttle.attempt(username, ip)
@@ -0,0 +1,139 @@
+"""
+Token issuance and refresh-token rotation.
+
+Every login starts a refresh-token *family*. Each refresh consumes the
+presented refresh token and issues a new pair in the same family, so a
+client never pays for password hashing again until the family expires.
+
+Families are rows in the database (RefreshTokenFamily), shared by every
+worker and surviving restarts: one row per family holding the jti of its
+only valid refresh token. Consuming it is a conditional UPDATE on that
+jti, so two concurrent refreshes with the same token cannot both win.
+Presenting any other token of a family (a stolen or replayed one)
+revokes the whole family.
+"""
+
+from datetime import datetime, timezone as dt_timezone
+
+from django.contrib.auth import get_user_model
+
+from apps.authentication.models.refresh_family import RefreshTokenFamily
+from apps.authentication.services.claims import get_claims
+from apps.authentication.services.revocation import revoke_token
+from erp_jwt.decoder import decode_token, JWTDecodeError, JWTExpiredError, JWTInvalidError
+from erp_jwt.encoder import issue_token_pair
+
+
+class RefreshTokenError(Exception):
+    """Refresh token invalid, expired or revoked."""
+
+
+class RefreshTokenReuseError(RefreshTokenError):
+    """An already-rotated refresh token was presented again."""
+
+    def __init__(self, message, user_id=None, family=None):
+        super().__init__(message)
+        self.user_id = user_id
+        self.family = family
+
+
+def _expires_at(refresh: dict) -> datetime:
+    return datetime.fromtimestamp(refresh["exp"], tz=dt_timezone.utc)
+
+
+def _revoke_family(family: str) -> None:
+    RefreshTokenFamily.objects.filter(family=family).update(revoked=True)
+
+
+def issue_tokens(user) -> dict:
+    """Issue a token pair for a fresh login (starts a new refresh family)."""
+    tokens = issue_token_pair(user, claims=get_claims(user))
+    refresh = tokens["refresh"]
+    RefreshTokenFamily.objects.create(
+        family=refresh["family"],
+        user=user,
+        current_jti=refresh["jti"],
+        expires_at=_expires_at(refresh),
+    )
+    return tokens
+
+
+def refresh_tokens(refresh_token: str):
+    """
+    Rotate ``refresh_token`` into a new access/refresh pair.
+
+    :return: (user, tokens)
+    :raises: RefreshTokenError, RefreshTokenReuseError
+    """
+    try:
+        payload = decode_token(refresh_token, expected_type="refresh")
+    except JWTExpiredError:
+        raise RefreshTokenError("Refresh token expired")
+    except JWTInvalidError:
+        raise RefreshTokenError("Invalid refresh token")
+
+    jti = payload.get("jti")
+    family = payload.get("fid")
+    if not jti or not family:
+        # Issued before rotation existed; cannot be tracked.
+        raise RefreshTokenError("Invalid refresh token")
+
+    current = (
+        RefreshTokenFamily.objects.filter(family=family)
+        .values_list("current_jti", "revoked")
+        .first()
+    )
+    if current is None or current[1]:
+        raise RefreshTokenError("Refresh token revoked")
+
+    if current[0] != jti:
+        _revoke_family(family)
+        raise RefreshTokenReuseError(
+            "Refresh token reuse detected",
+            user_id=payload.get("sub"),
+            family=family,
+        )
+
+    User = get_user_model()
+    user = User.objects.filter(pk=payload.get("sub"), is_active=True).first()
+    if user is None:
+        _revoke_family(family)
+        raise RefreshTokenError("User inactive")
+
+    tokens = issue_token_pair(user, claims=get_claims(user), family=family)
+    refresh = tokens["refresh"]
+    # Only the caller that still finds ``jti`` current rotates the family;
+    # a concurrent refresh with the same token updates nothing.
+    rotated = RefreshTokenFamily.objects.filter(family=family, current_jti=jti, revoked=False).update(
+        current_jti=refresh["jti"],
+        expires_at=_expires_at(refresh),
+    )
+    if not rotated:
+        _revoke_family(family)
+        raise RefreshTokenReuseError(
+            "Refresh token reuse detected",
+            user_id=payload.get("sub"),
+            family=family,
+        )
+    return user, tokens
+
+
+def revoke_tokens(access_payload: dict, refresh_token: str | None = None) -> None:
+    """
+    Logout: revoke the access token and, when given, the refresh token
+    and its whole rotation family.
+    """
+    revoke_token(access_payload)
+    if not refresh_token:
+        return
+
+    try:
+        payload = decode_token(refresh_token, expected_type="refresh")
+    except JWTDecodeError:
+        return  # already unusable
+    if payload.get("sub") != access_payload.get("sub"):
+        return
+
+    if payload.get("fid"):
+        _revoke_family(payload["fid"])
+    revoke_token(payload)
@@ -0,0 +1,48 @@
+"""
+Cache invalidation for per-user token claims (see services/claims.py).
+Connected in AuthenticationConfig.ready().
+"""
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import Group
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete
+from django.dispatch import receiver
+
+from apps.authentication.services.claims import invalidate_claims
+
+User = get_user_model()
+
+
+@receiver(m2m_changed, sender=User.groups.through)
+def user_groups_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    if action not in ("post_add", "post_remove", "pre_clear", "post_clear"):
+        return
+
+    if not reverse:
+        # user.groups.add/remove/clear(...)
+        invalidate_claims([instance.pk])
+    elif action == "pre_clear":
+        # group.user_set.clear(): pk_set is not provided, read members first
+        invalidate_claims(instance.user_set.values_list("pk", flat=True))
+    elif pk_set:
+        # group.user_set.add/remove(...)
+        invalidate_claims(pk_set)
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def user_changed(sender, instance, **kwargs):
+    invalidate_claims([instance.pk])
+
+
+@receiver(post_save, sender=Group)
+def group_saved(sender, instance, created, **kwargs):
+    if not created:
+        # Renamed: every member's claims carry the old name.
+        invalidate_claims(instance.user_set.values_list("pk", flat=True))
+
+
+@receiver(pre_delete, sender=Group)
+def group_deleted(sender, instance, **kwargs):
+    # Deleting a group removes its memberships without m2m_changed.
+    invalidate_claims(list(instance.user_set.values_list("pk", flat=True)))
@@ -0,0 +1,31 @@
+from django.test import RequestFactory, SimpleTestCase, override_settings
+
+from apps.authentication.services.audit_utils import get_client_ip
+
+
+@override_settings(TRUSTED_PROXIES=["127.0.0.1", "10.0.0.0/8"])
+class ClientIpTests(SimpleTestCase):
+    def client_ip(self, remote_addr, forwarded_for=None):
+        meta = {"REMOTE_ADDR": remote_addr}
+        if forwarded_for is not None:
+            meta["HTTP_X_FORWARDED_FOR"] = forwarded_for
+        return get_client_ip(RequestFactory().get("/", **meta))
+
+    def test_direct_client_cannot_spoof_forwarded_for(self):
+        self.assertEqual(self.client_ip("203.0.113.9", "198.51.100.1"), "203.0.113.9")
+
+    def test_spoofed_entries_left_of_the_proxy_are_ignored(self):
+        # The client sent "198.51.100.1"; the gateway appended its address
+        self.assertEqual(self.client_ip("127.0.0.1", "198.51.100.1, 203.0.113.9"), "203.0.113.9")
+
+    def test_trusted_proxy_chain_is_skipped(self):
+        self.assertEqual(
+            self.client_ip("127.0.0.1", "198.51.100.1, 203.0.113.9, 10.1.2.3"),
+            "203.0.113.9",
+        )
+
+    def test_unparsable_entry_falls_back_to_remote_addr(self):
+        self.assertEqual(self.client_ip("127.0.0.1", "not-an-ip"), "127.0.0.1")
+
+    def test_proxy_without_forwarded_for(self):
+        self.assertEqual(self.client_ip("127.0.0.1"), "127.0.0.1")
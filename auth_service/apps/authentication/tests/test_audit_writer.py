@@ -0,0 +1,94 @@
+import time
+from unittest import mock
+
+from django.db import IntegrityError, OperationalError
+from django.test import SimpleTestCase
+
+from apps.authentication.models.audit import AuthAuditLog
+from apps.authentication.services import audit_writer
+from apps.authentication.services.audit_writer import AuditWriter
+
+
+def _event(event_type="LOGIN_SUCCESS"):
+    return AuthAuditLog(event_type=event_type, ip_address="203.0.113.9")
+
+
+class AuditWriterTests(SimpleTestCase):
+    """``bulk_create`` is mocked: these cover how failures are handled."""
+
+    def setUp(self):
+        self.written = []
+        patcher = mock.patch.object(AuthAuditLog.objects, "bulk_create")
+        self.bulk_create = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def fail_with(self, error, times=None, when=lambda batch: True):
+        calls = []
+
+        def bulk_create(batch):
+            calls.append(len(batch))
+            if when(batch) and (times is None or len(calls) <= times):
+                raise error
+            self.written.extend(batch)
+
+        self.bulk_create.side_effect = bulk_create
+        return calls
+
+    def test_outage_keeps_the_batch(self):
+        calls = self.fail_with(OperationalError("server has gone away"))
+        writer = AuditWriter()
+        batch = [_event() for _ in range(8)]
+
+        pending = writer._write(batch)
+
+        self.assertEqual(pending, batch)
+        self.assertEqual(calls, [8])  # no bisection
+        self.assertEqual(writer.stats()["failed"], 0)
+
+    def test_rejected_rows_are_isolated_and_dropped(self):
+        self.fail_with(IntegrityError("bad row"), when=lambda batch: any(e.event_type == "BAD" for e in batch))
+        writer = AuditWriter()
+        batch = [_event() for _ in range(7)] + [_event("BAD")]
+
+        pending = writer._write(batch)
+
+        self.assertEqual(pending, [])
+        self.assertEqual(len(self.written), 7)
+        self.assertEqual(writer.stats()["failed"], 1)
+
+    def test_outage_during_bisection_keeps_unwritten_rows(self):
+        errors = iter([IntegrityError("bad row"), None, OperationalError("gone away")])
+
+        def bulk_create(batch):
+            error = next(errors, None)
+            if error is not None:
+                raise error
+            self.written.extend(batch)
+
+        self.bulk_create.side_effect = bulk_create
+        writer = AuditWriter()
+        batch = [_event() for _ in range(4)]
+
+        pending = writer._write(batch)
+
+        self.assertEqual(self.written, batch[:2])
+        self.assertEqual(pending, batch[2:])
+
+    @mock.patch.object(audit_writer, "RETRY_DELAY", 0.01)
+    def test_background_writer_retries_until_the_database_returns(self):
+        self.fail_with(OperationalError("server has gone away"), times=3)
+        writer = AuditWriter(flush_interval=0.01)
+        writer.start()
+        for _ in range(5):
+            writer.record(_event())
+
+        deadline = time.monotonic() + 5
+        while len(self.written) < 5 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        writer.stop()
+
+        stats = writer.stats()
+        self.assertEqual(len(self.written), 5)
+        self.assertEqual(stats["flushed"], 5)
+        self.assertEqual(stats["failed"], 0)
+        self.assertGreaterEqual(stats["retries"], 1)
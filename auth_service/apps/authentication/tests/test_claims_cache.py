@@ -0,0 +1,55 @@
+import json
+
+import jwt
+from django.contrib.auth.models import Group, User
+from django.core.cache import caches
+from django.test import TestCase
+
+LOGIN_URL = "/api/auth/login/"
+
+# Warm login: user lookup, refresh family insert, audit row insert.
+# A claims cache miss adds the groups query.
+WARM_LOGIN_QUERIES = 3
+COLD_LOGIN_QUERIES = WARM_LOGIN_QUERIES + 1
+
+
+class ClaimsCacheTests(TestCase):
+    def setUp(self):
+        caches["default"].clear()
+        self.user = User.objects.create_user("alice", password="s3cret-pass")
+        self.sales = Group.objects.create(name="sales")
+        self.user.groups.add(self.sales)
+
+    def login(self):
+        response = self.client.post(
+            LOGIN_URL,
+            data=json.dumps({"username": "alice", "password": "s3cret-pass"}),
+            content_type="application/json",
+        )
+        self.assertEqual(response.status_code, 200)
+        claims = jwt.decode(response.json()["access_token"], options={"verify_signature": False})
+        return sorted(claims["groups"])
+
+    def test_warm_login_skips_groups_query(self):
+        with self.assertNumQueries(COLD_LOGIN_QUERIES):
+            self.login()
+
+        with self.assertNumQueries(WARM_LOGIN_QUERIES):
+            self.assertEqual(self.login(), ["sales"])
+
+    def test_group_membership_change_invalidates_claims(self):
+        self.login()
+
+        self.user.groups.add(Group.objects.create(name="finance"))
+
+        with self.assertNumQueries(COLD_LOGIN_QUERIES):
+            self.assertEqual(self.login(), ["finance", "sales"])
+
+    def test_group_rename_invalidates_claims(self):
+        self.login()
+
+        self.sales.name = "sales-east"
+        self.sales.save()
+
+        with self.assertNumQueries(COLD_LOGIN_QUERIES):
+            self.assertEqual(self.login(), ["sales-east"])
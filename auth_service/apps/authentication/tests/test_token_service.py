@@ -0,0 +1,62 @@
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.test import TestCase
+
+from apps.authentication.models.refresh_family import RefreshTokenFamily
+from apps.authentication.services import token_service
+from apps.authentication.services.token_service import (
+    RefreshTokenError,
+    RefreshTokenReuseError,
+    issue_tokens,
+    refresh_tokens,
+)
+
+
+class RefreshRotationTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user("alice", password="s3cret-pass")
+        self.tokens = issue_tokens(self.user)
+        self.family = self.tokens["refresh"]["family"]
+
+    def family_row(self):
+        return RefreshTokenFamily.objects.get(family=self.family)
+
+    def test_refresh_rotates_current_token(self):
+        user, tokens = refresh_tokens(self.tokens["refresh_token"])
+
+        self.assertEqual(user, self.user)
+        self.assertEqual(tokens["refresh"]["family"], self.family)
+        self.assertEqual(self.family_row().current_jti, tokens["refresh"]["jti"])
+
+    def test_reused_token_revokes_family(self):
+        _, rotated = refresh_tokens(self.tokens["refresh_token"])
+
+        with self.assertRaises(RefreshTokenReuseError):
+            refresh_tokens(self.tokens["refresh_token"])
+
+        self.assertTrue(self.family_row().revoked)
+        # The legitimate holder's newer token dies with the family
+        with self.assertRaises(RefreshTokenError):
+            refresh_tokens(rotated["refresh_token"])
+
+    def test_concurrent_refresh_with_same_token_has_one_winner(self):
+        # The competing refresh lands after this one has read the family
+        # row but before its conditional UPDATE.
+        issue = token_service.issue_token_pair
+        competitor = []
+
+        def issue_after_competitor(*args, **kwargs):
+            if not competitor:
+                competitor.append(None)
+                competitor[0] = refresh_tokens(self.tokens["refresh_token"])
+            return issue(*args, **kwargs)
+
+        with mock.patch.object(token_service, "issue_token_pair", side_effect=issue_after_competitor):
+            with self.assertRaises(RefreshTokenReuseError):
+                refresh_tokens(self.tokens["refresh_token"])
+
+        _, winner = competitor[0]
+        row = self.family_row()
+        self.assertEqual(row.current_jti, winner["refresh"]["jti"])
+        self.assertTrue(row.revoked)
@@ -1,8 +1,16 @@
 from django.urls import path
-from apps.authentication.views.auth import LoginView, LoginPageView
+from apps.authentication.views.auth import LoginView, LoginPageView, LogoutView, RefreshView
+from apps.authentication.views.jwks import JWKSView
+from apps.authentication.views.revocation import RevocationListView
 
 urlpatterns = [
     path("login/", LoginView.as_view(), name="auth-login"),
+    path("refresh/", RefreshView.as_view(), name="auth-refresh"),
+    path("logout/", LogoutView.as_view(), name="auth-logout"),
     # HTML login page at /api/auth/login_page/
     path("login_page/", LoginPageView.as_view(), name="auth-login-page"),
+    # Public verification keys at /api/auth/.well-known/jwks.json
+    path(".well-known/jwks.json", JWKSView.as_view(), name="auth-jwks"),
+    # Incremental revoked-token feed for verifiers (?since=<cursor>)
+    path("revocations/", RevocationListView.as_view(), name="auth-revocations"),
 ]
@@ -1,4 +1,4 @@
-from django.contrib.auth import authenticate, login as auth_login
+from django.contrib.auth import authenticate, get_user_model, login as auth_login
 from django.shortcuts import render, redirect
 from django.views import View
 from rest_framework.views import APIView
@@ -6,13 +6,38 @@ from rest_framework.response import Response
 from rest_framework import status
 
 from apps.authentication.serializers.login import LoginSerializer
-from apps.authentication.models.audit import AuthAuditLog
+from apps.authentication.serializers.token import LogoutSerializer, RefreshSerializer
 from apps.authentication.services.audit_utils import (
     get_client_ip,
     get_user_agent,
     parse_browser_os,
 )
-from erp_jwt.encoder import generate_access_token, generate_refresh_token
+from apps.authentication.services.audit_writer import record_audit_event
+from apps.authentication.services.throttle import check_login_attempt
+from erp_jwt.decoder import decode_token, JWTDecodeError
+from apps.authentication.services.token_service import (
+    issue_tokens,
+    refresh_tokens,
+    revoke_tokens,
+    RefreshTokenError,
+    RefreshTokenReuseError,
+)
+
+User = get_user_model()
+
+
+def _record_throttled(username, throttled, ip, user_agent, browser, os):
+    scope, retry_after = throttled
+    record_audit_event(
+        user=None,
+        event_type="LOGIN_THROTTLED",
+        ip_address=ip,
+        user_agent=user_agent,
+        browser=browser,
+        os=os,
+        failure_reason="TOO_MANY_ATTEMPTS",
+        metadata={"username": username, "scope": scope, "retry_after": retry_after},
+    )
 
 
 class LoginView(APIView):
@@ -26,15 +51,26 @@ class LoginView(APIView):
         username = serializer.validated_data["username"]
         password = serializer.validated_data["password"]
 
-        user = authenticate(username=username, password=password)
-
         ip = get_client_ip(request)
         user_agent = get_user_agent(request)
         browser, os = parse_browser_os(user_agent)
 
+        # 🔒 Reject bursts before paying for the password hash
+        throttled = check_login_attempt(username, ip)
+        if throttled:
+            _record_throttled(username, throttled, ip, user_agent, browser, os)
+            response = Response(
+                {"error": "TOO_MANY_ATTEMPTS"},
+                status=status.HTTP_429_TOO_MANY_REQUESTS,
+            )
+            response["Retry-After"] = str(throttled[1])
+            return response
+
+        user = authenticate(username=username, password=password)
+
         if not user:
             # 🔒 Log failed attempt
-            AuthAuditLog.objects.create(
+            record_audit_event(
                 user=None,
                 event_type="LOGIN_FAILED",
                 ip_address=ip,
@@ -50,12 +86,11 @@ class LoginView(APIView):
                 status=status.HTTP_401_UNAUTHORIZED,
             )
 
-        # ✅ Generate tokens
-        access_token = generate_access_token(user)
-        refresh_token = generate_refresh_token(user)
+        # ✅ Generate tokens (one claims snapshot, one groups query)
+        tokens = issue_tokens(user)
 
         # ✅ Log success
-        AuthAuditLog.objects.create(
+        record_audit_event(
             user=user,
             event_type="LOGIN_SUCCESS",
             ip_address=ip,
@@ -67,19 +102,108 @@ class LoginView(APIView):
 
         return Response(
             {
-                "access_token": access_token,
-                "refresh_token": refresh_token,
-                "expires_in": 3600,
+                "access_token": tokens["access_token"],
+                "refresh_token": tokens["refresh_token"],
+                "expires_in": tokens["expires_in"],
                 "user": {
                     "id": user.id,
                     "username": user.username,
-                    "groups": list(user.groups.values_list("name", flat=True)),
+                    "groups": tokens["claims"]["groups"],
                 },
             },
             status=status.HTTP_200_OK,
         )
 
 
+class RefreshView(APIView):
+    """Exchange a refresh token for a new token pair (the old one is consumed)."""
+
+    authentication_classes = []
+    permission_classes = []
+
+    def post(self, request):
+        serializer = RefreshSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        try:
+            user, tokens = refresh_tokens(serializer.validated_data["refresh_token"])
+
+        except RefreshTokenReuseError as exc:
+            # 🔒 Replayed token: the whole family has been revoked
+            user_agent = get_user_agent(request)
+            browser, os = parse_browser_os(user_agent)
+            record_audit_event(
+                user=User.objects.filter(pk=exc.user_id).first(),
+                event_type="REFRESH_REUSE",
+                ip_address=get_client_ip(request),
+                user_agent=user_agent,
+                browser=browser,
+                os=os,
+                failure_reason="REFRESH_TOKEN_REUSED",
+                metadata={"family": exc.family},
+            )
+            return Response(
+                {"error": "REFRESH_TOKEN_REUSED"},
+                status=status.HTTP_401_UNAUTHORIZED,
+            )
+
+        except RefreshTokenError:
+            return Response(
+                {"error": "INVALID_REFRESH_TOKEN"},
+                status=status.HTTP_401_UNAUTHORIZED,
+            )
+
+        return Response(
+            {
+                "access_token": tokens["access_token"],
+                "refresh_token": tokens["refresh_token"],
+                "expires_in": tokens["expires_in"],
+            },
+            status=status.HTTP_200_OK,
+        )
+
+
+class LogoutView(APIView):
+    """Revoke the presented access token (and optionally the refresh token)."""
+
+    authentication_classes = []
+    permission_classes = []
+
+    def post(self, request):
+        auth_header = request.META.get("HTTP_AUTHORIZATION", "")
+        if not auth_header.startswith("Bearer "):
+            return Response(
+                {"error": "AUTHORIZATION_HEADER_MISSING"},
+                status=status.HTTP_401_UNAUTHORIZED,
+            )
+
+        try:
+            payload = decode_token(auth_header.split(" ", 1)[1], expected_type="access")
+        except JWTDecodeError:
+            return Response(
+                {"error": "INVALID_TOKEN"},
+                status=status.HTTP_401_UNAUTHORIZED,
+            )
+
+        serializer = LogoutSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        revoke_tokens(payload, serializer.validated_data.get("refresh_token"))
+
+        user_agent = get_user_agent(request)
+        browser, os = parse_browser_os(user_agent)
+        record_audit_event(
+            user_id=payload.get("sub"),
+            event_type="LOGOUT",
+            ip_address=get_client_ip(request),
+            user_agent=user_agent,
+            browser=browser,
+            os=os,
+            metadata={"username": payload.get("username"), "jti": payload.get("jti")},
+        )
+
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+
 class LoginPageView(View):
     """Simple HTML login page (GET shows form, POST authenticates and sets session).
 
@@ -93,13 +217,26 @@ class LoginPageView(View):
         username = request.POST.get("username")
         password = request.POST.get("password")
 
-        user = authenticate(username=username, password=password)
         ip = get_client_ip(request)
         user_agent = get_user_agent(request)
         browser, os = parse_browser_os(user_agent)
 
+        throttled = check_login_attempt(username, ip)
+        if throttled:
+            _record_throttled(username, throttled, ip, user_agent, browser, os)
+            response = render(
+                request,
+                "auth/login.html",
+                {"error": "Too many login attempts, try again later"},
+                status=429,
+            )
+            response["Retry-After"] = str(throttled[1])
+            return response
+
+        user = authenticate(username=username, password=password)
+
         if not user:
-            AuthAuditLog.objects.create(
+            record_audit_event(
                 user=None,
                 event_type="LOGIN_FAILED",
                 ip_address=ip,
@@ -112,7 +249,7 @@ class LoginPageView(View):
             return render(request, "auth/login.html", {"error": "Invalid credentials"}, status=401)
 
         # Log success and create session
-        AuthAuditLog.objects.create(
+        record_audit_event(
             user=user,
             event_type="LOGIN_SUCCESS",
             ip_address=ip,
@@ -125,16 +262,15 @@ class LoginPageView(View):
         auth_login(request, user)
 
         # Generate JWT tokens (same as API flow) and render them for the user
-        access_token = generate_access_token(user)
-        refresh_token = generate_refresh_token(user)
+        tokens = issue_tokens(user)
 
         return render(
             request,
             "auth/login_success.html",
             {
-                "access_token": access_token,
-                "refresh_token": refresh_token,
-                "expires_in": 3600,
+                "access_token": tokens["access_token"],
+                "refresh_token": tokens["refresh_token"],
+                "expires_in": tokens["expires_in"],
                 "user": user,
             },
         )
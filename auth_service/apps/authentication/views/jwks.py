@@ -0,0 +1,17 @@
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from apps.authentication.services.jwks import published_jwks
+
+
+class JWKSView(APIView):
+    """Public JWKS document with the keys verifiers should accept."""
+
+    authentication_classes = []
+    permission_classes = []
+
+    def get(self, request):
+        response = Response(published_jwks())
+        # Verifiers poll this in the background; let intermediaries cache it briefly.
+        response["Cache-Control"] = "public, max-age=300"
+        return response
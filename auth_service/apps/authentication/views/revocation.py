@@ -0,0 +1,22 @@
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from apps.authentication.services.revocation import revocations_since
+
+
+class RevocationListView(APIView):
+    """Revoked token IDs after ``?since=<cursor>``, polled by verifiers."""
+
+    authentication_classes = []
+    permission_classes = []
+
+    def get(self, request):
+        try:
+            cursor = max(int(request.GET.get("since", 0)), 0)
+            limit = min(max(int(request.GET.get("limit", 1000)), 1), 5000)
+        except ValueError:
+            return Response({"error": "INVALID_CURSOR"}, status=400)
+
+        response = Response(revocations_since(cursor, limit))
+        response["Cache-Control"] = "no-store"
+        return response
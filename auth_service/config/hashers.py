@@ -1,4 +1,12 @@
-from django.contrib.auth.hashers import PBKDF2PasswordHasher
+import logging
+import threading
+import time
+
+from django.conf import settings
+from django.contrib.auth.hashers import PBKDF2PasswordHasher, must_update_salt
+from django.utils.crypto import pbkdf2
+
+logger = logging.getLogger(__name__)
 
 
 class PBKDF2SHA256IterationsHasher(PBKDF2PasswordHasher):
@@ -10,3 +18,71 @@ class PBKDF2SHA256IterationsHasher(PBKDF2PasswordHasher):
 
     algorithm = "pbkdf2_sha256"
     iterations = 120000
+
+
+def calibrate_pbkdf2_iterations(target_ms, minimum, maximum, sample=50000):
+    """
+    PBKDF2-SHA256 iteration count that takes about ``target_ms`` on this
+    host (median of three timed samples, rounded down to 10000, clamped).
+    """
+    elapsed = sorted(_time_pbkdf2(sample) for _ in range(3))[1]
+    iterations = int(sample * (target_ms / 1000) / elapsed) // 10000 * 10000
+    return max(minimum, min(maximum, iterations))
+
+
+def _time_pbkdf2(iterations):
+    started = time.perf_counter()
+    pbkdf2("calibration", "calibrationsalt", iterations)
+    return time.perf_counter() - started
+
+
+class CalibratedPBKDF2PasswordHasher(PBKDF2PasswordHasher):
+    """PBKDF2 SHA256 hasher whose cost is measured on this host.
+
+    On first use the iteration count is calibrated so one hash takes
+    ``PASSWORD_HASH_CALIBRATION["TARGET_MS"]``, never below
+    ``MIN_ITERATIONS``. Hashes stay ``pbkdf2_sha256`` (interchangeable
+    with the fixed hasher). Only hashes weaker than the calibrated cost
+    (by more than ``TOLERANCE``) are flagged for rehash, so calibration
+    jitter between processes does not rehash on every login, and
+    stronger hashes are never downgraded.
+    """
+
+    algorithm = "pbkdf2_sha256"
+
+    _calibrated = None
+    _calibration_lock = threading.Lock()
+
+    @property
+    def iterations(self):
+        cls = type(self)
+        if cls._calibrated is None:
+            with cls._calibration_lock:
+                if cls._calibrated is None:
+                    config = _calibration_config()
+                    cls._calibrated = calibrate_pbkdf2_iterations(
+                        config["TARGET_MS"],
+                        config["MIN_ITERATIONS"],
+                        config["MAX_ITERATIONS"],
+                    )
+                    logger.info(
+                        "PBKDF2 calibrated to %d iterations (target %d ms)",
+                        cls._calibrated,
+                        config["TARGET_MS"],
+                    )
+        return cls._calibrated
+
+    def must_update(self, encoded):
+        decoded = self.decode(encoded)
+        floor = self.iterations * (1 - _calibration_config()["TOLERANCE"])
+        return decoded["iterations"] < floor or must_update_salt(decoded["salt"], self.salt_entropy)
+
+
+def _calibration_config():
+    return {
+        "TARGET_MS": 100,
+        "MIN_ITERATIONS": PBKDF2SHA256IterationsHasher.iterations,
+        "MAX_ITERATIONS": 5_000_000,
+        "TOLERANCE": 0.1,
+        **getattr(settings, "PASSWORD_HASH_CALIBRATION", {}),
+    }
@@ -57,7 +57,9 @@ INSTALLED_APPS = [
 # MIDDLEWARE (ORDER IS CRITICAL)
 # --------------------------------------------------
 MIDDLEWARE = [
-    "corsheaders.middleware.CorsMiddleware",  # MUST BE FIRST
+    # Server span around everything below (see TRACING)
+    "erp_tracing.middleware.TracingMiddleware",
+    "corsheaders.middleware.CorsMiddleware",  # MUST BE FIRST (after tracing)
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
@@ -118,13 +120,39 @@ AUTH_PASSWORD_VALIDATORS = [
 # --------------------------------------------------
 # PASSWORD HASHERS
 # --------------------------------------------------
+# PASSWORD_HASHER_MODE: "fixed" (120000 PBKDF2 iterations) or
+# "calibrated" (iterations measured at startup to take TARGET_MS per hash,
+# see config/hashers.py and `manage.py benchmark_hashers`).
+PASSWORD_HASHER_MODE = os.getenv("PASSWORD_HASHER_MODE", "fixed")
+
+PASSWORD_HASH_CALIBRATION = {
+    "TARGET_MS": int(os.getenv("PASSWORD_HASH_TARGET_MS", 100)),
+    "MIN_ITERATIONS": 120000,
+    "MAX_ITERATIONS": 5_000_000,
+    "TOLERANCE": 0.1,
+}
+
 PASSWORD_HASHERS = [
-    "config.hashers.PBKDF2SHA256IterationsHasher",
+    "config.hashers.CalibratedPBKDF2PasswordHasher"
+    if PASSWORD_HASHER_MODE == "calibrated"
+    else "config.hashers.PBKDF2SHA256IterationsHasher",
     "django.contrib.auth.hashers.PBKDF2PasswordHasher",
     "django.contrib.auth.hashers.Argon2PasswordHasher",
     "django.contrib.auth.hashers.BCryptSHA256PasswordHasher",
 ]
 
+# Successful logins with an outdated hash (legacy hasher or lower cost)
+# are rehashed in a background thread instead of inside the request.
+AUTHENTICATION_BACKENDS = [
+    "apps.authentication.backends.DeferredRehashModelBackend",
+]
+
+PASSWORD_REHASH = {
+    "WORKERS": int(os.getenv("PASSWORD_REHASH_WORKERS", 1)),
+    # Rehashes beyond this many pending are skipped (retried next login).
+    "MAX_PENDING": int(os.getenv("PASSWORD_REHASH_MAX_PENDING", 100)),
+}
+
 # --------------------------------------------------
 # DJANGO REST FRAMEWORK
 # --------------------------------------------------
@@ -148,6 +176,103 @@ JWT_SETTINGS = {
     "REFRESH_TOKEN_LIFETIME": int(os.getenv("JWT_REFRESH_TOKEN_LIFETIME", 604800)),
 }
 
+# Additional public keys published in the JWKS next to the signing key
+# (comma-separated paths): the next key before a rotation, the previous
+# key until its tokens have expired.
+JWT_PUBLISHED_PUBLIC_KEY_PATHS = [
+    path for path in os.getenv("JWT_PUBLISHED_PUBLIC_KEY_PATHS", "").split(",") if path
+]
+
+# --------------------------------------------------
+# TRACING (common_lib/erp_tracing)
+# --------------------------------------------------
+# Continues the gateway's trace from the forwarded traceparent header;
+# requests arriving without one start a trace sampled at SAMPLE_RATE.
+# INSTRUMENT adds spans for every SQL statement and DRF serializer call.
+# Off unless TRACING_ENABLED=1 (dev settings turn it on).
+TRACING = {
+    "ENABLED": os.getenv("TRACING_ENABLED", "0") == "1",
+    "SERVICE_NAME": "auth_service",
+    "SAMPLE_RATE": float(os.getenv("TRACING_SAMPLE_RATE", 0.01)),
+    "ACCEPT_INCOMING": True,
+    "INSTRUMENT": ("db", "serializers"),
+    "EXPORT_PATH": os.getenv("TRACING_EXPORT_PATH", str(PROJECT_ROOT / "traces.jsonl")),
+    "EXPORT_URL": os.getenv("TRACING_EXPORT_URL"),
+}
+
+# --------------------------------------------------
+# CLIENT ADDRESS
+# --------------------------------------------------
+# Addresses/networks of the proxies in front of this service (the gateway,
+# a load balancer) that append to X-Forwarded-For. X-Forwarded-For is only
+# read from these; a client connecting directly is keyed on REMOTE_ADDR.
+# The client address feeds the login throttle and audit rows.
+TRUSTED_PROXIES = [
+    proxy.strip()
+    for proxy in os.getenv("AUTH_TRUSTED_PROXIES", "127.0.0.1,::1").split(",")
+    if proxy.strip()
+]
+
+# --------------------------------------------------
+# LOGIN THROTTLE
+# --------------------------------------------------
+# Sliding-window limits on login attempts, checked before the password
+# hash. BACKEND "local" counts per process; "cache" uses CACHES[CACHE]
+# (shared when that cache is Redis/Memcached). A limit of 0 disables it.
+LOGIN_THROTTLE = {
+    "ENABLED": os.getenv("LOGIN_THROTTLE_ENABLED", "true").lower() == "true",
+    "BACKEND": os.getenv("LOGIN_THROTTLE_BACKEND", "local"),
+    "CACHE": "default",
+    "USERNAME_LIMIT": int(os.getenv("LOGIN_THROTTLE_USERNAME_LIMIT", 10)),
+    "USERNAME_WINDOW": int(os.getenv("LOGIN_THROTTLE_USERNAME_WINDOW", 300)),
+    "IP_LIMIT": int(os.getenv("LOGIN_THROTTLE_IP_LIMIT", 100)),
+    "IP_WINDOW": int(os.getenv("LOGIN_THROTTLE_IP_WINDOW", 60)),
+}
+
+# --------------------------------------------------
+# AUTH AUDIT WRITER
+# --------------------------------------------------
+# Audit rows are queued and inserted in batches by a background thread.
+# OVERFLOW (queue full): "block" (wait BLOCK_TIMEOUT, then drop),
+# "drop", or "sync" (insert inline).
+AUTH_AUDIT_WRITER = {
+    "ENABLED": os.getenv("AUTH_AUDIT_ASYNC", "true").lower() == "true",
+    "QUEUE_SIZE": int(os.getenv("AUTH_AUDIT_QUEUE_SIZE", 10000)),
+    "BATCH_SIZE": int(os.getenv("AUTH_AUDIT_BATCH_SIZE", 200)),
+    "FLUSH_INTERVAL": float(os.getenv("AUTH_AUDIT_FLUSH_INTERVAL", 1.0)),
+    "OVERFLOW": os.getenv("AUTH_AUDIT_OVERFLOW", "block"),
+    "BLOCK_TIMEOUT": float(os.getenv("AUTH_AUDIT_BLOCK_TIMEOUT", 0.1)),
+}
+
+# Rows older than AUTH_AUDIT_RETENTION_DAYS are moved to compressed
+# monthly archives by `manage.py archive_audit_log` (run daily).
+AUTH_AUDIT_RETENTION_DAYS = int(os.getenv("AUTH_AUDIT_RETENTION_DAYS", 90))
+AUTH_AUDIT_ARCHIVE_DIR = os.getenv("AUTH_AUDIT_ARCHIVE_DIR", str(BASE_DIR / "audit_archive"))
+# Archive files are deleted after this many days (0 keeps them forever).
+AUTH_AUDIT_ARCHIVE_RETENTION_DAYS = int(os.getenv("AUTH_AUDIT_ARCHIVE_RETENTION_DAYS", 0))
+
+# --------------------------------------------------
+# CACHE (claims cache, "cache" login throttle backend)
+# --------------------------------------------------
+# Local memory is per process: fine for a single dev server, but other
+# workers would not see claims invalidations or each other's throttle
+# counts. prod.py requires a shared backend (AUTH_CACHE_BACKEND /
+# AUTH_CACHE_LOCATION). Refresh-token families are kept in the database.
+CACHES = {
+    "default": {
+        "BACKEND": os.getenv(
+            "AUTH_CACHE_BACKEND",
+            "django.core.cache.backends.locmem.LocMemCache",
+        ),
+        "LOCATION": os.getenv("AUTH_CACHE_LOCATION", "auth-service"),
+        "TIMEOUT": None,
+    }
+}
+
+# Per-user token claims (groups) cached for token issuance; invalidated by
+# signals on change, the timeout bounds staleness across processes.
+AUTH_CLAIMS_CACHE_TIMEOUT = int(os.getenv("AUTH_CLAIMS_CACHE_TIMEOUT", 300))
+
 # --------------------------------------------------
 # CORS SETTINGS (React / Vite)
 # --------------------------------------------------
@@ -32,3 +32,9 @@ JWT_PUBLIC_KEY_PATH = os.getenv(
     BASE_DIR / "keys/dev_public.pem",
 )
 
+# Trace every request locally (TRACING_ENABLED=0 to turn off)
+TRACING = {
+    **TRACING,
+    "ENABLED": os.getenv("TRACING_ENABLED", "1") == "1",
+    "SAMPLE_RATE": float(os.getenv("TRACING_SAMPLE_RATE", 1.0)),
+}
@@ -86,6 +86,20 @@ if not JWT_PRIVATE_KEY_PATH or not JWT_PUBLIC_KEY_PATH:
     raise RuntimeError("JWT key paths must be set in production")
 
 
+# ------------------------------------------------------------
+# Cache (MUST be shared between workers)
+# ------------------------------------------------------------
+# Claims invalidations and "cache" throttle counts only reach the other
+# workers through a shared cache (Redis / Memcached / database).
+PER_PROCESS_CACHE_BACKENDS = (
+    "django.core.cache.backends.locmem.LocMemCache",
+    "django.core.cache.backends.dummy.DummyCache",
+)
+
+if CACHES["default"]["BACKEND"] in PER_PROCESS_CACHE_BACKENDS:
+    raise RuntimeError("AUTH_CACHE_BACKEND must be a shared cache in production")
+
+
 # ------------------------------------------------------------
 # Logging (structured, production-safe)
 # ------------------------------------------------------------
@@ -0,0 +1,68 @@
+"""
+Signature Algorithms
+--------------------
+The asymmetric JWT algorithms ERP services may sign and verify with.
+
+RS256 remains the default. ES256 (P-256) and EdDSA (Ed25519) sign and
+verify far faster at equivalent strength. Symmetric (HS*) algorithms and
+``none`` are never accepted: every service would need the signing secret.
+
+A migration runs as a dual-algorithm window. Verifiers list the new
+algorithm in ``JWT_SETTINGS["ACCEPTED_ALGORITHMS"]`` and the new key is
+published in the JWKS. Then auth_service switches its signing
+``ALGORITHM``. The old one is dropped once its tokens have expired.
+"""
+
+from cryptography.hazmat.primitives.asymmetric import ec, ed25519, rsa
+from django.conf import settings
+
+SUPPORTED_ALGORITHMS = frozenset({
+    "RS256", "RS384", "RS512",
+    "PS256", "PS384", "PS512",
+    "ES256", "ES384", "ES512",
+    "EdDSA",
+})
+
+_EC_CURVE_ALGORITHMS = {
+    "secp256r1": "ES256",
+    "secp384r1": "ES384",
+    "secp521r1": "ES512",
+}
+
+
+def check_algorithm(algorithm: str | None) -> str:
+    """
+    Validate a configured algorithm name.
+
+    :raises: RuntimeError for symmetric, unknown or missing algorithms
+    """
+    if not algorithm or algorithm not in SUPPORTED_ALGORITHMS:
+        raise RuntimeError(
+            f"Invalid JWT algorithm configuration ({algorithm!r}); "
+            "asymmetric RS*/PS*/ES*/EdDSA required"
+        )
+    return algorithm
+
+
+def accepted_algorithms() -> frozenset:
+    """
+    Algorithms verifiers accept: the configured ``ALGORITHM`` plus any
+    ``ACCEPTED_ALGORITHMS`` (the dual-algorithm transition window).
+    """
+    jwt_settings = settings.JWT_SETTINGS
+    configured = [jwt_settings.get("ALGORITHM"), *jwt_settings.get("ACCEPTED_ALGORITHMS", ())]
+    return frozenset(check_algorithm(algorithm) for algorithm in configured)
+
+
+def algorithm_for_key(key) -> str:
+    """Default JWT algorithm for a parsed public or private key."""
+    if isinstance(key, (rsa.RSAPublicKey, rsa.RSAPrivateKey)):
+        return "RS256"
+    if isinstance(key, (ed25519.Ed25519PublicKey, ed25519.Ed25519PrivateKey)):
+        return "EdDSA"
+    if isinstance(key, (ec.EllipticCurvePublicKey, ec.EllipticCurvePrivateKey)):
+        try:
+            return _EC_CURVE_ALGORITHMS[key.curve.name]
+        except KeyError:
+            pass
+    raise ValueError(f"Unsupported JWT key type: {type(key).__name__}")
@@ -0,0 +1,91 @@
+"""
+Verified Token Cache
+--------------------
+Bounded LRU of already-verified JWT payloads.
+
+A client presents the same access token many times during its lifetime;
+once its signature and claims have been checked, the payload can be
+returned from memory until the token's own ``exp``. Entries are keyed by
+a SHA-256 digest of the token (the raw token is never stored) and are
+tied to the version of the verification keys they were checked with, so
+a key rotation invalidates them.
+"""
+
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+
+
+class TokenCache:
+    def __init__(self, max_size: int = 10000):
+        self.max_size = max_size
+        self._entries = OrderedDict()  # digest -> (payload, exp, key_version)
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    @staticmethod
+    def _digest(token: str) -> bytes:
+        return hashlib.sha256(token.encode()).digest()
+
+    def get(self, token: str, key_version) -> dict | None:
+        """
+        Return the cached payload for ``token`` verified under
+        ``key_version``, or None when absent, expired or verified
+        against keys that have since changed.
+        """
+        digest = self._digest(token)
+        now = time.time()
+
+        with self._lock:
+            entry = self._entries.get(digest)
+            if entry is None:
+                self.misses += 1
+                return None
+
+            payload, exp, entry_version = entry
+            if exp <= now or entry_version != key_version:
+                del self._entries[digest]
+                self.expirations += 1
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(digest)
+            self.hits += 1
+
+        # Callers get their own copy; the cached payload stays pristine.
+        return dict(payload)
+
+    def put(self, token: str, key_version, payload: dict) -> None:
+        exp = payload.get("exp")
+        if not isinstance(exp, (int, float)) or self.max_size <= 0:
+            return
+
+        digest = self._digest(token)
+        with self._lock:
+            self._entries[digest] = (dict(payload), exp, key_version)
+            self._entries.move_to_end(digest)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
@@ -1,24 +1,40 @@
 """
 JWT Decoder Utility
 -------------------
-Used by API Gateway and other services to validate RS256 JWTs
-issued by auth_service.
+Used by API Gateway and other services to validate JWTs issued by
+auth_service (RS256 by default; ES256/EdDSA supported, see algorithms.py).
 
 This module is production-safe:
 - No hardcoded paths
 - Fails cleanly (401-style errors, no 500s)
-- Enforces issuer and algorithm
+- Enforces issuer and the accepted (asymmetric) algorithms
+- Parses the public key once per process (reloaded on file change)
+- Remembers verified tokens until their own expiry (see cache.py)
+- Selects the verification key by ``kid`` from a locally held JWKS
+  (see jwks.py), falling back to ``JWT_PUBLIC_KEY_PATH``
+- Rejects revoked tokens (by ``jti``) from a locally held revocation
+  list (see revocation.py), also for cached verifications
 """
 
+import threading
+from typing import NamedTuple
+
 import jwt
 from pathlib import Path
+from cryptography.hazmat.primitives.serialization import load_pem_public_key
 from django.conf import settings
 from jwt import (
     ExpiredSignatureError,
-    InvalidSignatureError,
     InvalidTokenError,
+    PyJWTError,
 )
 
+from .algorithms import accepted_algorithms, algorithm_for_key
+from .cache import TokenCache
+from .jwks import JWKSKeySet, key_id
+from .keys import KeyFileCache
+from .revocation import RevocationList
+
 
 # ============================================================
 # Custom Exceptions (domain-level, not PyJWT-leakage)
@@ -40,20 +56,188 @@ class JWTInvalidError(JWTDecodeError):
 # Internal helpers
 # ============================================================
 
-def _load_public_key() -> str:
+class _VerificationKey(NamedTuple):
+    key: object
+    kid: str
+    algorithm: str
+
+
+def _load_public_key(key_path: Path, algorithm=None) -> _VerificationKey:
     """
-    Load RSA public key used for verifying JWTs.
+    Load and parse the public key used for verifying JWTs.
+    The key type (RSA / P-256 / Ed25519) determines its algorithm.
     Converts filesystem / config issues into auth failures
     instead of crashing the request pipeline.
     """
-    key_path = Path(settings.JWT_PUBLIC_KEY_PATH)
-
-    if not key_path.exists():
+    try:
+        pem = key_path.read_bytes()
+    except OSError:
         raise JWTInvalidError(
             f"JWT public key not found at {key_path}"
         )
 
-    return key_path.read_text()
+    try:
+        key = load_pem_public_key(pem)
+        key_algorithm = algorithm_for_key(key)
+        return _VerificationKey(key, key_id(key, key_algorithm), key_algorithm)
+    except (ValueError, TypeError):
+        raise JWTInvalidError(
+            f"JWT public key at {key_path} is not a supported public key"
+        )
+
+
+_public_key_cache = KeyFileCache("JWT_PUBLIC_KEY_PATH", _load_public_key)
+
+
+def key_cache_stats() -> dict:
+    """Hit/reload counters of the verification key cache (and JWKS state)."""
+    stats = _public_key_cache.stats()
+    key_set = _get_jwks_key_set()
+    if key_set is not None:
+        stats["jwks"] = key_set.stats()
+    return stats
+
+
+_jwks_key_set = None
+_jwks_lock = threading.Lock()
+
+
+def _get_jwks_key_set() -> JWKSKeySet | None:
+    """
+    Key set from ``JWT_JWKS_URL`` / ``JWT_JWKS_PATH``, or None when
+    neither is configured (single ``JWT_PUBLIC_KEY_PATH`` mode).
+    """
+    global _jwks_key_set
+    if _jwks_key_set is None:
+        url = getattr(settings, "JWT_JWKS_URL", None)
+        path = getattr(settings, "JWT_JWKS_PATH", None)
+        if not url and not path:
+            return None
+        with _jwks_lock:
+            if _jwks_key_set is None:
+                key_set = JWKSKeySet(
+                    url=url,
+                    path=path,
+                    refresh_interval=getattr(settings, "JWT_JWKS_REFRESH_INTERVAL", 300),
+                )
+                key_set.start()
+                _jwks_key_set = key_set
+    return _jwks_key_set
+
+
+def _file_key() -> _VerificationKey | None:
+    if not getattr(settings, "JWT_PUBLIC_KEY_PATH", None):
+        return None
+    return _public_key_cache.get(None)
+
+
+def _key_version(key_set: JWKSKeySet | None):
+    """
+    Identifies the current verification keys. Changes on JWKS updates
+    and on key file reloads, invalidating cached verifications.
+    """
+    if key_set is None:
+        # Single-key mode: a missing key file is an auth failure, as before.
+        _public_key_cache.get(None)
+        return (None, _public_key_cache.reloads)
+
+    try:
+        _file_key()
+    except JWTInvalidError:
+        pass
+    return (key_set.version, _public_key_cache.reloads)
+
+
+def _resolve_key(token: str, accepted: frozenset, key_set: JWKSKeySet | None):
+    """
+    Pick the verification key named by the token's ``kid`` header.
+
+    :return: (key, algorithm) to verify the token with
+    """
+    try:
+        header = jwt.get_unverified_header(token)
+    except InvalidTokenError:
+        raise JWTInvalidError("Invalid token")
+
+    kid = header.get("kid")
+    algorithm = header.get("alg")
+    if algorithm not in accepted:
+        raise JWTInvalidError("Invalid token")
+
+    if key_set is not None:
+        entry = key_set.get(kid)
+        if entry is not None:
+            key, key_algorithm = entry
+            if key_algorithm != algorithm:
+                raise JWTInvalidError("Invalid token")
+            return key, algorithm
+
+    # Fallback: the configured key file, for tokens without a kid or
+    # signed with that key (also covers JWKS not being loaded yet).
+    try:
+        file_key = _file_key()
+    except JWTInvalidError:
+        if key_set is None:
+            raise
+        file_key = None
+
+    if file_key is not None and kid in (None, file_key.kid):
+        return file_key.key, algorithm
+
+    raise JWTInvalidError("Unknown signing key")
+
+
+_token_cache = None
+_token_cache_lock = threading.Lock()
+
+
+def _get_token_cache() -> TokenCache | None:
+    """Verified-token cache sized by ``JWT_TOKEN_CACHE_SIZE`` (0 disables it)."""
+    global _token_cache
+    if _token_cache is None:
+        with _token_cache_lock:
+            if _token_cache is None:
+                _token_cache = TokenCache(getattr(settings, "JWT_TOKEN_CACHE_SIZE", 10000))
+    return _token_cache if _token_cache.max_size > 0 else None
+
+
+def token_cache_stats() -> dict:
+    """Size, hit rate and eviction counters of the verified-token cache."""
+    cache = _get_token_cache()
+    return cache.stats() if cache is not None else {"size": 0, "max_size": 0}
+
+
+_revocation_list = None
+_revocation_lock = threading.Lock()
+
+
+def _get_revocation_list() -> RevocationList | None:
+    """
+    Revocation list from ``JWT_REVOCATIONS_URL`` / ``JWT_REVOCATIONS_PATH``,
+    or None when neither is configured (no revocation checks).
+    """
+    global _revocation_list
+    if _revocation_list is None:
+        url = getattr(settings, "JWT_REVOCATIONS_URL", None)
+        path = getattr(settings, "JWT_REVOCATIONS_PATH", None)
+        if not url and not path:
+            return None
+        with _revocation_lock:
+            if _revocation_list is None:
+                revocations = RevocationList(
+                    url=url,
+                    path=path,
+                    refresh_interval=getattr(settings, "JWT_REVOCATIONS_REFRESH_INTERVAL", 5),
+                )
+                revocations.start()
+                _revocation_list = revocations
+    return _revocation_list
+
+
+def revocation_stats() -> dict:
+    """Size and refresh counters of the local revocation list."""
+    revocations = _get_revocation_list()
+    return revocations.stats() if revocations is not None else {"revoked": 0}
 
 
 # ============================================================
@@ -70,35 +254,47 @@ def decode_token(token: str, expected_type: str | None = None) -> dict:
     :raises: JWTExpiredError, JWTInvalidError
     """
 
-    algorithm = settings.JWT_SETTINGS.get("ALGORITHM")
+    # Defensive guard: never allow symmetric algorithms here
+    # (raises RuntimeError on misconfiguration)
+    accepted = accepted_algorithms()
     issuer = settings.JWT_SETTINGS.get("ISSUER")
 
-    # Defensive guard: never allow symmetric algorithms here
-    if not algorithm or algorithm.startswith("HS"):
-        raise RuntimeError(
-            "Invalid JWT algorithm configuration; RS* required"
-        )
+    key_set = _get_jwks_key_set()
+    key_version = _key_version(key_set)
+    cache = _get_token_cache()
+    payload = cache.get(token, key_version) if cache is not None else None
 
-    try:
-        payload = jwt.decode(
-            token,
-            _load_public_key(),
-            algorithms=[algorithm],
-            issuer=issuer,
-            options={
-                "require": ["exp", "iat", "iss"],
-                "verify_aud": False,  # enable later if aud is introduced
-            },
-        )
+    if payload is None:
+        key, algorithm = _resolve_key(token, accepted, key_set)
+        try:
+            payload = jwt.decode(
+                token,
+                key,
+                algorithms=[algorithm],
+                issuer=issuer,
+                options={
+                    "require": ["exp", "iat", "iss"],
+                    "verify_aud": False,  # enable later if aud is introduced
+                },
+            )
 
-        # Enforce token type if requested
-        if expected_type and payload.get("type") != expected_type:
-            raise JWTInvalidError("Invalid token type")
+        except ExpiredSignatureError:
+            raise JWTExpiredError("Token expired")
 
-        return payload
+        except PyJWTError:
+            # Bad signature/claims, or a key that does not fit the algorithm
+            raise JWTInvalidError("Invalid token")
 
-    except ExpiredSignatureError:
-        raise JWTExpiredError("Token expired")
+        if cache is not None:
+            cache.put(token, key_version, payload)
 
-    except (InvalidSignatureError, InvalidTokenError):
-        raise JWTInvalidError("Invalid token")
+    # Checked on every call: a cached verification may since have been revoked
+    revocations = _get_revocation_list()
+    if revocations is not None and revocations.is_revoked(payload.get("jti")):
+        raise JWTInvalidError("Token revoked")
+
+    # Enforce token type if requested
+    if expected_type and payload.get("type") != expected_type:
+        raise JWTInvalidError("Invalid token type")
+
+    return payload
@@ -1,51 +1,145 @@
 import time
+import uuid
 import jwt
 from pathlib import Path
+from typing import NamedTuple
 from django.conf import settings
 
+from .algorithms import check_algorithm
+from .jwks import key_id
+from .keys import KeyFileCache
 
-def _load_private_key() -> str:
+
+class SigningKey(NamedTuple):
+    key: object
+    kid: str
+
+
+def _load_private_key(key_path: Path, algorithm: str) -> SigningKey:
     """
-    Load RSA private key used for signing JWTs.
+    Load and parse the private key used for signing JWTs.
+
+    The ``kid`` is the RFC 7638 thumbprint of the matching public key, so
+    it is identical to the one published in the JWKS document.
     """
-    return Path(settings.JWT_PRIVATE_KEY_PATH).read_text()
+    key = jwt.get_algorithm_by_name(algorithm).prepare_key(key_path.read_bytes())
+    return SigningKey(key, key_id(key.public_key(), algorithm))
+
+
+# Parsed once per process; re-read only when the key file changes.
+_private_key_cache = KeyFileCache("JWT_PRIVATE_KEY_PATH", _load_private_key)
 
 
-def generate_access_token(user) -> str:
+def signing_key() -> SigningKey:
+    """Current parsed signing key and its ``kid``."""
+    return _private_key_cache.get(check_algorithm(settings.JWT_SETTINGS["ALGORITHM"]))
+
+
+def _sign(payload: dict) -> str:
+    algorithm = check_algorithm(settings.JWT_SETTINGS["ALGORITHM"])
+    key = _private_key_cache.get(algorithm)
+    return jwt.encode(
+        payload,
+        key.key,
+        algorithm=algorithm,
+        headers={"kid": key.kid},
+    )
+
+
+def build_claims(user) -> dict:
     """
-    Generate short-lived access token.
+    Snapshot of the user claims carried by access tokens.
     """
-    payload = {
+    return {
         "sub": str(user.id),
         "username": user.username,
         "groups": list(user.groups.values_list("name", flat=True)),
-        "iat": int(time.time()),
-        "exp": int(time.time()) + settings.JWT_SETTINGS["ACCESS_TOKEN_LIFETIME"],
+    }
+
+
+def generate_access_token(
+    user,
+    claims: dict | None = None,
+    now: int | None = None,
+    jti: str | None = None,
+) -> str:
+    """
+    Generate short-lived access token.
+
+    Pass ``claims`` (from ``build_claims``) to avoid re-querying the user's groups.
+    ``jti`` identifies the token for revocation (see revocation.py).
+    """
+    claims = claims if claims is not None else build_claims(user)
+    now = now if now is not None else int(time.time())
+
+    payload = {
+        **claims,
+        "iat": now,
+        "exp": now + settings.JWT_SETTINGS["ACCESS_TOKEN_LIFETIME"],
         "iss": settings.JWT_SETTINGS["ISSUER"],
         "type": "access",
+        "jti": jti or uuid.uuid4().hex,
     }
 
-    return jwt.encode(
-        payload,
-        _load_private_key(),
-        algorithm=settings.JWT_SETTINGS["ALGORITHM"],
-    )
+    return _sign(payload)
 
 
-def generate_refresh_token(user) -> str:
+def generate_refresh_token(
+    user,
+    now: int | None = None,
+    family: str | None = None,
+    jti: str | None = None,
+) -> str:
     """
     Generate long-lived refresh token.
+
+    ``jti`` identifies this token and ``fid`` the rotation family it
+    belongs to (all refresh tokens descending from one login), which lets
+    auth_service detect a refresh token being used twice.
     """
+    now = now if now is not None else int(time.time())
+
     payload = {
         "sub": str(user.id),
-        "iat": int(time.time()),
-        "exp": int(time.time()) + settings.JWT_SETTINGS["REFRESH_TOKEN_LIFETIME"],
+        "iat": now,
+        "exp": now + settings.JWT_SETTINGS["REFRESH_TOKEN_LIFETIME"],
         "iss": settings.JWT_SETTINGS["ISSUER"],
         "type": "refresh",
+        "jti": jti or uuid.uuid4().hex,
+        "fid": family or uuid.uuid4().hex,
     }
 
-    return jwt.encode(
-        payload,
-        _load_private_key(),
-        algorithm=settings.JWT_SETTINGS["ALGORITHM"],
-    )
+    return _sign(payload)
+
+
+def issue_token_pair(user, claims: dict | None = None, family: str | None = None) -> dict:
+    """
+    Issue an access/refresh token pair from a single claims snapshot.
+
+    :param family: refresh-token family to continue (rotation); a new
+                   family is started when omitted (login)
+    :return: dict with access_token, refresh_token, expires_in, the
+             claims used (so callers can echo groups without a query)
+             and the refresh token's jti / family / exp
+    """
+    claims = claims if claims is not None else build_claims(user)
+    now = int(time.time())
+    jti = uuid.uuid4().hex
+    family = family or uuid.uuid4().hex
+
+    return {
+        "access_token": generate_access_token(user, claims=claims, now=now),
+        "refresh_token": generate_refresh_token(user, now=now, family=family, jti=jti),
+        "expires_in": settings.JWT_SETTINGS["ACCESS_TOKEN_LIFETIME"],
+        "claims": claims,
+        "refresh": {
+            "jti": jti,
+            "family": family,
+            "exp": now + settings.JWT_SETTINGS["REFRESH_TOKEN_LIFETIME"],
+        },
+    }
+
+
+def key_cache_stats() -> dict:
+    """Hit/reload counters of the signing key cache."""
+    return _private_key_cache.stats()
@@ -0,0 +1,187 @@
+"""
+JWKS Support
+------------
+Publishing and consuming ``kid``-tagged public keys.
+
+auth_service publishes its verification keys as a JWKS document; every
+verifier keeps a local copy in a ``JWKSKeySet`` that a background thread
+refreshes from ``JWT_JWKS_URL`` (or re-reads from ``JWT_JWKS_PATH``, a
+file-based stand-in for offline use). Lookups by ``kid`` are plain dict
+reads, so no key is ever fetched on the request path and keys can be
+rotated by publishing the next key before signing with it.
+"""
+
+import base64
+import hashlib
+import json
+import logging
+import threading
+import time
+import urllib.request
+from pathlib import Path
+
+import jwt
+
+logger = logging.getLogger(__name__)
+
+# RFC 7638 required members per key type
+_THUMBPRINT_MEMBERS = {
+    "RSA": ("e", "kty", "n"),
+    "EC": ("crv", "kty", "x", "y"),
+    "OKP": ("crv", "kty", "x"),
+}
+
+
+def jwk_thumbprint(jwk: dict) -> str:
+    """RFC 7638 SHA-256 thumbprint of a public JWK (used as its ``kid``)."""
+    members = _THUMBPRINT_MEMBERS[jwk["kty"]]
+    canonical = json.dumps(
+        {name: jwk[name] for name in members},
+        separators=(",", ":"),
+        sort_keys=True,
+    )
+    digest = hashlib.sha256(canonical.encode()).digest()
+    return base64.urlsafe_b64encode(digest).rstrip(b"=").decode()
+
+
+def public_jwk(public_key, algorithm: str, kid: str | None = None) -> dict:
+    """Public JWK for ``public_key``, tagged with ``kid`` (thumbprint by default)."""
+    jwk = jwt.get_algorithm_by_name(algorithm).to_jwk(public_key, as_dict=True)
+    jwk.update({
+        "kid": kid or jwk_thumbprint(jwk),
+        "alg": algorithm,
+        "use": "sig",
+    })
+    return jwk
+
+
+def key_id(public_key, algorithm: str) -> str:
+    """Thumbprint ``kid`` of a public key."""
+    return public_jwk(public_key, algorithm)["kid"]
+
+
+class JWKSKeySet:
+    """
+    Locally held ``kid`` -> key map, refreshed off the request path.
+
+    ``version`` changes whenever the set of keys changes, which lets
+    callers (e.g. the verified-token cache) drop state tied to old keys.
+    """
+
+    def __init__(
+        self,
+        url: str | None = None,
+        path: str | None = None,
+        refresh_interval: float = 300.0,
+        min_refresh_interval: float = 10.0,
+    ):
+        self.url = url
+        self.path = Path(path) if path else None
+        self.refresh_interval = refresh_interval
+        self.min_refresh_interval = min_refresh_interval
+
+        self._keys = {}  # kid -> (key, algorithm)
+        self._jwks = {}  # kid -> published JWK, to detect changed key material
+        self._file_mtime = None
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._thread = None
+
+        self.version = 0
+        self.refreshes = 0
+        self.failures = 0
+
+    # ------------------------------------------------------------
+    # Request path
+    # ------------------------------------------------------------
+
+    def get(self, kid):
+        """
+        Return ``(key, algorithm)`` for ``kid``, or None.
+
+        An unknown ``kid`` (e.g. a freshly rotated key) only nudges the
+        refresher; it never triggers a fetch here.
+        """
+        entry = self._keys.get(kid)
+        if entry is None and kid is not None:
+            self._wake.set()
+        return entry
+
+    # ------------------------------------------------------------
+    # Refresh
+    # ------------------------------------------------------------
+
+    def start(self) -> None:
+        """Load the file stand-in now and start the background refresher."""
+        with self._lock:
+            if self._thread is not None:
+                return
+            if self.path is not None:
+                self._refresh()
+            self._thread = threading.Thread(
+                target=self._run,
+                name="erp-jwt-jwks-refresh",
+                daemon=True,
+            )
+            self._thread.start()
+
+    def _run(self):
+        while True:
+            if self.url:
+                self._refresh()
+            else:
+                self._refresh_file()
+            # Honour early wake-ups (unknown kid) at most every min interval.
+            time.sleep(self.min_refresh_interval)
+            self._wake.wait(max(self.refresh_interval - self.min_refresh_interval, 0))
+            self._wake.clear()
+
+    def _refresh_file(self):
+        try:
+            mtime = self.path.stat().st_mtime_ns
+        except OSError:
+            mtime = None
+        if mtime != self._file_mtime:
+            self._refresh()
+
+    def _fetch(self) -> dict:
+        if self.url:
+            with urllib.request.urlopen(self.url, timeout=5) as response:
+                return json.load(response)
+        self._file_mtime = self.path.stat().st_mtime_ns
+        return json.loads(self.path.read_text())
+
+    def _refresh(self) -> None:
+        try:
+            document = self._fetch()
+            keys = {}
+            jwks = {}
+            for jwk in document.get("keys", []):
+                if jwk.get("use", "sig") != "sig" or not jwk.get("kid"):
+                    continue
+                try:
+                    parsed = jwt.PyJWK(jwk)
+                except jwt.PyJWKError:
+                    logger.warning("Skipping unusable JWK kid=%s", jwk.get("kid"))
+                    continue
+                keys[parsed.key_id] = (parsed.key, parsed.algorithm_name)
+                jwks[parsed.key_id] = jwk
+        except Exception:
+            self.failures += 1
+            logger.warning("JWKS refresh failed; keeping %d cached keys", len(self._keys), exc_info=True)
+            return
+
+        self.refreshes += 1
+        if jwks != self._jwks:
+            self._keys = keys
+            self._jwks = jwks
+            self.version += 1
+            logger.info("JWKS key set updated: %s", sorted(keys))
+
+    def stats(self) -> dict:
+        return {
+            "keys": sorted(self._keys),
+            "version": self.version,
+            "refreshes": self.refreshes,
+            "failures": self.failures,
+        }
@@ -0,0 +1,76 @@
+"""
+Key File Cache
+--------------
+Parsed JWT keys loaded from PEM files named in Django settings.
+
+Shared by the encoder (private signing key) and the decoder (public
+verification key). A key is read and parsed once; afterwards the file
+is stat'ed at most once per ``JWT_KEY_RELOAD_INTERVAL`` seconds
+(default 1) and re-parsed only when its mtime changes, so keys can be
+rotated on disk without restarting the service.
+"""
+
+import os
+import threading
+import time
+from pathlib import Path
+
+from django.conf import settings
+
+
+class KeyFileCache:
+    """
+    :param path_setting: name of the setting holding the key file path
+    :param load: ``load(path, algorithm)`` -> parsed key; raises the
+                 caller's domain error when the file is missing/invalid
+    """
+
+    def __init__(self, path_setting: str, load):
+        self.path_setting = path_setting
+        self._load = load
+        self._lock = threading.Lock()
+        self._source = None  # (path, algorithm) the cached key came from
+        self._mtime = None
+        self._key = None
+        self._checked_at = 0.0
+
+        # Counters are updated without the lock on the fast path; they
+        # are for sizing/monitoring and may undercount under contention.
+        self.hits = 0
+        self.reloads = 0
+
+    def get(self, algorithm: str):
+        source = (str(getattr(settings, self.path_setting)), algorithm)
+        interval = getattr(settings, "JWT_KEY_RELOAD_INTERVAL", 1.0)
+        now = time.monotonic()
+
+        if self._key is not None and self._source == source and now - self._checked_at < interval:
+            self.hits += 1
+            return self._key
+
+        with self._lock:
+            key_path = Path(source[0])
+            try:
+                mtime = os.stat(key_path).st_mtime_ns
+            except OSError:
+                # Let the loader report the missing file in its own terms.
+                mtime = None
+
+            if mtime is None or self._key is None or self._source != source or self._mtime != mtime:
+                self._key = self._load(key_path, algorithm)
+                self._source = source
+                self._mtime = mtime
+                self.reloads += 1
+            else:
+                self.hits += 1
+
+            self._checked_at = now
+            return self._key
+
+    def clear(self) -> None:
+        with self._lock:
+            self._source = self._mtime = self._key = None
+            self._checked_at = 0.0
+
+    def stats(self) -> dict:
+        return {"hits": self.hits, "reloads": self.reloads}
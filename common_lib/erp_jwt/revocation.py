@@ -0,0 +1,139 @@
+"""
+Locally held token revocation list.
+
+auth_service records revoked token IDs (``jti``) and serves them from
+``/api/auth/revocations/?since=<cursor>``. Each verifier keeps the IDs of
+revoked, not yet expired tokens in memory and pulls only new entries
+every ``JWT_REVOCATIONS_REFRESH_INTERVAL`` seconds, so checking a token
+is one hash lookup with no network hop. Entries are dropped once the
+token they revoke has expired (it would fail verification anyway), which
+keeps the list as small as the number of logouts within one access
+token lifetime.
+
+A revocation takes effect on verifiers within one refresh interval.
+The first pull runs on the refresher thread, so nothing is rejected as
+revoked until it completes; the request that starts the list never waits
+on auth_service.
+``JWT_REVOCATIONS_PATH`` is a file stand-in (full list, re-read when the
+file changes) for offline use.
+"""
+
+import json
+import logging
+import threading
+import time
+import urllib.parse
+import urllib.request
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+
+class RevocationList:
+    def __init__(
+        self,
+        url: str | None = None,
+        path: str | None = None,
+        refresh_interval: float = 5.0,
+        page_size: int = 1000,
+    ):
+        self.url = url
+        self.path = Path(path) if path else None
+        self.refresh_interval = refresh_interval
+        self.page_size = page_size
+
+        self._revoked = {}  # jti -> exp
+        self._cursor = 0
+        self._file_mtime = None
+        self._lock = threading.Lock()
+        self._thread = None
+
+        self.refreshes = 0
+        self.failures = 0
+
+    # ------------------------------------------------------------
+    # Request path
+    # ------------------------------------------------------------
+
+    def is_revoked(self, jti) -> bool:
+        return jti in self._revoked
+
+    # ------------------------------------------------------------
+    # Refresh
+    # ------------------------------------------------------------
+
+    def start(self) -> None:
+        """Load the file stand-in now and start the background refresher."""
+        with self._lock:
+            if self._thread is not None:
+                return
+            if self.path is not None and not self.url:
+                self._refresh()
+            self._thread = threading.Thread(
+                target=self._run,
+                name="erp-jwt-revocation-refresh",
+                daemon=True,
+            )
+            self._thread.start()
+
+    def _run(self):
+        if self.url:
+            self._refresh()
+        while True:
+            time.sleep(self.refresh_interval)
+            self._refresh()
+
+    def _refresh(self) -> None:
+        try:
+            if self.url:
+                self._pull()
+            else:
+                self._reload_file()
+        except Exception:
+            self.failures += 1
+            logger.warning(
+                "Revocation list refresh failed; keeping %d entries",
+                len(self._revoked),
+                exc_info=True,
+            )
+            return
+
+        self.refreshes += 1
+        self._prune()
+
+    def _pull(self) -> None:
+        """Fetch entries after the cursor, page by page."""
+        while True:
+            query = urllib.parse.urlencode({"since": self._cursor, "limit": self.page_size})
+            with urllib.request.urlopen(f"{self.url}?{query}", timeout=5) as response:
+                page = json.load(response)
+
+            for entry in page.get("revocations", []):
+                self._revoked[entry["jti"]] = entry["exp"]
+            self._cursor = page.get("cursor", self._cursor)
+
+            if not page.get("more"):
+                return
+
+    def _reload_file(self) -> None:
+        mtime = self.path.stat().st_mtime_ns
+        if mtime == self._file_mtime:
+            return
+        document = json.loads(self.path.read_text())
+        self._revoked = {
+            entry["jti"]: entry["exp"] for entry in document.get("revocations", [])
+        }
+        self._file_mtime = mtime
+
+    def _prune(self) -> None:
+        now = time.time()
+        if any(exp <= now for exp in self._revoked.values()):
+            self._revoked = {jti: exp for jti, exp in self._revoked.items() if exp > now}
+
+    def stats(self) -> dict:
+        return {
+            "revoked": len(self._revoked),
+            "cursor": self._cursor,
+            "refreshes": self.refreshes,
+            "failures": self.failures,
+        }
@@ -0,0 +1,77 @@
+"""
+Collector stand-in
+------------------
+Receives span batches from ``HttpExporter`` (``TRACING["EXPORT_URL"]``)
+and appends them to a JSON lines file, for running the services with
+HTTP export and no tracing backend::
+
+    cd common_lib
+    python -m erp_tracing.collector --port 4318 --path ../traces.jsonl
+
+    # each service: TRACING_EXPORT_URL=http://127.0.0.1:4318/spans
+
+Inspect the result with ``python -m erp_tracing.report``.
+"""
+
+import argparse
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+
+class CollectorServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, path: Path):
+        super().__init__(address, _Handler)
+        self.path = path
+        self.lock = threading.Lock()
+        self.received = 0
+
+
+class _Handler(BaseHTTPRequestHandler):
+    def do_POST(self):
+        try:
+            batch = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))))
+        except ValueError:
+            self.send_error(400, "Expected a JSON array of spans")
+            return
+        if not isinstance(batch, list):
+            self.send_error(400, "Expected a JSON array of spans")
+            return
+
+        data = "".join(json.dumps(record, separators=(",", ":")) + "\n" for record in batch)
+        with self.server.lock:
+            with open(self.server.path, "a", encoding="utf-8") as fh:
+                fh.write(data)
+            self.server.received += len(batch)
+
+        self.send_response(202)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def log_message(self, format, *args):
+        pass
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Append received spans to a JSON lines file.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=4318)
+    parser.add_argument("--path", default="traces.jsonl")
+    args = parser.parse_args(argv)
+
+    server = CollectorServer((args.host, args.port), Path(args.path))
+    print(f"Collecting spans on http://{args.host}:{args.port}/ into {args.path}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        print(f"Received {server.received} spans")
+
+
+if __name__ == "__main__":
+    main()
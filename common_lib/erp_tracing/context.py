@@ -0,0 +1,56 @@
+"""
+W3C Trace Context
+-----------------
+Parsing and formatting of the ``traceparent`` header
+(https://www.w3.org/TR/trace-context/)::
+
+    traceparent: 00-<trace-id: 32 hex>-<parent-id: 16 hex>-<flags: 2 hex>
+
+Only version ``00`` fields are read (later versions must stay
+compatible with them); all-zero IDs are invalid. Flag bit 0 carries the
+caller's sampling decision.
+"""
+
+import random
+import re
+
+_TRACEPARENT_RE = re.compile(r"^([0-9a-f]{2})-([0-9a-f]{32})-([0-9a-f]{16})-([0-9a-f]{2})(-.*)?$")
+
+SAMPLED = 0x01
+
+
+# IDs only need to be unique, not unpredictable (the module generator is
+# reseeded in forked workers)
+def new_trace_id() -> str:
+    return f"{random.getrandbits(128) or 1:032x}"
+
+
+def new_span_id() -> str:
+    return f"{random.getrandbits(64) or 1:016x}"
+
+
+class TraceParent:
+    __slots__ = ("trace_id", "span_id", "sampled")
+
+    def __init__(self, trace_id: str, span_id: str, sampled: bool):
+        self.trace_id = trace_id
+        self.span_id = span_id
+        self.sampled = sampled
+
+    @classmethod
+    def parse(cls, header: str | None) -> "TraceParent | None":
+        """The caller's context from a ``traceparent`` value, or None if invalid."""
+        if not header:
+            return None
+        match = _TRACEPARENT_RE.match(header.strip().lower())
+        if match is None:
+            return None
+        version, trace_id, span_id, flags, rest = match.groups()
+        if version == "ff" or (version == "00" and rest):
+            return None
+        if trace_id == "0" * 32 or span_id == "0" * 16:
+            return None
+        return cls(trace_id, span_id, bool(int(flags, 16) & SAMPLED))
+
+    def format(self) -> str:
+        return f"00-{self.trace_id}-{self.span_id}-{SAMPLED if self.sampled else 0:02x}"
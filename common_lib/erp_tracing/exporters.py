@@ -0,0 +1,120 @@
+"""
+Span exporters
+--------------
+Finished spans are queued in memory and written in batches by a daemon
+thread, so the request path only pays for a ``deque.append``.
+
+- ``FileExporter`` appends one JSON object per line to a local file.
+  Each batch is a single ``write()`` on a file opened in append mode, so
+  several services can share one file.
+- ``HttpExporter`` POSTs each batch as a JSON array to a collector (see
+  ``python -m erp_tracing.collector`` for a local stand-in).
+
+When spans arrive faster than they can be written, the oldest queued
+spans are dropped (and counted) rather than growing the queue.
+"""
+
+import json
+import logging
+import threading
+import time
+import urllib.request
+from collections import deque
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+
+class BatchExporter:
+    def __init__(self, max_queue: int = 10000, batch_size: int = 512, interval: float = 1.0):
+        self.batch_size = batch_size
+        self.interval = interval
+
+        self._queue = deque(maxlen=max_queue)
+        self._wake = threading.Event()
+        self._lock = threading.Lock()
+        self._thread = None
+
+        self.exported = 0
+        self.dropped = 0
+        self.failures = 0
+
+    def export(self, record: dict) -> None:
+        if len(self._queue) == self._queue.maxlen:
+            self.dropped += 1
+        self._queue.append(record)
+        if self._thread is None:
+            self._start()
+        elif len(self._queue) >= self.batch_size:
+            self._wake.set()
+
+    def _start(self) -> None:
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._thread = threading.Thread(
+                target=self._run,
+                name=f"erp-tracing-{type(self).__name__}",
+                daemon=True,
+            )
+            self._thread.start()
+
+    def _run(self):
+        while True:
+            self._wake.wait(self.interval)
+            self._wake.clear()
+            self.flush()
+
+    def flush(self) -> None:
+        """Write everything queued so far."""
+        while self._queue:
+            batch = []
+            while self._queue and len(batch) < self.batch_size:
+                batch.append(self._queue.popleft())
+            try:
+                self._write(batch)
+            except Exception:
+                self.failures += 1
+                logger.warning("Dropped %d spans: export failed", len(batch), exc_info=True)
+                return
+            self.exported += len(batch)
+
+    def _write(self, batch: list) -> None:
+        raise NotImplementedError
+
+    def stats(self) -> dict:
+        return {
+            "queued": len(self._queue),
+            "exported": self.exported,
+            "dropped": self.dropped,
+            "failures": self.failures,
+        }
+
+
+class FileExporter(BatchExporter):
+    def __init__(self, path: str, **kwargs):
+        super().__init__(**kwargs)
+        self.path = Path(path)
+
+    def _write(self, batch: list) -> None:
+        data = "".join(json.dumps(record, separators=(",", ":")) + "\n" for record in batch)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.path, "a", encoding="utf-8") as fh:
+            fh.write(data)
+
+
+class HttpExporter(BatchExporter):
+    def __init__(self, url: str, timeout: float = 5.0, **kwargs):
+        super().__init__(**kwargs)
+        self.url = url
+        self.timeout = timeout
+
+    def _write(self, batch: list) -> None:
+        request = urllib.request.Request(
+            self.url,
+            data=json.dumps(batch, separators=(",", ":")).encode(),
+            headers={"Content-Type": "application/json"},
+            method="POST",
+        )
+        with urllib.request.urlopen(request, timeout=self.timeout) as response:
+            response.read()
@@ -0,0 +1,107 @@
+"""
+Framework instrumentation
+-------------------------
+Spans for work every view does, without touching each view:
+
+- ``db``: one ``db.query`` span per SQL statement, through an execute
+  wrapper added to each database connection as it is created.
+- ``serializers``: ``serialize`` / ``validate`` / ``save`` spans around
+  the DRF serializer entry points (``.data``, ``is_valid()``, ``save()``),
+  named after the serializer class (the child class for ``many=True``).
+
+Both only record inside a sampled request span (see tracer.span), so an
+untraced request pays one context-variable lookup per call.
+"""
+
+import functools
+
+from erp_tracing.tracer import current_span, span
+
+# Longer statements are truncated in the span (parameters are never recorded)
+MAX_STATEMENT_LENGTH = 1000
+
+_installed = set()
+
+
+# ============================================================
+# Database
+# ============================================================
+
+def _trace_query(execute, sql, params, many, context):
+    parent = current_span()
+    if parent is None or not parent.sampled:
+        return execute(sql, params, many, context)
+
+    connection = context["connection"]
+    with span(
+        "db.query",
+        **{
+            "db.system": connection.vendor,
+            "db.alias": connection.alias,
+            "db.statement": sql[:MAX_STATEMENT_LENGTH],
+            "db.many": many,
+        },
+    ):
+        return execute(sql, params, many, context)
+
+
+def _on_connection_created(sender, connection, **kwargs):
+    # A connection object is reconnected in place (CONN_MAX_AGE), so this
+    # runs more than once per object.
+    if _trace_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(_trace_query)
+
+
+def instrument_db() -> None:
+    from django.db import connections
+    from django.db.backends.signals import connection_created
+
+    connection_created.connect(_on_connection_created, dispatch_uid="erp_tracing_db")
+    for connection in connections.all(initialized_only=True):
+        _on_connection_created(None, connection)
+
+
+# ============================================================
+# DRF serializers
+# ============================================================
+
+def _serializer_name(serializer) -> str:
+    child = getattr(serializer, "child", None)
+    return type(child if child is not None else serializer).__name__
+
+
+def _traced(operation: str, method):
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        parent = current_span()
+        if parent is None or not parent.sampled:
+            return method(self, *args, **kwargs)
+        with span(operation, serializer=_serializer_name(self), many=hasattr(self, "child")):
+            return method(self, *args, **kwargs)
+
+    return wrapper
+
+
+def instrument_serializers() -> None:
+    from rest_framework.serializers import BaseSerializer, ListSerializer
+
+    # Serializer.data / ListSerializer.data call BaseSerializer.data, so
+    # wrapping it covers both with one span per top-level serializer.
+    BaseSerializer.data = property(_traced("serialize", BaseSerializer.data.fget))
+    for cls in (BaseSerializer, ListSerializer):
+        cls.is_valid = _traced("validate", cls.__dict__["is_valid"])
+        cls.save = _traced("save", cls.__dict__["save"])
+
+
+INSTRUMENTATIONS = {
+    "db": instrument_db,
+    "serializers": instrument_serializers,
+}
+
+
+def instrument(names) -> None:
+    """Install the named instrumentations once per process."""
+    for name in names:
+        if name not in _installed:
+            INSTRUMENTATIONS[name]()
+            _installed.add(name)
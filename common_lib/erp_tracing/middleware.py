@@ -0,0 +1,87 @@
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+
+from erp_tracing.context import TraceParent
+from erp_tracing.instrument import instrument
+from erp_tracing.tracer import get_tracer, use_span
+
+
+class TracingMiddleware:
+    """
+    Server span for every request.
+
+    Continues the caller's ``traceparent`` when ``TRACING["ACCEPT_INCOMING"]``
+    (services behind the gateway) and otherwise starts a new trace (the
+    gateway: clients do not choose trace IDs or sampling). The span is
+    current while the rest of the stack runs, so database, serializer and
+    outgoing-call spans nest under it; it ends once the response is ready
+    (streamed bodies are not included). Sampled responses carry the trace ID
+    in ``X-Trace-Id``. Paths under ``TRACING["EXCLUDE_PATHS"]`` (scrapes,
+    health checks) are not traced.
+
+    Place it first (after any metrics middleware) so the span covers the
+    other middleware.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.exclude_paths = ()
+        if get_tracer() is not None:
+            instrument(settings.TRACING.get("INSTRUMENT", ()))
+            self.exclude_paths = tuple(settings.TRACING.get("EXCLUDE_PATHS", ()))
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+
+        server = self._start(request)
+        if server is None:
+            return self.get_response(request)
+        with use_span(server):
+            try:
+                response = self.get_response(request)
+            except BaseException as exc:
+                server.end(error=type(exc).__name__)
+                raise
+        return self._finish(request, server, response)
+
+    async def __acall__(self, request):
+        server = self._start(request)
+        if server is None:
+            return await self.get_response(request)
+        with use_span(server):
+            try:
+                response = await self.get_response(request)
+            except BaseException as exc:
+                server.end(error=type(exc).__name__)
+                raise
+        return self._finish(request, server, response)
+
+    def _start(self, request):
+        tracer = get_tracer()
+        if tracer is None or request.path.startswith(self.exclude_paths):
+            return None
+        parent = None
+        if tracer.accept_incoming:
+            parent = TraceParent.parse(request.headers.get("traceparent"))
+        return tracer.start_span(
+            f"{request.method} {request.path}",
+            kind="server",
+            parent=parent,
+            attributes={"http.method": request.method, "http.path": request.path},
+        )
+
+    def _finish(self, request, server, response):
+        server.set("http.status_code", response.status_code)
+        match = getattr(request, "resolver_match", None)
+        if match is not None and match.route:
+            server.set("http.route", match.route)
+        server.end(error=f"HTTP {response.status_code}" if response.status_code >= 500 else None)
+        if server.sampled:
+            response["X-Trace-Id"] = server.trace_id
+        return response
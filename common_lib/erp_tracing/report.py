@@ -0,0 +1,96 @@
+"""
+Trace report
+------------
+Prints traces from a span file as trees, with each span's duration and its
+self time (duration minus direct children)::
+
+    cd common_lib
+    python -m erp_tracing.report ../traces.jsonl              # last 5 traces
+    python -m erp_tracing.report ../traces.jsonl --last 20
+    python -m erp_tracing.report ../traces.jsonl --trace <trace id>
+
+    GET /api/master/api/v1/masters/countries/    api_gateway   41.20 ms (self 1.02)
+      jwt.verify                                 api_gateway    0.31 ms
+      upstream master                            api_gateway   39.87 ms (self 3.10)
+        GET /api/v1/masters/countries/           master-service 36.77 ms (self 4.55)
+          ...
+"""
+
+import argparse
+import json
+from collections import defaultdict
+
+
+def load(path: str) -> dict:
+    """``{trace_id: [span, ...]}`` from a JSON lines span file."""
+    traces = defaultdict(list)
+    with open(path, encoding="utf-8") as fh:
+        for line in fh:
+            line = line.strip()
+            if line:
+                record = json.loads(line)
+                traces[record["trace_id"]].append(record)
+    return traces
+
+
+def format_trace(spans: list) -> list:
+    ids = {record["span_id"] for record in spans}
+    children = defaultdict(list)
+    roots = []
+    for record in sorted(spans, key=lambda record: record["start"]):
+        # Parents from another process that has not exported (or was not
+        # traced) leave their children as roots
+        if record["parent_id"] in ids:
+            children[record["parent_id"]].append(record)
+        else:
+            roots.append(record)
+
+    lines = []
+
+    def walk(record, depth):
+        below = children[record["span_id"]]
+        label = "  " * depth + record["name"]
+        if "serializer" in record["attributes"]:
+            label += f" {record['attributes']['serializer']}"
+        line = f"{label:<60} {record['service']:<15} {record['duration_ms']:>9.2f} ms"
+        if below:
+            own = record["duration_ms"] - sum(child["duration_ms"] for child in below)
+            line += f" (self {own:.2f})"
+        if record.get("error"):
+            line += f"  ! {record['error']}"
+        statement = record["attributes"].get("db.statement")
+        if statement:
+            line += f"  {statement[:80]}"
+        lines.append(line)
+        for child in below:
+            walk(child, depth + 1)
+
+    for root in roots:
+        walk(root, 0)
+    return lines
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Print traces from a span file.")
+    parser.add_argument("path")
+    parser.add_argument("--trace", help="only this trace ID")
+    parser.add_argument("--last", type=int, default=5, help="most recent traces to print")
+    args = parser.parse_args(argv)
+
+    traces = load(args.path)
+    if args.trace:
+        selected = [args.trace] if args.trace in traces else []
+    else:
+        ordered = sorted(traces, key=lambda trace_id: min(record["start"] for record in traces[trace_id]))
+        selected = ordered[-args.last:]
+
+    for trace_id in selected:
+        spans = traces[trace_id]
+        print(f"trace {trace_id} ({len(spans)} spans)")
+        for line in format_trace(spans):
+            print("  " + line)
+        print()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,216 @@
+"""
+Tracer
+------
+Spans for one request flow across the gateway, auth_service and
+master-service.
+
+Each service reads ``settings.TRACING``::
+
+    TRACING = {
+        "ENABLED": True,
+        "SERVICE_NAME": "master-service",
+        "SAMPLE_RATE": 1.0,                   # traces started here (0.0 .. 1.0)
+        "ACCEPT_INCOMING": True,              # continue the caller's traceparent
+        "INSTRUMENT": ("db", "serializers"),  # see instrument.py
+        "EXCLUDE_PATHS": ("/metrics",),       # not traced
+        "EXPORT_PATH": "traces.jsonl",        # JSON lines file, or ...
+        "EXPORT_URL": None,                   # ... POST batches to a collector
+    }
+
+The current span lives in a context variable, so it follows the request
+across ``await`` and through asgiref's sync/async bridges (which copy the
+context). Spans of an unsampled trace are not recorded but still carry
+IDs, so the ``traceparent`` sent downstream passes the sampling decision
+on.
+
+Usage::
+
+    with span("serialize", serializer="CountrySerializer"):
+        ...
+
+``span()`` only opens a child of the current span: outside a traced
+request it is a no-op, so library code can be instrumented freely.
+"""
+
+import contextvars
+import random
+import threading
+import time
+from contextlib import contextmanager
+
+from django.conf import settings
+
+from erp_tracing.context import TraceParent, new_span_id, new_trace_id
+from erp_tracing.exporters import FileExporter, HttpExporter
+
+_current = contextvars.ContextVar("erp_tracing_span", default=None)
+
+
+class Span:
+    __slots__ = (
+        "name", "kind", "trace_id", "span_id", "parent_id", "sampled",
+        "attributes", "error", "start_time", "_started", "duration",
+    )
+
+    def __init__(self, name: str, kind: str, trace_id: str, parent_id: str | None, sampled: bool, attributes=None):
+        self.name = name
+        self.kind = kind
+        self.trace_id = trace_id
+        self.span_id = new_span_id()
+        self.parent_id = parent_id
+        self.sampled = sampled
+        self.attributes = attributes or {}
+        self.error = None
+        self.start_time = time.time()
+        self._started = time.perf_counter()
+        self.duration = None
+
+    def set(self, key: str, value) -> None:
+        self.attributes[key] = value
+
+    def traceparent(self) -> str:
+        """``traceparent`` value for a call made within this span."""
+        return TraceParent(self.trace_id, self.span_id, self.sampled).format()
+
+    def end(self, error: str | None = None) -> None:
+        if self.duration is not None:
+            return
+        self.duration = time.perf_counter() - self._started
+        if error is not None:
+            self.error = error
+        if self.sampled:
+            tracer = get_tracer()
+            if tracer is not None:
+                tracer.exporter.export(self._record(tracer.service_name))
+
+    def _record(self, service_name: str) -> dict:
+        return {
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "service": service_name,
+            "name": self.name,
+            "kind": self.kind,
+            "start": self.start_time,
+            "duration_ms": round(self.duration * 1000, 3),
+            "error": self.error,
+            "attributes": self.attributes,
+        }
+
+
+class _NoopSpan:
+    """Stands in for a span outside a traced request."""
+
+    def set(self, key: str, value) -> None:
+        pass
+
+    def traceparent(self) -> None:
+        return None
+
+    def end(self, error: str | None = None) -> None:
+        pass
+
+
+NOOP_SPAN = _NoopSpan()
+
+
+class Tracer:
+    def __init__(self, service_name: str, sample_rate: float, accept_incoming: bool, exporter):
+        self.service_name = service_name
+        self.sample_rate = sample_rate
+        self.accept_incoming = accept_incoming
+        self.exporter = exporter
+
+    def start_span(self, name: str, kind: str = "internal", parent: TraceParent | None = None, attributes=None) -> Span:
+        """
+        Start a span under ``parent`` (a remote caller), else under the
+        current span, else as the root of a new trace sampled at
+        ``SAMPLE_RATE``. The caller ends it.
+        """
+        if parent is None:
+            current = _current.get()
+            if current is not None:
+                parent = TraceParent(current.trace_id, current.span_id, current.sampled)
+        if parent is None:
+            return Span(name, kind, new_trace_id(), None, random.random() < self.sample_rate, attributes)
+        return Span(name, kind, parent.trace_id, parent.span_id, parent.sampled, attributes)
+
+
+_tracer = None
+_tracer_lock = threading.Lock()
+
+
+def get_tracer() -> Tracer | None:
+    """Tracer configured from ``settings.TRACING``, or None when disabled."""
+    global _tracer
+    if _tracer is None:
+        conf = getattr(settings, "TRACING", {})
+        if not conf.get("ENABLED", False):
+            return None
+        with _tracer_lock:
+            if _tracer is None:
+                if conf.get("EXPORT_URL"):
+                    exporter = HttpExporter(conf["EXPORT_URL"])
+                else:
+                    exporter = FileExporter(conf.get("EXPORT_PATH") or "traces.jsonl")
+                _tracer = Tracer(
+                    service_name=conf.get("SERVICE_NAME", "unknown"),
+                    sample_rate=conf.get("SAMPLE_RATE", 1.0),
+                    accept_incoming=conf.get("ACCEPT_INCOMING", True),
+                    exporter=exporter,
+                )
+    return _tracer
+
+
+def current_span() -> Span | None:
+    return _current.get()
+
+
+@contextmanager
+def use_span(span: Span):
+    """Make ``span`` the current span within the block."""
+    token = _current.set(span)
+    try:
+        yield span
+    finally:
+        _current.reset(token)
+
+
+@contextmanager
+def span(name: str, **attributes):
+    """
+    Child span of the current span for the duration of the block; a no-op
+    (yields ``NOOP_SPAN``) when there is no sampled current span. An
+    exception escaping the block is recorded on the span.
+    """
+    parent = _current.get()
+    if parent is None or not parent.sampled:
+        yield NOOP_SPAN
+        return
+
+    child = Span(name, "internal", parent.trace_id, parent.span_id, True, attributes)
+    token = _current.set(child)
+    try:
+        yield child
+    except BaseException as exc:
+        child.end(error=type(exc).__name__)
+        raise
+    finally:
+        _current.reset(token)
+        child.end()
+
+
+def start_span(name: str, kind: str = "internal", parent: TraceParent | None = None, attributes=None):
+    """``Tracer.start_span`` on the configured tracer; ``NOOP_SPAN`` when tracing is off."""
+    tracer = get_tracer()
+    if tracer is None:
+        return NOOP_SPAN
+    return tracer.start_span(name, kind, parent, attributes)
+
+
+def tracing_stats() -> dict:
+    """Export queue counters, or ``{"enabled": False}``."""
+    tracer = get_tracer()
+    if tracer is None:
+        return {"enabled": False}
+    return {"enabled": True, "service": tracer.service_name, **tracer.exporter.stats()}
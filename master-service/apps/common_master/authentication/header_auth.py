@@ -3,6 +3,7 @@ from rest_framework.authentication import BaseAuthentication
 from rest_framework.exceptions import AuthenticationFailed
 
 from erp_jwt.decoder import decode_token, JWTExpiredError, JWTInvalidError
+from erp_tracing.tracer import span
 
 
 class RemoteUser:
@@ -48,7 +49,8 @@ class GatewayHeaderAuthentication(BaseAuthentication):
                 return None
 
             try:
-                payload = decode_token(token, expected_type="access")
+                with span("jwt.verify"):
+                    payload = decode_token(token, expected_type="access")
             except JWTExpiredError as exc:
                 raise AuthenticationFailed(str(exc))
             except JWTInvalidError as exc:
@@ -69,7 +71,8 @@ class GatewayHeaderAuthentication(BaseAuthentication):
         User = get_user_model()
 
         try:
-            user = User.objects.get(id=int(x_user))
+            with span("auth.user_lookup", user_id=x_user):
+                user = User.objects.get(id=int(x_user))
             return (user, None)
         except User.DoesNotExist:
             # create lightweight authenticated principal
@@ -49,7 +49,11 @@ INSTALLED_APPS = [
 # MIDDLEWARE
 # --------------------------------------------------
 MIDDLEWARE = [
-    "corsheaders.middleware.CorsMiddleware",  # MUST BE FIRST
+    # Server span around everything below (see TRACING)
+    "erp_tracing.middleware.TracingMiddleware",
+    "corsheaders.middleware.CorsMiddleware",  # MUST BE FIRST (after tracing)
+    # Compress responses for the gateway (it asks for gzip upstream)
+    "django.middleware.gzip.GZipMiddleware",
 
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
@@ -122,6 +126,11 @@ REST_FRAMEWORK = {
 # --------------------------------------------------
 JWT_SETTINGS = {
     "ALGORITHM": os.getenv("JWT_ALGORITHM", "RS256"),
+    # Extra algorithms accepted during a signing-algorithm migration,
+    # e.g. JWT_ACCEPTED_ALGORITHMS=EdDSA (comma-separated; HS* never allowed)
+    "ACCEPTED_ALGORITHMS": [
+        alg for alg in os.getenv("JWT_ACCEPTED_ALGORITHMS", "").split(",") if alg
+    ],
     "ISSUER": os.getenv("JWT_ISSUER", "auth_service"),
 }
 
@@ -131,6 +140,40 @@ JWT_PUBLIC_KEY_PATH = os.getenv(
     str(PROJECT_ROOT / "auth_service" / "keys" / "dev_public.pem"),
 )
 
+# Verified tokens are remembered until their own exp (0 disables the cache)
+JWT_TOKEN_CACHE_SIZE = int(os.getenv("JWT_TOKEN_CACHE_SIZE", 10000))
+
+# kid-tagged keys from auth_service's JWKS, refreshed in the background.
+# JWT_JWKS_PATH is a file-based stand-in for offline use. Tokens without a
+# kid (or before the first refresh) fall back to JWT_PUBLIC_KEY_PATH.
+JWT_JWKS_URL = os.getenv("JWT_JWKS_URL", "")
+JWT_JWKS_PATH = os.getenv("JWT_JWKS_PATH", "")
+JWT_JWKS_REFRESH_INTERVAL = int(os.getenv("JWT_JWKS_REFRESH_INTERVAL", 300))
+
+# Revoked token IDs pulled incrementally from auth_service
+# (/api/auth/revocations/); JWT_REVOCATIONS_PATH is a file stand-in.
+# Unset: revocation is not checked.
+JWT_REVOCATIONS_URL = os.getenv("JWT_REVOCATIONS_URL", "")
+JWT_REVOCATIONS_PATH = os.getenv("JWT_REVOCATIONS_PATH", "")
+JWT_REVOCATIONS_REFRESH_INTERVAL = int(os.getenv("JWT_REVOCATIONS_REFRESH_INTERVAL", 5))
+
+# --------------------------------------------------
+# TRACING (common_lib/erp_tracing)
+# --------------------------------------------------
+# Continues the gateway's trace from the forwarded traceparent header;
+# requests arriving without one start a trace sampled at SAMPLE_RATE.
+# INSTRUMENT adds spans for every SQL statement and DRF serializer call.
+# Off unless TRACING_ENABLED=1 (dev settings turn it on).
+TRACING = {
+    "ENABLED": os.getenv("TRACING_ENABLED", "0") == "1",
+    "SERVICE_NAME": "master-service",
+    "SAMPLE_RATE": float(os.getenv("TRACING_SAMPLE_RATE", 0.01)),
+    "ACCEPT_INCOMING": True,
+    "INSTRUMENT": ("db", "serializers"),
+    "EXPORT_PATH": os.getenv("TRACING_EXPORT_PATH", str(PROJECT_ROOT / "traces.jsonl")),
+    "EXPORT_URL": os.getenv("TRACING_EXPORT_URL"),
+}
+
 # --------------------------------------------------
 # SWAGGER / OPENAPI (drf-yasg)
 # --------------------------------------------------
@@ -1,4 +1,5 @@
 from .base import *
+import os
 
 DEBUG = True
 
@@ -19,3 +20,10 @@ DATABASES = {
 }
 
 ALLOWED_HOSTS = ["*"]
+
+# Trace every request locally (TRACING_ENABLED=0 to turn off)
+TRACING = {
+    **TRACING,
+    "ENABLED": os.getenv("TRACING_ENABLED", "1") == "1",
+    "SAMPLE_RATE": float(os.getenv("TRACING_SAMPLE_RATE", 1.0)),
+}